@@ -1,29 +1,151 @@
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Request
 
-from back.app.core.config import settings
-from back.app.services.cpi_parser_service import germany_historical_cpi_parser
+from back.app.core.exceptions import BadRequestException
+from back.app.services.analysis_cache import AnalysisCache
+from back.app.services.app_services import AppServices
+from back.app.services.batch_valuation_service import BatchValuationService
+from back.app.services.cpi_registry import CpiRegistry, UnknownCpiCountryError
 from back.app.services.cpi_service import CpiService
+from back.app.services.implied_yield_service import ImpliedYieldService
 from back.app.services.llm_service import LLMService
+from back.app.services.portfolio_service import PortfolioValuationService
+from back.app.services.sensitivity_service import SensitivityService
+from back.app.services.simulation_service import SimulationService
+from back.app.services.timeline_service import TimelineService
+from back.app.services.valuation_cache import ValuationCache
 from back.app.services.valuation_service import ValuationService
 
 
-def get_cpi_service() -> CpiService:
-    return CpiService(cpi_parser_service=germany_historical_cpi_parser)
+def get_app_services(request: Request) -> AppServices:
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        # Created by the lifespan, or installed by whoever runs the app without.
+        raise RuntimeError("The app services were not created, see lifespan")
+    return services
+
+
+app_services_dep = Annotated[AppServices, Depends(get_app_services)]
+
+
+def get_cpi_registry(services: app_services_dep) -> CpiRegistry:
+    return services.cpi_registry
+
+
+cpi_registry_dep = Annotated[CpiRegistry, Depends(get_cpi_registry)]
+
+
+def get_cpi_service(
+    registry: cpi_registry_dep, services: app_services_dep
+) -> CpiService:
+    return services.cpi_service(registry.get())
 
 
 cpi_service_dep = Annotated[CpiService, Depends(get_cpi_service)]
 
 
-def get_valuation_service() -> ValuationService:
-    return ValuationService()
+async def get_country_cpi_service(
+    country: str, services: app_services_dep
+) -> CpiService:
+    try:
+        return await services.country_cpi_service(country)
+    except UnknownCpiCountryError:
+        raise BadRequestException(detail=f"CPI country {country} is not supported")
+
+
+country_cpi_service_dep = Annotated[CpiService, Depends(get_country_cpi_service)]
+
+
+def get_valuation_service(services: app_services_dep) -> ValuationService:
+    return services.valuation_service
 
 
 valuation_service_dep = Annotated[ValuationService, Depends(get_valuation_service)]
 
 
-def get_llm_service() -> LLMService:
-    return LLMService(model=settings.LLM, api_key=settings.OPENAI_API_KEY)
+def get_valuation_cache(valuation_service: valuation_service_dep) -> ValuationCache:
+    return valuation_service.cache
+
+
+valuation_cache_dep = Annotated[ValuationCache, Depends(get_valuation_cache)]
+
+
+def get_batch_valuation_service(
+    valuation_service: valuation_service_dep,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+) -> BatchValuationService:
+    return BatchValuationService(
+        valuation_service=valuation_service,
+        cpi_service=cpi_service,
+        country_cpi_service=services.country_cpi_service,
+    )
+
+
+batch_valuation_service_dep = Annotated[
+    BatchValuationService, Depends(get_batch_valuation_service)
+]
+
+
+def get_portfolio_valuation_service(
+    services: app_services_dep,
+    cpi_service: cpi_service_dep,
+) -> PortfolioValuationService:
+    return PortfolioValuationService(
+        batch_valuation_service=BatchValuationService(
+            valuation_service=services.uncached_valuation_service,
+            cpi_service=cpi_service,
+            country_cpi_service=services.country_cpi_service,
+        )
+    )
+
+
+portfolio_valuation_service_dep = Annotated[
+    PortfolioValuationService, Depends(get_portfolio_valuation_service)
+]
+
+
+def get_sensitivity_service(services: app_services_dep) -> SensitivityService:
+    return services.sensitivity_service
+
+
+sensitivity_service_dep = Annotated[
+    SensitivityService, Depends(get_sensitivity_service)
+]
+
+
+def get_implied_yield_service(services: app_services_dep) -> ImpliedYieldService:
+    return services.implied_yield_service
+
+
+implied_yield_service_dep = Annotated[
+    ImpliedYieldService, Depends(get_implied_yield_service)
+]
+
+
+def get_timeline_service(services: app_services_dep) -> TimelineService:
+    return services.timeline_service
+
+
+timeline_service_dep = Annotated[TimelineService, Depends(get_timeline_service)]
+
+
+def get_simulation_service(services: app_services_dep) -> SimulationService:
+    return services.simulation_service
+
+
+simulation_service_dep = Annotated[SimulationService, Depends(get_simulation_service)]
+
+
+def get_llm_service(services: app_services_dep) -> LLMService:
+    return services.llm_service
 
 
 llm_service_dep = Annotated[LLMService, Depends(get_llm_service)]
+
+
+def get_analysis_cache(llm_service: llm_service_dep) -> AnalysisCache:
+    return llm_service.cache
+
+
+analysis_cache_dep = Annotated[AnalysisCache, Depends(get_analysis_cache)]
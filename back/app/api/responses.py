@@ -0,0 +1,41 @@
+from typing import Any
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose iterator is still reading the request body.
+
+    The stock one listens for a client disconnect on `receive` while it
+    streams and would swallow body chunks meant for the iterator. Reading
+    the request stream already raises ClientDisconnect, so nothing is lost.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that closes `resource` once it is done, however it
+    ends. The `finally` of a generator body is not enough: it never runs if
+    the client disconnects before the body is first iterated.
+    """
+
+    def __init__(self, content: Any, resource: Any, **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.resource = resource
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Shielded, so a disconnect cancelling the response still closes it.
+            with anyio.CancelScope(shield=True):
+                await self.resource.aclose()
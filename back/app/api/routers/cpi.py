@@ -1,14 +1,82 @@
+import sys
+from array import array
 from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from starlette import status
+from starlette.responses import Response
 
-from back.app.api.dependencies import cpi_service_dep
+from back.app.api.dependencies import country_cpi_service_dep, cpi_service_dep
+from back.app.core.constants import CPI_PERIOD_PATTERN
 from back.app.core.exceptions import BadRequestException, InternalServerException
+from back.app.schemas.cpi import CpiRange
 
 cpi_router = APIRouter()
 
 
+@cpi_router.get("/range", status_code=status.HTTP_200_OK, response_model=CpiRange)
+def get_cpi_range(
+    cpi_service: cpi_service_dep,
+    start: str = Query(..., alias="from", pattern=CPI_PERIOD_PATTERN),
+    end: str = Query(..., alias="to", pattern=CPI_PERIOD_PATTERN),
+    encoding: Literal["json", "f64", "f32"] = "json",
+):
+    """
+    Get the consumer price index (CPI) for every month between two periods
+    (YYYY-MM, inclusive) as columnar arrays.
+
+    `encoding=f64` / `f32` return the values as raw little-endian floats,
+    with missing months as NaN and the first period and month count in the
+    X-CPI-From / X-CPI-Months headers.
+    """
+
+    start_year, start_month = int(start[:4]), int(start[5:])
+    end_year, end_month = int(end[:4]), int(end[5:])
+
+    if (start_year, start_month) > (end_year, end_month):
+        raise BadRequestException(detail="CPI range start must not be after its end")
+
+    if start_year < 2002 or end_year > date.today().year:
+        raise BadRequestException(detail="CPI year must be between 2002 and today.")
+
+    try:
+        cpi_range = cpi_service.get_cpi_range(
+            start_year=start_year,
+            start_month=start_month,
+            end_year=end_year,
+            end_month=end_month,
+        )
+    except Exception as e:
+        raise InternalServerException(detail=f"CPI: {str(e)}")
+
+    if encoding == "json":
+        return CpiRange(
+            version=cpi_range.version,
+            periods=cpi_range.periods(),
+            values=[None if v != v else v for v in cpi_range.values.tolist()],
+        )
+
+    if encoding == "f64" and sys.byteorder == "little":
+        content = cpi_range.values.tobytes()
+    else:
+        values = array("d" if encoding == "f64" else "f", cpi_range.values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        content = values.tobytes()
+
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={
+            "X-CPI-Version": str(cpi_range.version),
+            "X-CPI-From": f"{cpi_range.start_year:04d}-{cpi_range.start_month:02d}",
+            "X-CPI-Months": str(len(cpi_range.values)),
+            "X-CPI-Encoding": encoding,
+        },
+    )
+
+
 @cpi_router.get("/{year}/{month}", status_code=status.HTTP_200_OK)
 def get_cpi(
     year: int,
@@ -19,13 +87,36 @@ def get_cpi(
     Get the consumer price index (CPI) for a specific month
     """
 
-    if not (1 <= month <= 12):
-        raise BadRequestException(detail="CPI month must be between 1 and 12")
+    _validate_cpi_period(year, month)
 
-    if year < 2002 or year > date.today().year:
-        raise BadRequestException(detail="CPI year must be between 2002 and today.")
+    try:
+        return cpi_service.get_cpi(year=year, month=month)
+    except Exception as e:
+        raise InternalServerException(detail=f"CPI: {str(e)}")
+
+
+@cpi_router.get("/{country}/{year}/{month}", status_code=status.HTTP_200_OK)
+def get_country_cpi(
+    year: int,
+    month: int,
+    cpi_service: country_cpi_service_dep,
+) -> float | None:
+    """
+    Get the consumer price index (CPI) of a country (ISO 3166-1 alpha-2 code)
+    for a specific month
+    """
+
+    _validate_cpi_period(year, month)
 
     try:
         return cpi_service.get_cpi(year=year, month=month)
     except Exception as e:
         raise InternalServerException(detail=f"CPI: {str(e)}")
+
+
+def _validate_cpi_period(year: int, month: int) -> None:
+    if not (1 <= month <= 12):
+        raise BadRequestException(detail="CPI month must be between 1 and 12")
+
+    if year < 2002 or year > date.today().year:
+        raise BadRequestException(detail="CPI year must be between 2002 and today.")
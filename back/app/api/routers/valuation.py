@@ -1,33 +1,102 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import os
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import APIRouter, Query
 from loguru import logger
 from fastapi import status
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
 
 from back.app.api.dependencies import (
+    app_services_dep,
+    batch_valuation_service_dep,
     cpi_service_dep,
+    implied_yield_service_dep,
     valuation_service_dep,
     llm_service_dep,
+    analysis_cache_dep,
+    portfolio_valuation_service_dep,
+    valuation_cache_dep,
+    sensitivity_service_dep,
+    simulation_service_dep,
+    timeline_service_dep,
+)
+from back.app.api.responses import BodyStreamingResponse, ClosingStreamingResponse
+from back.app.core.exceptions import (
+    BadRequestException,
+    InternalServerException,
+    ServiceUnavailableException,
+    TooManyRequestsException,
 )
-from back.app.core.exceptions import BadRequestException, InternalServerException
+from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.services.app_services import AppServices
+from back.app.services.cpi_registry import UnknownCpiCountryError
+from back.app.services.cpi_service import CpiService
+from back.app.services.json_stream import iter_json_array, iter_ndjson
+from back.app.services.llm_admission import AdmissionRejected, AdmissionStats
+from back.app.services.portfolio_service import PortfolioFormat, PortfolioWriter
+from back.app.services.result_cache import CacheStats
+from back.app.services.simulation_service import SimulationCancelled
+from back.app.services.valuation_engine import ValuationColumns
 from back.app.schemas.valuation import (
     ValuationInput,
     ValuationResult,
     CpiData,
     AIPromptSchema,
+    ImpliedYieldBatchRequest,
+    ImpliedYieldBatchResult,
+    ImpliedYieldRequest,
+    ImpliedYieldResult,
+    SensitivityRequest,
+    SensitivityResult,
+    SimulationRequest,
+    SimulationResult,
+    TimelineRequest,
+    TimelineResult,
 )
 
 valuation_router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+SSE_MEDIA_TYPE = "text/event-stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+PORTFOLIO_MEDIA_TYPES = {
+    PortfolioFormat.CSV: CSV_MEDIA_TYPE,
+    PortfolioFormat.PARQUET: PARQUET_MEDIA_TYPE,
+}
+
+# Status logged for a simulation the client abandoned, as nginx does.
+CLIENT_CLOSED_REQUEST = 499
+
+# Result lines are flushed in groups of this size.
+BATCH_FLUSH_SIZE = 64
+
 
 @valuation_router.post("/calculate", status_code=status.HTTP_200_OK)
 async def calculate_valuation(
     input_data: ValuationInput,
     cpi_service: cpi_service_dep,
+    services: app_services_dep,
     valuation_service: valuation_service_dep,
 ) -> ValuationResult:
     """
     Calculate a real estate valuation using the income capitalization method.
+
+    The index factor uses the CPI of `country` (Germany if not set), relative
+    to that country's October 2001 CPI.
     """
 
+    cpi_service, cpi_base = await _resolve_country_cpi(
+        input_data, cpi_service, services
+    )
+
     try:
         year = input_data.purchase_date.year
         month = input_data.purchase_date.month
@@ -40,8 +109,13 @@ async def calculate_valuation(
             )
 
         cpi_data = CpiData(year=year, month=month, index_value=index_value)
+        constants = valuation_service.get_index_constants(
+            cpi_service, year, cpi_base=cpi_base
+        )
 
-        result = valuation_service.calculate_valuation(input_data, cpi_data)
+        result = valuation_service.calculate_valuation(
+            input_data, cpi_data, cpi_base=cpi_base, constants=constants
+        )
 
         return result
 
@@ -53,6 +127,273 @@ async def calculate_valuation(
         raise InternalServerException(detail=f"Calculation error: {str(e)}")
 
 
+@valuation_router.get("/cache", status_code=status.HTTP_200_OK)
+async def get_valuation_cache_stats(
+    valuation_cache: valuation_cache_dep,
+) -> CacheStats:
+    """
+    Hit, miss and eviction counters of the valuation result cache of this
+    worker.
+    """
+
+    return valuation_cache.stats
+
+
+@valuation_router.post("/sensitivity", status_code=status.HTTP_200_OK)
+async def calculate_sensitivity(
+    sensitivity_request: SensitivityRequest,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+    sensitivity_service: sensitivity_service_dep,
+) -> SensitivityResult:
+    """
+    Sweep up to three inputs of one valuation over ranges of values.
+
+    Returns the theoretical total value and the building and land shares for
+    every point of the Cartesian grid of the ranges, computed in one
+    vectorized pass.
+    """
+
+    cpi_value, cpi_base = await _resolve_cpi_values(
+        sensitivity_request.input_data, cpi_service, services
+    )
+
+    try:
+        return sensitivity_service.calculate(
+            sensitivity_request, cpi_value=cpi_value, cpi_base=cpi_base
+        )
+    except Exception as e:
+        logger.exception(e)
+        raise InternalServerException(detail=f"Calculation error: {str(e)}")
+
+
+@valuation_router.post("/timeline", status_code=status.HTTP_200_OK)
+async def calculate_timeline(
+    timeline_request: TimelineRequest,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+    timeline_service: timeline_service_dep,
+) -> TimelineResult:
+    """
+    Revalue one property as if bought in every month of a span (YYYY-MM,
+    inclusive, from 2002-01 to the current month by default).
+
+    The `purchase_date` of the input is ignored. Results are columnar
+    arrays with one entry per month, None where the CPI of the previous
+    October is not available.
+    """
+
+    cpi_service, cpi_base = await _resolve_country_cpi(
+        timeline_request.input_data, cpi_service, services
+    )
+    return timeline_service.calculate(
+        timeline_request,
+        cpi_service.snapshot,
+        float(cpi_base or CPI_BASE_OCT_2001),
+    )
+
+
+@valuation_router.post("/implied-yield", status_code=status.HTTP_200_OK)
+async def calculate_implied_yield(
+    implied_yield_request: ImpliedYieldRequest,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+    implied_yield_service: implied_yield_service_dep,
+) -> ImpliedYieldResult:
+    """
+    Find the property yield (Liegenschaftszinssatz) at which the theoretical
+    total value equals the actual purchase price.
+
+    The input's `property_yield` is the starting guess. The result reports
+    whether the solver converged, its iterations and the remaining
+    difference between value and price.
+    """
+
+    input_data = implied_yield_request.input_data
+    cpi_value, cpi_base = await _resolve_cpi_values(input_data, cpi_service, services)
+    columns = ValuationColumns.from_inputs([input_data], [cpi_value], [cpi_base])
+    return implied_yield_service.solve(columns).to_results()[0]
+
+
+@valuation_router.post("/implied-yield/batch", status_code=status.HTTP_200_OK)
+async def calculate_implied_yields(
+    implied_yield_request: ImpliedYieldBatchRequest,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+    implied_yield_service: implied_yield_service_dep,
+) -> ImpliedYieldBatchResult:
+    """
+    Implied yields of many properties, solved together in one vectorized
+    pass. Results are in input order.
+    """
+
+    inputs = implied_yield_request.inputs
+    cpi_by_period: dict[tuple[str, int], tuple[float, float]] = {}
+    cpi_values, cpi_bases = [], []
+    for input_data in inputs:
+        key = ((input_data.country or "").upper(), input_data.purchase_date.year)
+        if key not in cpi_by_period:
+            cpi_by_period[key] = await _resolve_cpi_values(
+                input_data, cpi_service, services
+            )
+        cpi_value, cpi_base = cpi_by_period[key]
+        cpi_values.append(cpi_value)
+        cpi_bases.append(cpi_base)
+
+    columns = ValuationColumns.from_inputs(inputs, cpi_values, cpi_bases)
+    arrays = implied_yield_service.solve(columns)
+    return ImpliedYieldBatchResult(
+        results=arrays.to_results(),
+        converged=int(arrays.converged.sum()),
+        max_iterations=int(arrays.iterations.max()),
+    )
+
+
+@valuation_router.post("/simulate", status_code=status.HTTP_200_OK)
+async def simulate_valuation(
+    simulation_request: SimulationRequest,
+    request: Request,
+    cpi_service: cpi_service_dep,
+    services: app_services_dep,
+    simulation_service: simulation_service_dep,
+) -> SimulationResult:
+    """
+    Monte Carlo valuation over distributions of the yield, the rent, the
+    vacancy and the CPI drift.
+
+    Returns percentiles and a histogram of the theoretical total value. The
+    simulation runs on a process pool and stops when the client disconnects.
+    """
+
+    cpi_value, cpi_base = await _resolve_cpi_values(
+        simulation_request.input_data, cpi_service, services
+    )
+
+    try:
+        return await simulation_service.simulate(
+            simulation_request,
+            cpi_value=cpi_value,
+            cpi_base=cpi_base,
+            is_cancelled=request.is_disconnected,
+        )
+    except SimulationCancelled:
+        logger.info("Simulation cancelled, the client disconnected")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except ValueError as e:
+        raise BadRequestException(detail=str(e))
+    except Exception as e:
+        logger.exception(e)
+        raise InternalServerException(detail=f"Simulation error: {str(e)}")
+
+
+@valuation_router.post(
+    "/calculate/batch",
+    status_code=status.HTTP_200_OK,
+    response_class=BodyStreamingResponse,
+)
+async def calculate_valuation_batch(
+    request: Request,
+    batch_valuation_service: batch_valuation_service_dep,
+):
+    """
+    Calculate many valuations in one request.
+
+    The body is a JSON array of valuation inputs, or one input per line with
+    `Content-Type: application/x-ndjson`. Both are read incrementally.
+    Results stream back as NDJSON in input order, one
+    `{"index": i, "result": {...}}` or `{"index": i, "error": "..."}` line per
+    input, so a bad input never fails the whole batch.
+    """
+
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        items = iter_ndjson(request.stream())
+    else:
+        items = iter_json_array(request.stream())
+
+    async def lines():
+        buffer = []
+        async for item in batch_valuation_service.calculate(items):
+            # Leave out the unused member of result / error, but not the None
+            # fields inside a result.
+            unused = "result" if item.error is not None else "error"
+            buffer.append(item.model_dump_json(exclude={unused}))
+            if len(buffer) == BATCH_FLUSH_SIZE:
+                yield "\n".join(buffer) + "\n"
+                buffer.clear()
+        if buffer:
+            yield "\n".join(buffer) + "\n"
+
+    return BodyStreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@valuation_router.post("/portfolio", status_code=status.HTTP_200_OK)
+async def value_portfolio(
+    request: Request,
+    portfolio_valuation_service: portfolio_valuation_service_dep,
+    output: PortfolioFormat | None = None,
+    column: Annotated[list[str] | None, Query()] = None,
+):
+    """
+    Value a portfolio file.
+
+    The body is the raw file, CSV or, with a Parquet content type, Parquet.
+    Its columns are matched to the valuation input fields by name;
+    `column=source=field` maps a column explicitly. Every row comes back
+    with its valuation columns and an `error` column, in the format of the
+    upload unless `output` says otherwise. CSV results stream back chunk by
+    chunk as they are valued.
+    """
+
+    input_format = (
+        PortfolioFormat.PARQUET
+        if "parquet" in request.headers.get("content-type", "")
+        else PortfolioFormat.CSV
+    )
+    output = output or input_format
+    overrides = _parse_column_overrides(column or [])
+
+    source = await _spool_body(request, suffix=f".{input_format}")
+    frames = portfolio_valuation_service.value_file(source, input_format, overrides)
+
+    if output == PortfolioFormat.CSV:
+        try:
+            # The first chunk is valued before the response starts, so an
+            # unreadable file is still answered with a 400.
+            first = await anext(frames, None)
+        except ValueError as e:
+            source.unlink(missing_ok=True)
+            raise BadRequestException(detail=f"Invalid portfolio: {e}")
+
+        async def body():
+            try:
+                if first is not None:
+                    yield first.to_csv(index=False)
+                async for frame in frames:
+                    yield frame.to_csv(index=False, header=False)
+            finally:
+                source.unlink(missing_ok=True)
+
+        return StreamingResponse(body(), media_type=PORTFOLIO_MEDIA_TYPES[output])
+
+    target = source.with_suffix(f".valued.{output}")
+    try:
+        with PortfolioWriter(target, output) as writer:
+            async for frame in frames:
+                await asyncio.to_thread(writer.write, frame)
+    except ValueError as e:
+        target.unlink(missing_ok=True)
+        raise BadRequestException(detail=f"Invalid portfolio: {e}")
+    finally:
+        source.unlink(missing_ok=True)
+
+    return FileResponse(
+        target,
+        media_type=PORTFOLIO_MEDIA_TYPES[output],
+        filename=f"portfolio.{output}",
+        background=BackgroundTask(target.unlink, missing_ok=True),
+    )
+
+
 @valuation_router.post("/calculate/analysis", status_code=status.HTTP_200_OK)
 async def get_ai_analysis(
     result: ValuationResult,
@@ -63,25 +404,182 @@ async def get_ai_analysis(
     """
 
     try:
-        mapped_result = AIPromptSchema(
-            property_type=result.input_data.property_type,
-            purchase_date=result.input_data.purchase_date.isoformat(),
-            actual_purchase_price=result.input_data.actual_purchase_price,
-            theoretical_total_value=result.theoretical_total_value,
-            building_share_percent=result.building_share_percent,
-            land_share_percent=result.land_share_percent,
-            admin_costs=result.management_costs.administration,
-            maintenance_costs=result.management_costs.maintenance,
-            risk_amount=result.management_costs.risk_of_rent_loss,
-            risk_percentage=result.management_costs.risk_percentage,
-            index_factor=result.index_factor,
-            cpi_value=result.cpi_used.index_value,
-            cpi_base_2001=result.cpi_base_2001,
-        )
-
-        analysis = await llm_service.get_llm_analysis(mapped_result)
+        analysis = await llm_service.get_llm_analysis(_analysis_prompt(result))
         return analysis
 
+    except AdmissionRejected as e:
+        raise _retry_later(e)
+    except Exception as e:
+        logger.exception(e)
+        raise InternalServerException(detail=f"AI analysis error: {str(e)}")
+
+
+@valuation_router.get("/calculate/analysis/cache", status_code=status.HTTP_200_OK)
+async def get_analysis_cache_stats(
+    analysis_cache: analysis_cache_dep,
+) -> CacheStats:
+    """
+    Hit, miss and eviction counters of the AI analysis cache of this worker.
+    """
+
+    return analysis_cache.stats
+
+
+@valuation_router.get("/calculate/analysis/queue", status_code=status.HTTP_200_OK)
+async def get_analysis_queue_stats(
+    llm_service: llm_service_dep,
+) -> AdmissionStats:
+    """
+    Model calls in flight and queued, calls admitted and turned away, and
+    how long admitted calls waited, in this worker.
+    """
+
+    if llm_service.admission is None:
+        return AdmissionStats()
+    return llm_service.admission.stats
+
+
+@valuation_router.post(
+    "/calculate/analysis/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def stream_ai_analysis(
+    result: ValuationResult,
+    llm_service: llm_service_dep,
+):
+    """
+    Stream an AI-powered analysis of the valuation results as server-sent
+    events, while the model writes it.
+
+    Each `data:` line is a JSON string with the next piece of text. The
+    stream ends with a `done` event, or an `error` event if the model fails
+    part way. Disconnecting cancels the model request.
+    """
+
+    try:
+        chunks = await llm_service.get_llm_analysis_stream(_analysis_prompt(result))
+    except AdmissionRejected as e:
+        raise _retry_later(e)
     except Exception as e:
         logger.exception(e)
         raise InternalServerException(detail=f"AI analysis error: {str(e)}")
+
+    async def events():
+        # Sent at once, so clients and proxies see the stream start before
+        # the first token.
+        yield ": analysis started\n\n"
+        try:
+            async for chunk in chunks:
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.exception(e)
+            yield f"event: error\ndata: {json.dumps(f'AI analysis error: {e}')}\n\n"
+
+    # The response closes the upstream stream and frees its admission slot,
+    # even if the client is gone before `events` first runs.
+    return ClosingStreamingResponse(
+        events(),
+        resource=chunks,
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _resolve_cpi_values(
+    input_data: ValuationInput, cpi_service: CpiService, services: AppServices
+) -> tuple[float, float]:
+    """The CPI value and October 2001 base, as floats for the vectorized engine."""
+
+    cpi_service, cpi_base = await _resolve_country_cpi(
+        input_data, cpi_service, services
+    )
+
+    year = input_data.purchase_date.year
+    index_value = cpi_service.get_cpi_october_previous_year(year=year)
+    if index_value is None:
+        raise BadRequestException(detail=f"CPI data not found for October {year - 1}")
+
+    return index_value, float(cpi_base or CPI_BASE_OCT_2001)
+
+
+async def _resolve_country_cpi(
+    input_data: ValuationInput, cpi_service: CpiService, services: AppServices
+) -> tuple[CpiService, Decimal | None]:
+    """
+    The CPI service and October 2001 base of the input's country, the default
+    service and base if it has none.
+    """
+
+    if not input_data.country:
+        return cpi_service, None
+
+    try:
+        cpi_service = await services.country_cpi_service(input_data.country)
+    except UnknownCpiCountryError:
+        raise BadRequestException(
+            detail=f"CPI country {input_data.country} is not supported"
+        )
+
+    base_value = cpi_service.get_cpi_base_oct_2001()
+    if base_value is None:
+        raise BadRequestException(
+            detail=f"CPI data not found for October 2001 in {cpi_service.country}"
+        )
+    return cpi_service, Decimal(str(base_value))
+
+
+def _retry_later(
+    e: AdmissionRejected,
+) -> TooManyRequestsException | ServiceUnavailableException:
+    # A full queue answers at once, a call that waited out its turn means
+    # the model is not keeping up.
+    if e.queue_full:
+        return TooManyRequestsException(detail=str(e), retry_after=e.retry_after)
+    return ServiceUnavailableException(detail=str(e), retry_after=e.retry_after)
+
+
+def _analysis_prompt(result: ValuationResult) -> AIPromptSchema:
+    return AIPromptSchema(
+        property_type=result.input_data.property_type,
+        purchase_date=result.input_data.purchase_date.isoformat(),
+        actual_purchase_price=result.input_data.actual_purchase_price,
+        theoretical_total_value=result.theoretical_total_value,
+        building_share_percent=result.building_share_percent,
+        land_share_percent=result.land_share_percent,
+        admin_costs=result.management_costs.administration,
+        maintenance_costs=result.management_costs.maintenance,
+        risk_amount=result.management_costs.risk_of_rent_loss,
+        risk_percentage=result.management_costs.risk_percentage,
+        index_factor=result.index_factor,
+        cpi_value=result.cpi_used.index_value,
+        cpi_base_2001=result.cpi_base_2001,
+    )
+
+
+def _parse_column_overrides(columns: list[str]) -> dict[str, str]:
+    overrides = {}
+    for value in columns:
+        source, separator, field = value.rpartition("=")
+        if not separator or not source or not field:
+            raise BadRequestException(
+                detail=f"Column mapping {value!r} is not of the form source=field"
+            )
+        overrides[source] = field
+    return overrides
+
+
+async def _spool_body(request: Request, suffix: str) -> Path:
+    """Write the request body to a temporary file, one chunk at a time."""
+
+    fd, name = tempfile.mkstemp(suffix=suffix)
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            async for chunk in request.stream():
+                await asyncio.to_thread(handle.write, chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
@@ -1,4 +1,7 @@
 from pathlib import Path
+from typing import Literal
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).resolve().parents[4]
@@ -20,9 +23,50 @@ class Settings(_BaseConfig):
     FRONTEND_URLS: list[str]
     OPENAI_API_KEY: str
     LLM: str = "gpt-4o"
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_RATE_LIMIT: float | None = None
+    LLM_RATE_BURST: int = 8
+    LLM_QUEUE_SIZE: int = 32
+    LLM_QUEUE_TIMEOUT: float = 30.0
     CPI_SOURCE_URL: str = (
         "https://www.rateinflation.com/consumer-price-index/germany-historical-cpi/"
     )
+    CPI_SOURCE_URL_TEMPLATE: str = (
+        "https://www.rateinflation.com/consumer-price-index/{slug}-historical-cpi/"
+    )
+    CPI_PARSER_BACKEND: Literal["bs4", "lxml", "stream"] = "lxml"
+    CPI_PROVIDER_TIMEOUT: float = 60.0
+    CPI_GENESIS_EXPORT_PATH: Path | None = None
+    CPI_STATIC_FILE_PATH: Path | None = None
+    CPI_SNAPSHOT_PATH: Path = BASE_DIR / "data" / "cpi_snapshot.json"
+    CPI_SHARED_SEGMENT: bool = True
+    CPI_REFRESH_JITTER: int = 300
+    LEADER_LEASE_PATH: Path = BASE_DIR / "data" / "leader.sqlite3"
+    LEADER_LEASE_TTL: float = 30.0
+    # The uvicorn workers per host, the variable uvicorn itself reads.
+    WEB_CONCURRENCY: int = 1
+    SIMULATION_WORKERS: int | None = None
+    VALUATION_CACHE_SIZE: int = 10_000
+    VALUATION_CACHE_TTL: float = 3600.0
+    VALUATION_CACHE_PATH: Path | None = None
+    ANALYSIS_CACHE_SIZE: int = 1_000
+    ANALYSIS_CACHE_TTL: float = 7 * 24 * 3600.0
+    ANALYSIS_CACHE_PATH: Path | None = BASE_DIR / "data" / "analysis_cache.sqlite3"
+
+    @field_validator(
+        "CPI_GENESIS_EXPORT_PATH",
+        "CPI_STATIC_FILE_PATH",
+        "VALUATION_CACHE_PATH",
+        "ANALYSIS_CACHE_PATH",
+        mode="before",
+    )
+    @classmethod
+    def _empty_path_is_none(cls, value):
+        # An empty variable turns an optional file off instead of naming ".".
+        return value or None
 
 
 settings = Settings()
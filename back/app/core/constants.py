@@ -1 +1,30 @@
 CPI_BASE_OCT_2001 = 84.5
+
+DEFAULT_CPI_COUNTRY = "DE"
+
+# A month as YYYY-MM.
+CPI_PERIOD_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+# Supported CPI countries (ISO 3166-1 alpha-2) and the slug of their
+# rateinflation.com historical CPI page.
+CPI_COUNTRY_SLUGS = {
+    "AT": "austria",
+    "BE": "belgium",
+    "DE": "germany",
+    "ES": "spain",
+    "FI": "finland",
+    "FR": "france",
+    "IE": "ireland",
+    "IT": "italy",
+    "NL": "netherlands",
+    "PT": "portugal",
+}
+
+# Largest grid a sensitivity sweep may compute.
+MAX_SENSITIVITY_POINTS = 100_000
+
+# Most iterations a Monte Carlo simulation may run.
+MAX_SIMULATION_ITERATIONS = 1_000_000
+
+# Most properties an implied-yield batch may solve for.
+MAX_IMPLIED_YIELD_BATCH = 10_000
@@ -13,3 +13,19 @@ class InternalServerException(Exception):
 
     def __init__(self, detail="Internal Server Error"):
         self.detail = detail
+
+
+class TooManyRequestsException(Exception):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+
+    def __init__(self, detail="Too Many Requests", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class ServiceUnavailableException(Exception):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, detail="Service Unavailable", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
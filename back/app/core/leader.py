@@ -0,0 +1,135 @@
+import asyncio
+import os
+import random
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+__all__ = ["LeaderLease"]
+
+
+class LeaderLease:
+    """
+    A time-limited leadership lease shared by the worker processes of a host,
+    kept in a local SQLite file.
+
+    The leader renews the lease every `ttl / 3` seconds. If it dies, the
+    lease runs out and the first follower to check afterwards takes over.
+    Followers check at jittered intervals so they do not all hit the
+    database at the same moment.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        name: str = "cpi_refresh",
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._clock = clock
+        self._expires_at = 0.0
+        self._elected_task: asyncio.Task | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._clock() < self._expires_at
+
+    def try_acquire(self) -> bool:
+        """Acquire the lease, or renew it if this process already holds it."""
+
+        now = self._clock()
+        try:
+            with closing(self._connect()) as db:
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute(
+                    "SELECT holder, expires_at FROM leases WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+
+                if row is not None and row[0] != self.holder and row[1] > now:
+                    db.execute("COMMIT")
+                    self._expires_at = 0.0
+                    return False
+
+                db.execute(
+                    "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET "
+                    "holder = excluded.holder, expires_at = excluded.expires_at",
+                    (self.name, self.holder, now + self.ttl),
+                )
+                db.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"Leader lease {self.name} could not be renewed: {e}")
+            return self.is_leader
+
+        self._expires_at = now + self.ttl
+        return True
+
+    def release(self) -> None:
+        """Give the lease up, so a follower can take over without waiting."""
+
+        self._expires_at = 0.0
+        try:
+            with closing(self._connect()) as db:
+                db.execute(
+                    "DELETE FROM leases WHERE name = ? AND holder = ?",
+                    (self.name, self.holder),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Leader lease {self.name} could not be released: {e}")
+
+    async def run(
+        self,
+        on_elected: Callable[[], Awaitable[None]] | None = None,
+        on_follow: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        """
+        Keep acquiring or renewing the lease until cancelled, calling
+        `on_elected` in the background whenever this process becomes leader
+        and awaiting `on_follow` after every check that left it a follower.
+        """
+
+        try:
+            while True:
+                was_leader = self.is_leader
+                is_leader = await asyncio.to_thread(self.try_acquire)
+
+                if is_leader and not was_leader:
+                    logger.info(f"Process {self.holder} is now {self.name} leader")
+                    if on_elected is not None:
+                        self._elected_task = asyncio.create_task(on_elected())
+                elif was_leader and not is_leader:
+                    logger.warning(f"Process {self.holder} lost {self.name} lease")
+
+                if not is_leader and on_follow is not None:
+                    try:
+                        await on_follow()
+                    except Exception as e:
+                        logger.error(f"{self.name} follower check failed: {e!r}")
+
+                if is_leader:
+                    await asyncio.sleep(self.ttl / 3)
+                else:
+                    await asyncio.sleep(self.ttl / 2 * random.uniform(0.5, 1.5))
+        finally:
+            if self.is_leader:
+                self.release()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS leases "
+            "(name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return db
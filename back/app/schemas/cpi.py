@@ -7,3 +7,9 @@ class CpiPeriod(BaseModel):
 
     def __hash__(self) -> int:
         return hash((self.year, self.month))
+
+
+class CpiRange(BaseModel):
+    version: int
+    periods: list[str]
+    values: list[float | None]
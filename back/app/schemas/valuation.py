@@ -1,11 +1,17 @@
 from decimal import Decimal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import date
 from enum import StrEnum
 from typing import Optional
 
-from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.core.constants import (
+    CPI_BASE_OCT_2001,
+    CPI_PERIOD_PATTERN,
+    MAX_IMPLIED_YIELD_BATCH,
+    MAX_SENSITIVITY_POINTS,
+    MAX_SIMULATION_ITERATIONS,
+)
 
 
 class PropertyType(StrEnum):
@@ -25,6 +31,8 @@ class ValuationInput(BaseModel):
     remaining_useful_life: Decimal = Field(..., gt=0)
     property_yield: Decimal = Field(..., gt=0, le=100)
     actual_purchase_price: Optional[Decimal] = Field(None, gt=0)
+    # ISO 3166-1 alpha-2 code of the CPI to index with, Germany if not set.
+    country: Optional[str] = Field(None, pattern=r"^[A-Za-z]{2}$")
 
 
 class CpiData(BaseModel):
@@ -66,6 +74,257 @@ class ValuationResult(BaseModel):
     actual_land_value: Optional[Decimal] = None
 
 
+class BatchValuationItem(BaseModel):
+    """One line of a batch valuation response, either a result or an error."""
+
+    index: int
+    result: Optional[ValuationResult] = None
+    error: Optional[str] = None
+
+
+class SensitivityParameter(StrEnum):
+    MONTHLY_NET_RENT = "monthly_net_rent"
+    LIVING_AREA = "living_area"
+    LAND_VALUE_PER_SQM = "land_value_per_sqm"
+    PLOT_AREA = "plot_area"
+    REMAINING_USEFUL_LIFE = "remaining_useful_life"
+    PROPERTY_YIELD = "property_yield"
+
+
+class SensitivityRange(BaseModel):
+    """The values start, start + step, ... up to and including stop."""
+
+    parameter: SensitivityParameter
+    start: Decimal = Field(..., gt=0)
+    stop: Decimal = Field(..., gt=0)
+    step: Decimal = Field(..., gt=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self) -> "SensitivityRange":
+        if self.stop < self.start:
+            raise ValueError("stop must not be below start")
+        if self.parameter == SensitivityParameter.PROPERTY_YIELD and self.stop > 100:
+            raise ValueError("property_yield must not exceed 100")
+        return self
+
+    @property
+    def count(self) -> int:
+        return int((self.stop - self.start) // self.step) + 1
+
+    def values(self) -> list[Decimal]:
+        return [self.start + i * self.step for i in range(self.count)]
+
+
+class SensitivityRequest(BaseModel):
+    input_data: ValuationInput
+    ranges: list[SensitivityRange] = Field(..., min_length=1, max_length=3)
+
+    @model_validator(mode="after")
+    def check_grid(self) -> "SensitivityRequest":
+        parameters = [r.parameter for r in self.ranges]
+        if len(set(parameters)) != len(parameters):
+            raise ValueError("each parameter can only be swept once")
+
+        points = 1
+        for r in self.ranges:
+            points *= r.count
+        if points > MAX_SENSITIVITY_POINTS:
+            raise ValueError(
+                f"grid of {points} points exceeds {MAX_SENSITIVITY_POINTS} points"
+            )
+        return self
+
+
+class SensitivityResult(BaseModel):
+    """
+    Results over the Cartesian grid of the swept values, flattened in row-major
+    order: the last parameter varies fastest.
+    """
+
+    parameters: list[SensitivityParameter]
+    axes: list[list[float]]
+    shape: list[int]
+    theoretical_total_value: list[float]
+    building_share_percent: list[float]
+    land_share_percent: list[float]
+
+
+class DistributionKind(StrEnum):
+    NORMAL = "normal"
+    UNIFORM = "uniform"
+    TRIANGULAR = "triangular"
+
+
+class Distribution(BaseModel):
+    """
+    A normal distribution (`mean`, `std`), a uniform one (`low`, `high`) or
+    a triangular one (`low`, `mode`, `high`).
+    """
+
+    kind: DistributionKind
+    mean: Optional[float] = None
+    std: Optional[float] = Field(None, ge=0)
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_parameters(self) -> "Distribution":
+        if self.kind == DistributionKind.NORMAL:
+            if self.mean is None or self.std is None:
+                raise ValueError("a normal distribution needs mean and std")
+        elif self.low is None or self.high is None or self.low > self.high:
+            raise ValueError(f"a {self.kind} distribution needs low <= high")
+        elif self.kind == DistributionKind.TRIANGULAR and not (
+            self.mode is not None and self.low <= self.mode <= self.high > self.low
+        ):
+            raise ValueError(
+                "a triangular distribution needs low <= mode <= high, low < high"
+            )
+        return self
+
+
+class SimulationRequest(BaseModel):
+    """
+    Distributions of the uncertain inputs of a valuation, the others are
+    taken from `input_data`. `property_yield` is in percent,
+    `monthly_net_rent` in euros, `vacancy` the percentage of rent lost and
+    `cpi_drift` the percentage change of the CPI until the valuation date.
+    """
+
+    input_data: ValuationInput
+    property_yield: Optional[Distribution] = None
+    monthly_net_rent: Optional[Distribution] = None
+    vacancy: Optional[Distribution] = None
+    cpi_drift: Optional[Distribution] = None
+    iterations: int = Field(10_000, ge=100, le=MAX_SIMULATION_ITERATIONS)
+    seed: Optional[int] = Field(None, ge=0)
+    bins: int = Field(50, ge=1, le=1000)
+
+
+class Histogram(BaseModel):
+    edges: list[float]
+    counts: list[int]
+
+
+class SimulationResult(BaseModel):
+    iterations: int
+    # The seed the run used, pass it again to reproduce the run.
+    seed: int
+    mean: float
+    std: float
+    percentiles: dict[str, float]
+    histogram: Histogram
+
+
+class ImpliedYieldRequest(BaseModel):
+    """
+    Solve for the yield at which the theoretical total value equals
+    `input_data.actual_purchase_price`, starting from
+    `input_data.property_yield`.
+    """
+
+    input_data: ValuationInput
+
+    @model_validator(mode="after")
+    def check_price(self) -> "ImpliedYieldRequest":
+        if self.input_data.actual_purchase_price is None:
+            raise ValueError("an implied yield needs actual_purchase_price")
+        return self
+
+
+class ImpliedYieldBatchRequest(BaseModel):
+    inputs: list[ValuationInput] = Field(
+        ..., min_length=1, max_length=MAX_IMPLIED_YIELD_BATCH
+    )
+
+    @model_validator(mode="after")
+    def check_prices(self) -> "ImpliedYieldBatchRequest":
+        missing = [
+            i
+            for i, input_data in enumerate(self.inputs)
+            if input_data.actual_purchase_price is None
+        ]
+        if missing:
+            raise ValueError(f"inputs {missing[:10]} have no actual_purchase_price")
+        return self
+
+
+class ImpliedYieldStatus(StrEnum):
+    CONVERGED = "converged"
+    # The price is outside the values any yield in (0, 100] % gives.
+    NO_SOLUTION = "no_solution"
+    MAX_ITERATIONS = "max_iterations"
+
+
+class ImpliedYieldResult(BaseModel):
+    # In percent, None without a solution.
+    property_yield: Optional[float]
+    status: ImpliedYieldStatus
+    iterations: int
+    # Iterations that fell back from a Newton step to bisection.
+    bisections: int
+    # Theoretical total value minus the price at `property_yield`, unrounded.
+    residual: Optional[float]
+
+
+class ImpliedYieldBatchResult(BaseModel):
+    results: list[ImpliedYieldResult]
+    converged: int
+    max_iterations: int
+
+
+class TimelineRequest(BaseModel):
+    """The valuation of `input_data` as if bought in each month start..end."""
+
+    input_data: ValuationInput
+    start: str = Field("2002-01", pattern=CPI_PERIOD_PATTERN)
+    # The current month if not set.
+    end: Optional[str] = Field(None, pattern=CPI_PERIOD_PATTERN)
+
+    @model_validator(mode="after")
+    def check_span(self) -> "TimelineRequest":
+        today = date.today()
+        if self.end is None:
+            self.end = f"{today.year:04d}-{today.month:02d}"
+        if self.start > self.end:
+            raise ValueError("start must not be after end")
+        if self.start < "2002-01" or int(self.end[:4]) > today.year:
+            raise ValueError("the span must lie between 2002 and this year")
+        return self
+
+    def months(self) -> tuple[int, int]:
+        """The first and last month as months since year 0."""
+
+        return _month_number(self.start), _month_number(self.end)
+
+
+def _month_number(period: str) -> int:
+    return int(period[:4]) * 12 + int(period[5:]) - 1
+
+
+class TimelineResult(BaseModel):
+    """
+    Valuations as columnar arrays, one entry per month of `periods`. Months
+    without the CPI of the previous October are None throughout.
+    """
+
+    # Version of the CPI snapshot the values come from.
+    version: int
+    periods: list[str]
+    cpi_value: list[Optional[float]]
+    index_factor: list[Optional[float]]
+    management_costs_total: list[Optional[float]]
+    annual_net_income: list[Optional[float]]
+    building_net_income: list[Optional[float]]
+    theoretical_building_value: list[Optional[float]]
+    theoretical_total_value: list[Optional[float]]
+    building_share_percent: list[Optional[float]]
+    land_share_percent: list[Optional[float]]
+    actual_building_value: list[Optional[float]]
+    actual_land_value: list[Optional[float]]
+
+
 class AIAnalysisRequest(BaseModel):
     valuation_result: ValuationResult
 
@@ -0,0 +1,37 @@
+import hashlib
+
+from back.app.schemas.valuation import AIPromptSchema
+from back.app.services.result_cache import ResultCache
+
+__all__ = ["AnalysisCache", "analysis_key"]
+
+_PROMPT_FIELDS = tuple(AIPromptSchema.model_fields)
+
+
+def analysis_key(
+    model: str, system_prompt: str, main_prompt: str, data: AIPromptSchema
+) -> str:
+    """
+    A SHA-256 of everything an analysis depends on: the model, both prompts
+    as sent and the prompt fields they were rendered from.
+
+    The rendered prompt rounds some fields, the fields themselves keep the
+    key apart for inputs that only differ past that rounding. Editing a
+    prompt changes the key, so analyses of an older prompt are never served.
+    """
+
+    parts = [f"model={model}", f"system={system_prompt}", f"user={main_prompt}"]
+    parts += [f"{name}={getattr(data, name)}" for name in _PROMPT_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class AnalysisCache(ResultCache[str]):
+    """AI analyses by `analysis_key`, every hit saves a model round trip."""
+
+    TABLE = "analyses"
+
+    def _dump(self, result: str) -> str:
+        return result
+
+    def _load(self, text: str) -> str:
+        return text
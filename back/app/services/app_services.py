@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+
+import httpx
+from openai import DefaultAsyncHttpxClient
+
+from back.app.core.config import settings
+from back.app.core.constants import DEFAULT_CPI_COUNTRY
+from back.app.services.analysis_cache import AnalysisCache
+from back.app.services.cpi_parser_service import HistoricalCpiParser
+from back.app.services.cpi_registry import CpiRegistry
+from back.app.services.cpi_service import CpiService
+from back.app.services.implied_yield_service import ImpliedYieldService
+from back.app.services.index_constants import IndexConstantsTable
+from back.app.services.llm_admission import LLMAdmission
+from back.app.services.llm_service import LLMService
+from back.app.services.multiplier_table import MultiplierTable
+from back.app.services.sensitivity_service import SensitivityService
+from back.app.services.simulation_service import (
+    SimulationService,
+    default_simulation_workers,
+)
+from back.app.services.timeline_service import TimelineService
+from back.app.services.valuation_cache import ValuationCache
+from back.app.services.valuation_engine import ValuationEngine
+from back.app.services.valuation_service import ValuationService
+
+__all__ = ["AppServices", "llm_http_client"]
+
+
+def llm_http_client() -> httpx.AsyncClient:
+    """
+    The connection pool of the model provider, with the OpenAI client's
+    timeouts and the limits from the settings. Idle connections are kept
+    open for `LLM_KEEPALIVE_EXPIRY` seconds, so consecutive analyses reuse
+    them instead of paying a new TLS handshake each.
+    """
+
+    return DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        )
+    )
+
+
+@dataclass
+class AppServices:
+    """
+    The services of one application, created once when it starts and kept
+    in `app.state`, see `get_app_services`, and closed with `aclose` when it
+    stops. None of them hold state of a request, so requests share them.
+    """
+
+    cpi_registry: CpiRegistry
+    valuation_service: ValuationService
+    # Portfolio rows are rarely valued twice, caching them would only push
+    # the interactive results out.
+    uncached_valuation_service: ValuationService
+    llm_service: LLMService
+    sensitivity_service: SensitivityService
+    implied_yield_service: ImpliedYieldService
+    timeline_service: TimelineService
+    simulation_service: SimulationService
+    _cpi_services: dict[str, CpiService] = field(default_factory=dict)
+
+    @classmethod
+    def create(
+        cls, caches: bool = True, cpi_registry: CpiRegistry | None = None
+    ) -> "AppServices":
+        """
+        The services as configured by the settings, `caches` off for none,
+        reading the CPI of `cpi_registry`, a new registry of all supported
+        countries by default.
+        """
+
+        valuation_cache = analysis_cache = None
+        if caches:
+            valuation_cache = ValuationCache(
+                maxsize=settings.VALUATION_CACHE_SIZE,
+                ttl=settings.VALUATION_CACHE_TTL,
+                path=settings.VALUATION_CACHE_PATH,
+            )
+            analysis_cache = AnalysisCache(
+                maxsize=settings.ANALYSIS_CACHE_SIZE,
+                ttl=settings.ANALYSIS_CACHE_TTL,
+                path=settings.ANALYSIS_CACHE_PATH,
+            )
+
+        # Both valuation services read the same multipliers and index
+        # constants, whether the result is cached or not.
+        multipliers = MultiplierTable()
+        index_tables: dict[str, IndexConstantsTable] = {}
+        engine = ValuationEngine()
+        return cls(
+            cpi_registry=cpi_registry if cpi_registry is not None else CpiRegistry(),
+            valuation_service=ValuationService(
+                cache=valuation_cache,
+                multipliers=multipliers,
+                index_tables=index_tables,
+            ),
+            uncached_valuation_service=ValuationService(
+                multipliers=multipliers, index_tables=index_tables
+            ),
+            llm_service=LLMService(
+                api_key=settings.OPENAI_API_KEY,
+                model=settings.LLM,
+                cache=analysis_cache,
+                http_client=llm_http_client(),
+                admission=LLMAdmission(
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    rate=settings.LLM_RATE_LIMIT,
+                    burst=settings.LLM_RATE_BURST,
+                    max_queue=settings.LLM_QUEUE_SIZE,
+                    queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+                ),
+            ),
+            sensitivity_service=SensitivityService(engine=engine),
+            implied_yield_service=ImpliedYieldService(engine=engine),
+            timeline_service=TimelineService(engine=engine),
+            simulation_service=SimulationService(
+                max_workers=settings.SIMULATION_WORKERS or default_simulation_workers()
+            ),
+        )
+
+    def cpi_service(self, parser: HistoricalCpiParser) -> CpiService:
+        """The CpiService of a country's parser, one per parser."""
+
+        service = self._cpi_services.get(parser.country)
+        if service is None or service.parser is not parser:
+            service = CpiService(cpi_parser_service=parser)
+            self._cpi_services[parser.country] = service
+        return service
+
+    async def country_cpi_service(
+        self, country: str = DEFAULT_CPI_COUNTRY
+    ) -> CpiService:
+        """
+        The CpiService of a country, its CPI loaded first, see
+        `CpiRegistry.acquire`. Raises UnknownCpiCountryError for a country
+        that is not supported.
+        """
+
+        return self.cpi_service(await self.cpi_registry.acquire(country))
+
+    async def aclose(self) -> None:
+        self.simulation_service.shutdown()
+        await self.llm_service.aclose()
+        for cache in (self.valuation_service.cache, self.llm_service.cache):
+            if cache is not None:
+                cache.close()
+        await self.cpi_registry.aclose()
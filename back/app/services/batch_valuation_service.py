@@ -0,0 +1,112 @@
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable
+
+from loguru import logger
+from pydantic import ValidationError
+
+from back.app.core.constants import DEFAULT_CPI_COUNTRY
+from back.app.schemas.valuation import BatchValuationItem, CpiData, ValuationInput
+from back.app.services.cpi_registry import UnknownCpiCountryError
+from back.app.services.cpi_service import CpiService
+from back.app.services.index_constants import IndexConstants
+from back.app.services.json_stream import JsonStreamError
+from back.app.services.valuation_service import ValuationService
+
+_CpiLookup = tuple[float, Decimal | None, IndexConstants | None] | ValueError
+
+
+class BatchValuationService:
+    """
+    Values a stream of inputs one at a time, so memory does not grow with the
+    batch. The CPI of each distinct (country, year) is resolved once per
+    batch, and a bad item only fails its own line.
+
+    `country_cpi_service` returns the CpiService of the other countries, such
+    as `AppServices.country_cpi_service`.
+    """
+
+    def __init__(
+        self,
+        valuation_service: ValuationService,
+        cpi_service: CpiService,
+        country_cpi_service: Callable[[str], Awaitable[CpiService]],
+    ):
+        self._valuation_service = valuation_service
+        self._cpi_service = cpi_service
+        self._country_cpi_service = country_cpi_service
+
+    async def calculate(
+        self, items: AsyncIterable[Any]
+    ) -> AsyncIterator[BatchValuationItem]:
+        cpi_cache: dict[tuple[str, int], _CpiLookup] = {}
+        index = 0
+
+        async for item in items:
+            yield await self._calculate_item(index, item, cpi_cache)
+            index += 1
+
+    async def _calculate_item(
+        self, index: int, item: Any, cpi_cache: dict[tuple[str, int], _CpiLookup]
+    ) -> BatchValuationItem:
+        if isinstance(item, JsonStreamError):
+            return BatchValuationItem(index=index, error=str(item))
+
+        try:
+            input_data = ValuationInput.model_validate(item)
+        except ValidationError as e:
+            return BatchValuationItem(index=index, error=_format_validation_error(e))
+
+        year = input_data.purchase_date.year
+        country = (input_data.country or DEFAULT_CPI_COUNTRY).upper()
+
+        key = (country, year)
+        if key not in cpi_cache:
+            cpi_cache[key] = await self._lookup_cpi(country, year)
+        cpi = cpi_cache[key]
+        if isinstance(cpi, ValueError):
+            return BatchValuationItem(index=index, error=str(cpi))
+
+        index_value, cpi_base, constants = cpi
+        cpi_data = CpiData(
+            year=year, month=input_data.purchase_date.month, index_value=index_value
+        )
+
+        try:
+            result = self._valuation_service.calculate_valuation(
+                input_data, cpi_data, cpi_base=cpi_base, constants=constants
+            )
+        except Exception as e:
+            logger.exception(e)
+            return BatchValuationItem(index=index, error=f"Calculation error: {e}")
+
+        return BatchValuationItem(index=index, result=result)
+
+    async def _lookup_cpi(self, country: str, year: int) -> _CpiLookup:
+        cpi_service = self._cpi_service
+        cpi_base = None
+
+        if country != DEFAULT_CPI_COUNTRY:
+            try:
+                cpi_service = await self._country_cpi_service(country)
+            except UnknownCpiCountryError:
+                return ValueError(f"CPI country {country} is not supported")
+
+            base_value = cpi_service.get_cpi_base_oct_2001()
+            if base_value is None:
+                return ValueError(f"CPI data not found for October 2001 in {country}")
+            cpi_base = Decimal(str(base_value))
+
+        index_value = cpi_service.get_cpi_october_previous_year(year=year)
+        if index_value is None:
+            return ValueError(f"CPI data not found for October {year - 1}")
+        constants = self._valuation_service.get_index_constants(
+            cpi_service, year, cpi_base=cpi_base
+        )
+        return index_value, cpi_base, constants
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc']) or 'input'}: {e['msg']}"
+        for e in error.errors()
+    )
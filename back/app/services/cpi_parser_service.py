@@ -1,96 +1,283 @@
-import httpx
-from bs4 import BeautifulSoup
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
 
 from back.app.core.config import settings
-from back.app.schemas.cpi import CpiPeriod
+from back.app.core.constants import DEFAULT_CPI_COUNTRY
+from back.app.services.cpi_providers import CpiProvider, default_cpi_providers
+from back.app.services.cpi_segment import CpiSegment
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
 
 from loguru import logger
 
-__all__ = ["germany_historical_cpi_parser"]
+__all__ = ["HistoricalCpiParser"]
 
+SNAPSHOT_FORMAT_VERSION = 2
 
-class GermanyHistoricalCpiParser:
-    def __init__(self):
-        self._cpi_data: dict[CpiPeriod, float] = {}
-        self.url = settings.CPI_SOURCE_URL
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
 
-    months = {
-        "jan": "01",
-        "feb": "02",
-        "mar": "03",
-        "apr": "04",
-        "may": "05",
-        "jun": "06",
-        "jul": "07",
-        "aug": "08",
-        "sep": "09",
-        "oct": "10",
-        "nov": "11",
-        "dec": "12",
-    }
-
-    def get_cpi_period_data(self, period: CpiPeriod) -> CpiPeriod | None:
-        return self._cpi_data.get(period)
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError)),
-        reraise=True,
-    )
-    async def _fetch_page(self) -> bytes:
-        async with httpx.AsyncClient(headers=self.headers, timeout=30) as client:
-            response = await client.get(self.url)
-            response.raise_for_status()
-            return response.content
+class HistoricalCpiParser:
+    def __init__(
+        self,
+        country: str = DEFAULT_CPI_COUNTRY,
+        snapshot_path: Path | None = None,
+        providers: list[CpiProvider] | None = None,
+        shared: bool | None = None,
+    ):
+        self.country = country
+        self._snapshot = CpiSnapshot()
+        self.snapshot_path = snapshot_path or _default_snapshot_path(country)
+        self.providers = (
+            providers if providers is not None else default_cpi_providers(country)
+        )
+
+        # With several workers on a host, one of them refreshes and publishes
+        # into a shared segment, the others read it zero-copy.
+        if settings.CPI_SHARED_SEGMENT if shared is None else shared:
+            self.segment = CpiSegment(self.snapshot_path.with_suffix(".seg"))
+        else:
+            self.segment = None
+
+    @property
+    def snapshot(self) -> CpiSnapshot:
+        if self.segment is not None:
+            published = self.segment.latest()
+            if (
+                published is not None
+                and published is not self._snapshot
+                and published.version >= self._snapshot.version
+            ):
+                self._snapshot = published
+        return self._snapshot
+
+    def get_cpi_value(self, year: int, month: int) -> float | None:
+        return self.snapshot.series.get(year, month)
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.aclose()
+        if self.segment is not None:
+            self.segment.close()
 
     async def parse_into_mapper(self) -> None:
-        html = await self._fetch_page()
+        """
+        Query all providers concurrently and publish the freshest complete
+        result. A slow or failing provider only loses its own vote.
+
+        With a shared segment this runs under its host-wide lock. If another
+        worker is refreshing the same country right now, this one only waits
+        for its result, and only when it has no data yet.
+        """
 
-        soup = BeautifulSoup(html, "html.parser")
+        if self.segment is None:
+            await self._refresh()
+            return
 
-        table = soup.find("table")
-        if not table:
-            logger.warning("CPI table not found, CPI data not updated")
+        if not self.segment.try_lock():
+            if not len(self.snapshot.series):
+                await self._wait_for_segment()
             return
 
-        headers_row = [
-            th.text.strip().lower() for th in table.find("thead").find_all("th")
+        try:
+            # Another worker may have refreshed since this one last did:
+            # continue from its snapshot and provider state, and make sure
+            # readers can see it.
+            self.load_snapshot()
+            published = self.segment.latest(force=True)
+            if self._snapshot.version > (published.version if published else 0):
+                self._share_snapshot()
+
+            await self._refresh()
+        finally:
+            self.segment.unlock()
+
+    async def _refresh(self) -> None:
+        results = await asyncio.gather(
+            *(self._fetch_from(provider) for provider in self.providers)
+        )
+        candidates = [
+            (series, rank) for rank, series in enumerate(results) if series is not None
         ]
+        if not candidates:
+            logger.info(
+                f"No CPI provider returned new data for {self.country}, "
+                "CPI data not updated"
+            )
+            return
+
+        # Freshest last month wins, ties go to the provider listed first.
+        series, rank = max(
+            candidates, key=lambda candidate: (candidate[0].last_period, -candidate[1])
+        )
+        provider = self.providers[rank]
+
+        # Never fall back to staler data from another source, but let the
+        # source of the current snapshot retract months it published.
+        current = self.snapshot
+        if provider.name != current.source and (series.last_period, -rank) < (
+            current.series.last_period or (0, 0),
+            -self._provider_rank(current.source),
+        ):
+            logger.info(
+                f"CPI data from {provider.name} is older than snapshot "
+                f"v{current.version}, CPI data not updated"
+            )
+        elif series == current.series:
+            logger.info(f"CPI data for {self.country} unchanged, not republished")
+        else:
+            self._publish(series, source=provider.name)
+            logger.info(
+                f"CPI parser finished, {self.country} snapshot "
+                f"v{self._snapshot.version} published "
+                f"from {provider.name}, total records in mapper: {len(series)}",
+            )
+
+        # Provider change-detection state moved on, persist it even if the
+        # published data did not.
+        self._save_snapshot()
+
+    async def _fetch_from(self, provider: CpiProvider) -> CpiSeries | None:
+        try:
+            rows = await asyncio.wait_for(provider.fetch(), timeout=provider.timeout)
+        except Exception as e:
+            logger.warning(
+                f"CPI provider {provider.name} ({self.country}) failed: {e!r}"
+            )
+            return None
 
-        for tr in table.find("tbody").find_all("tr"):
-            cells = tr.find_all("td")
-            if not cells:
-                continue
+        if rows is None:
+            logger.info(
+                f"CPI provider {provider.name} ({self.country}): source not modified"
+            )
+            return None
 
-            year_str = cells[0].text.strip()
-            if not year_str.isdigit():
-                continue
-            year = int(year_str)
+        series = CpiSeries.from_items(rows)
+        if not series.is_contiguous():
+            logger.warning(
+                f"CPI provider {provider.name} ({self.country}) returned incomplete "
+                "data, ignored"
+            )
+            return None
+        return series
 
-            for i in range(1, len(cells)):
-                if i >= len(headers_row):
-                    break
-                month_name = headers_row[i]
-                month_num = self.months.get(month_name.lower())
-                value = cells[i].text.strip()
+    async def _wait_for_segment(self) -> None:
+        deadline = asyncio.get_running_loop().time() + settings.CPI_PROVIDER_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            if self.segment.latest(force=True) is not None:
+                return
+            await asyncio.sleep(0.25)
 
-                if month_num and value:
-                    key = CpiPeriod(year=year, month=month_num)
-                    self._cpi_data[key] = float(value.replace(",", "."))
+        logger.warning(f"No {self.country} CPI data published by the refresher yet")
+
+    def _provider_rank(self, name: str | None) -> int:
+        for rank, provider in enumerate(self.providers):
+            if provider.name == name:
+                return rank
+        return len(self.providers)
+
+    def _publish(self, series: CpiSeries, source: str | None = None) -> None:
+        # A single reference swap: readers see either the old or the new
+        # snapshot, never a mix of both.
+        self._snapshot = CpiSnapshot(
+            version=self._snapshot.version + 1,
+            built_at=datetime.now(timezone.utc),
+            series=series,
+            source=source,
+        )
+        if self.segment is not None and self.segment.is_locked:
+            self._share_snapshot()
+
+    def _share_snapshot(self) -> None:
+        self.segment.publish(self._snapshot)
+
+        # Serve the shared copy from now on, the private one can go.
+        shared = self.segment.latest(force=True)
+        if shared is not None and shared.version == self._snapshot.version:
+            self._snapshot = shared
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the last successfully parsed CPI data from disk.
+
+        Called synchronously at startup so requests are served before the first
+        network refresh completes. Returns False if no usable snapshot exists.
+        """
+
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            logger.info(f"No CPI snapshot found at {self.snapshot_path}")
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"CPI snapshot {self.snapshot_path} is unreadable: {e}")
+            return False
+
+        current_version = self._snapshot.version
+        if current_version and snapshot.get("version", 0) <= current_version:
+            # Nothing newer than what is already served, never go back.
+            return False
+
+        if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            logger.warning(
+                f"CPI snapshot format {snapshot.get('format_version')} is not "
+                f"supported, expected {SNAPSHOT_FORMAT_VERSION}"
+            )
+            return False
+
+        series = CpiSeries.from_items(
+            (int(period[:4]), int(period[5:]), float(value))
+            for period, value in snapshot["data"].items()
+        )
+        self._snapshot = CpiSnapshot(
+            version=snapshot["version"],
+            built_at=datetime.fromisoformat(snapshot["built_at"]),
+            series=series,
+            source=snapshot.get("source"),
+        )
 
         logger.info(
-            f"CPI parser finished, total records in mapper: {len(self._cpi_data)}",
+            f"{self.country} CPI snapshot v{snapshot['version']} from "
+            f"{snapshot['built_at']} "
+            f"loaded, total records in mapper: {len(series)}"
         )
 
+        provider_states = snapshot.get("providers", {})
+        for provider in self.providers:
+            provider.restore(provider_states.get(provider.name, {}))
+        return True
+
+    def _save_snapshot(self) -> None:
+        published = self._snapshot
+        snapshot = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "version": published.version,
+            "built_at": published.built_at.isoformat(),
+            "source": published.source,
+            "providers": {
+                provider.name: provider.state() for provider in self.providers
+            },
+            "data": {
+                f"{year:04d}-{month:02d}": value
+                for year, month, value in published.series.items()
+            },
+        }
+
+        # Write next to the target and rename, so a crash mid-write never
+        # leaves a truncated snapshot behind.
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"CPI snapshot could not be saved: {e}")
+
 
-germany_historical_cpi_parser = GermanyHistoricalCpiParser()
+def _default_snapshot_path(country: str) -> Path:
+    # The default country keeps the configured path, so existing snapshots
+    # stay valid; every other country gets a sibling file.
+    path = settings.CPI_SNAPSHOT_PATH
+    if country == DEFAULT_CPI_COUNTRY:
+        return path
+    return path.with_stem(f"{path.stem}_{country.lower()}")
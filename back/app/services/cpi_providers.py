@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+from tenacity import (
+    retry,
+    stop_after_attempt,
+    wait_exponential,
+    retry_if_exception_type,
+)
+
+from back.app.core.config import settings
+from back.app.core.constants import CPI_COUNTRY_SLUGS, DEFAULT_CPI_COUNTRY
+from back.app.services.cpi_table_parser import (
+    CpiParserBackend,
+    CpiRows,
+    parse_cpi_table,
+)
+
+__all__ = [
+    "CpiProvider",
+    "RateInflationHtmlProvider",
+    "GenesisExportProvider",
+    "StaticFileProvider",
+    "default_cpi_providers",
+    "parse_genesis_export",
+]
+
+GENESIS_MONTHS = {
+    "januar": 1,
+    "februar": 2,
+    "märz": 3,
+    "april": 4,
+    "mai": 5,
+    "juni": 6,
+    "juli": 7,
+    "august": 8,
+    "september": 9,
+    "oktober": 10,
+    "november": 11,
+    "dezember": 12,
+}
+
+
+class _Page(NamedTuple):
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+
+
+class CpiProvider(ABC):
+    """
+    A source of monthly CPI rows.
+
+    `fetch` returns None when the source has nothing new since the previous
+    fetch, so an unchanged source costs no parsing. `state` / `restore` let
+    the refresher persist that change-detection state with the snapshot.
+    """
+
+    name: str
+    timeout: float
+
+    @abstractmethod
+    async def fetch(self) -> CpiRows | None: ...
+
+    def state(self) -> dict:
+        return {}
+
+    def restore(self, state: dict) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RateInflationHtmlProvider(CpiProvider):
+    name = "rateinflation_html"
+
+    def __init__(
+        self,
+        url: str,
+        parser_backend: CpiParserBackend = "lxml",
+        timeout: float = 60,
+    ):
+        self.url = url
+        self.parser_backend = parser_backend
+        self.timeout = timeout
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        }
+        self._client: httpx.AsyncClient | None = None
+
+        # Validators of the last page we parsed, sent back on the next refresh
+        # so an unchanged page costs a 304 instead of a download and re-parse.
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._content_hash: str | None = None
+
+    async def fetch(self) -> CpiRows | None:
+        page = await self._fetch_page()
+        if page is None:
+            return None
+
+        # Parsing is CPU-bound, keep it off the event loop so in-flight
+        # requests are not stalled while the page is processed.
+        rows = await asyncio.to_thread(
+            parse_cpi_table, page.content, self.parser_backend
+        )
+        if rows is None:
+            raise ValueError("CPI table not found on page")
+
+        # Only remember the validators once the page has been parsed, a
+        # fetch cancelled by the refresher's timeout must not mark the page
+        # as already seen.
+        self._etag = page.etag
+        self._last_modified = page.last_modified
+        self._content_hash = page.content_hash
+        return rows
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError)),
+        reraise=True,
+    )
+    async def _fetch_page(self) -> _Page | None:
+        """
+        Fetch the CPI page, returning None if it has not changed since the
+        last fetch.
+        """
+
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        response = await self._get_client().get(self.url, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return None
+        response.raise_for_status()
+
+        # Not every server honours conditional requests, so fall back to
+        # comparing the body itself.
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if content_hash == self._content_hash:
+            return None
+
+        return _Page(
+            content=response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=content_hash,
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=30,
+                http2=True,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+        return self._client
+
+    def state(self) -> dict:
+        return {
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "content_hash": self._content_hash,
+        }
+
+    def restore(self, state: dict) -> None:
+        self._etag = state.get("etag")
+        self._last_modified = state.get("last_modified")
+        self._content_hash = state.get("content_hash")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class _LocalFileProvider(CpiProvider):
+    def __init__(self, path: Path, timeout: float = 10):
+        self.path = path
+        self.timeout = timeout
+        self._content_hash: str | None = None
+
+    async def fetch(self) -> CpiRows | None:
+        result = await asyncio.to_thread(self._read, self._content_hash)
+        if result is None:
+            return None
+
+        rows, self._content_hash = result
+        return rows
+
+    def _read(self, known_hash: str | None) -> tuple[CpiRows, str] | None:
+        content = self.path.read_bytes()
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash == known_hash:
+            return None
+        return self._parse(content), content_hash
+
+    @abstractmethod
+    def _parse(self, content: bytes) -> CpiRows: ...
+
+    def state(self) -> dict:
+        return {"content_hash": self._content_hash}
+
+    def restore(self, state: dict) -> None:
+        self._content_hash = state.get("content_hash")
+
+
+class GenesisExportProvider(_LocalFileProvider):
+    """
+    A table export from Destatis GENESIS-Online (e.g. 61111-0004,
+    Verbraucherpreisindex: Deutschland, Monate), either the semicolon CSV
+    download or the JSON response of the data/table endpoint, which wraps
+    the same CSV in Object.Content.
+    """
+
+    name = "destatis_genesis"
+
+    def _parse(self, content: bytes) -> CpiRows:
+        if self.path.suffix.lower() == ".json":
+            text = json.loads(content)["Object"]["Content"]
+        else:
+            # GENESIS offers both UTF-8 and ISO-8859-1 downloads.
+            try:
+                text = content.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                text = content.decode("latin-1")
+        return parse_genesis_export(text)
+
+
+class StaticFileProvider(_LocalFileProvider):
+    """
+    A local JSON file mapping "YYYY-MM" to the CPI value. A CPI snapshot file
+    written by the refresher is accepted as well.
+    """
+
+    name = "static_file"
+
+    def _parse(self, content: bytes) -> CpiRows:
+        data = json.loads(content)
+        if "data" in data:
+            data = data["data"]
+
+        return [
+            (int(period[:4]), int(period[5:7]), float(value))
+            for period, value in data.items()
+        ]
+
+
+def parse_genesis_export(text: str) -> CpiRows:
+    """
+    Extract (year, month, value) rows from a GENESIS CSV export.
+
+    Data lines look like `2023;Oktober;117,8;...`. Header and footer lines,
+    and values GENESIS marks as missing ("...", "-", "."), are skipped.
+    """
+
+    rows: CpiRows = []
+
+    for line in text.splitlines():
+        fields = [field.strip() for field in line.split(";")]
+        if len(fields) < 3 or not (fields[0].isdigit() and len(fields[0]) == 4):
+            continue
+
+        month = GENESIS_MONTHS.get(fields[1].lower())
+        value = fields[2].replace(",", ".")
+        if month is None:
+            continue
+
+        try:
+            rows.append((int(fields[0]), month, float(value)))
+        except ValueError:
+            continue
+
+    return rows
+
+
+def default_cpi_providers(country: str = DEFAULT_CPI_COUNTRY) -> list[CpiProvider]:
+    """Providers configured in settings for a country, in order of preference."""
+
+    if country == DEFAULT_CPI_COUNTRY:
+        url = settings.CPI_SOURCE_URL
+    else:
+        url = settings.CPI_SOURCE_URL_TEMPLATE.format(slug=CPI_COUNTRY_SLUGS[country])
+
+    providers: list[CpiProvider] = [
+        RateInflationHtmlProvider(
+            url=url,
+            parser_backend=settings.CPI_PARSER_BACKEND,
+            timeout=settings.CPI_PROVIDER_TIMEOUT,
+        )
+    ]
+    # GENESIS and the static file only carry the German CPI.
+    if country != DEFAULT_CPI_COUNTRY:
+        return providers
+
+    if settings.CPI_GENESIS_EXPORT_PATH:
+        providers.append(GenesisExportProvider(settings.CPI_GENESIS_EXPORT_PATH))
+    if settings.CPI_STATIC_FILE_PATH:
+        providers.append(StaticFileProvider(settings.CPI_STATIC_FILE_PATH))
+    return providers
@@ -0,0 +1,148 @@
+import asyncio
+from typing import Callable, Iterable
+
+from loguru import logger
+
+from back.app.core.constants import CPI_COUNTRY_SLUGS, DEFAULT_CPI_COUNTRY
+from back.app.services.cpi_parser_service import HistoricalCpiParser
+
+__all__ = ["CpiRegistry", "UnknownCpiCountryError"]
+
+
+class UnknownCpiCountryError(KeyError):
+    pass
+
+
+class CpiRegistry:
+    """
+    CPI parsers keyed by ISO country code.
+
+    A country's parser is only created on first use, from its on-disk
+    snapshot, so supporting more countries costs neither startup time nor
+    memory until they are actually asked for. Each loaded country is
+    refreshed independently and all of them concurrently.
+    """
+
+    def __init__(
+        self,
+        countries: Iterable[str] = CPI_COUNTRY_SLUGS,
+        parser_factory: Callable[[str], HistoricalCpiParser] = HistoricalCpiParser,
+    ):
+        self.countries = frozenset(countries)
+        self._parser_factory = parser_factory
+        self._parsers: dict[str, HistoricalCpiParser] = {}
+        self._first_refresh: dict[str, asyncio.Task] = {}
+        # The snapshot file each country was last reloaded from, see
+        # `reload_snapshots`.
+        self._snapshot_files: dict[str, tuple[int, int]] = {}
+
+    def __contains__(self, country: str) -> bool:
+        return country.upper() in self.countries
+
+    @property
+    def loaded(self) -> list[str]:
+        return list(self._parsers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(parser.snapshot.series.nbytes for parser in self._parsers.values())
+
+    def get(self, country: str = DEFAULT_CPI_COUNTRY) -> HistoricalCpiParser:
+        """
+        The parser of a country, loading its snapshot on first use. The data
+        may still be empty if no snapshot exists yet, see `acquire`.
+        """
+
+        country = country.upper()
+        parser = self._parsers.get(country)
+        if parser is not None:
+            return parser
+
+        if country not in self.countries:
+            raise UnknownCpiCountryError(country)
+
+        parser = self._parser_factory(country)
+        parser.load_snapshot()
+        self._parsers[country] = parser
+        return parser
+
+    async def acquire(self, country: str = DEFAULT_CPI_COUNTRY) -> HistoricalCpiParser:
+        """
+        Like `get`, but waits for the first refresh of a country that has no
+        snapshot yet. Concurrent callers share a single refresh.
+        """
+
+        parser = self.get(country)
+        if len(parser.snapshot.series):
+            return parser
+
+        task = self._first_refresh.get(parser.country)
+        if task is None:
+            task = asyncio.create_task(parser.parse_into_mapper())
+            task.add_done_callback(
+                lambda _: self._first_refresh.pop(parser.country, None)
+            )
+            self._first_refresh[parser.country] = task
+
+        # Shielded, so a client disconnecting does not cancel the refresh
+        # other requests are waiting on.
+        await asyncio.shield(task)
+        return parser
+
+    async def refresh_all(self) -> None:
+        """
+        Refresh every loaded country concurrently, isolating failures.
+
+        Countries another worker loaded on first use are picked up from their
+        snapshot files, so the refreshing worker keeps them current as well.
+        """
+
+        for country in self.countries.difference(self._parsers):
+            parser = self._parser_factory(country)
+            if parser.snapshot_path.exists():
+                parser.load_snapshot()
+                self._parsers[country] = parser
+
+        parsers = list(self._parsers.values())
+        results = await asyncio.gather(
+            *(parser.parse_into_mapper() for parser in parsers),
+            return_exceptions=True,
+        )
+        for parser, result in zip(parsers, results):
+            if isinstance(result, Exception):
+                logger.error(f"CPI refresh for {parser.country} failed: {result!r}")
+
+        logger.info(
+            f"CPI data refreshed for {', '.join(self._parsers)}, "
+            f"{self.nbytes} bytes of series in memory"
+        )
+
+    async def reload_snapshots(self) -> None:
+        """
+        Load the snapshot files of every loaded country that are newer than
+        what is served, for workers that do not refresh themselves and share
+        no segment with the one that does.
+
+        Cheap enough to call every few seconds: a file is only read again
+        once it was replaced.
+        """
+
+        reloaded = []
+        for parser in list(self._parsers.values()):
+            try:
+                stat = parser.snapshot_path.stat()
+            except OSError:
+                continue
+            # Snapshots are replaced atomically, so a new file is a new inode.
+            file_id = (stat.st_ino, stat.st_mtime_ns)
+            if self._snapshot_files.get(parser.country) == file_id:
+                continue
+            self._snapshot_files[parser.country] = file_id
+            if parser.load_snapshot():
+                reloaded.append(parser.country)
+        if reloaded:
+            logger.info(f"CPI snapshots reloaded for {', '.join(reloaded)}")
+
+    async def aclose(self) -> None:
+        for parser in self._parsers.values():
+            await parser.aclose()
@@ -0,0 +1,202 @@
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows runs a single worker
+    fcntl = None
+
+__all__ = ["CpiSegment"]
+
+SEGMENT_MAGIC = b"CPIS"
+SEGMENT_FORMAT_VERSION = 1
+
+# magic, format, superseded flag, version, built_at (epoch seconds),
+# first_year, months, present count, source. Padded to 72 bytes so the
+# float64 values that follow are 8-byte aligned.
+_HEADER = struct.Struct("<4sHBxQdiII32s4x")
+_SUPERSEDED_OFFSET = 6
+
+
+class _Mapping(NamedTuple):
+    mm: mmap.mmap
+    inode: int
+    snapshot: CpiSnapshot
+
+
+class CpiSegment:
+    """
+    A CPI snapshot shared by all worker processes of a host through an
+    mmap'd file.
+
+    Published segments are never modified: the refresher writes a new file,
+    renames it over the old one and then raises the superseded flag in the
+    old file's header. Readers map the file once and build a CpiSeries
+    directly over the mapped memory, so every worker shares the same pages.
+    Spotting a new version costs a single byte read of the mapped header,
+    with a throttled stat as a fallback should the flag never be raised.
+
+    Publishing happens under the segment's lock file, see `try_lock`.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 5.0):
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self.check_interval = check_interval
+        self._mapping: _Mapping | None = None
+        self._next_check = 0.0
+        self._lock_fd: int | None = None
+
+    @property
+    def is_locked(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_lock(self) -> bool:
+        """
+        Take the host-wide publish lock of this segment without blocking.
+        The kernel drops it if the process dies, so a crashed refresher
+        never blocks the next one.
+        """
+
+        if self._lock_fd is not None:
+            return True
+        if fcntl is None:
+            self._lock_fd = -1
+            return True
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        self._lock_fd = fd
+        return True
+
+    def latest(self, force: bool = False) -> CpiSnapshot | None:
+        """
+        The most recently published snapshot, None if nothing is published.
+        `force` skips the throttling of file system checks.
+        """
+
+        mapping = self._mapping
+        if mapping is not None and not mapping.mm[_SUPERSEDED_OFFSET]:
+            now = time.monotonic()
+            if now < self._next_check and not force:
+                return mapping.snapshot
+            self._next_check = now + self.check_interval
+            if self._inode() in (mapping.inode, None):
+                return mapping.snapshot
+        elif mapping is None:
+            now = time.monotonic()
+            if now < self._next_check and not force:
+                return None
+            self._next_check = now + self.check_interval
+
+        self._mapping = self._map()
+        return self._mapping.snapshot if self._mapping else None
+
+    def publish(self, snapshot: CpiSnapshot) -> None:
+        series = snapshot.series
+        values, present = series.buffers()
+        header = _HEADER.pack(
+            SEGMENT_MAGIC,
+            SEGMENT_FORMAT_VERSION,
+            0,
+            snapshot.version,
+            snapshot.built_at.timestamp(),
+            series.first_year,
+            len(values),
+            len(series),
+            (snapshot.source or "").encode()[:32],
+        )
+
+        try:
+            previous = open(self.path, "r+b")
+        except FileNotFoundError:
+            previous = None
+
+        tmp_path = self.path.with_suffix(".tmp-seg")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(values)
+                f.write(present)
+            os.replace(tmp_path, self.path)
+
+            if previous is not None:
+                previous.seek(_SUPERSEDED_OFFSET)
+                previous.write(b"\x01")
+        except OSError as e:
+            logger.warning(f"CPI segment {self.path} could not be published: {e}")
+        finally:
+            if previous is not None:
+                previous.close()
+
+    def unlock(self) -> None:
+        if self._lock_fd is not None and self._lock_fd >= 0:
+            os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def close(self) -> None:
+        """Release the lock and the mapping. Snapshots handed out stay valid."""
+
+        self.unlock()
+        self._mapping = None
+
+    def _inode(self) -> int | None:
+        try:
+            return os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _map(self) -> _Mapping | None:
+        try:
+            with open(self.path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        (
+            magic,
+            format_version,
+            _,
+            version,
+            built_at,
+            first_year,
+            months,
+            count,
+            source,
+        ) = _HEADER.unpack_from(mm)
+        if magic != SEGMENT_MAGIC or format_version != SEGMENT_FORMAT_VERSION:
+            logger.warning(f"CPI segment {self.path} has an unsupported format")
+            return None
+
+        buffer = memoryview(mm)
+        values_end = _HEADER.size + months * 8
+        series = CpiSeries.from_buffers(
+            first_year=first_year,
+            values=buffer[_HEADER.size : values_end].cast("d"),
+            present=buffer[values_end : values_end + (months + 7) // 8],
+            count=count,
+        )
+        snapshot = CpiSnapshot(
+            version=version,
+            built_at=datetime.fromtimestamp(built_at, timezone.utc),
+            series=series,
+            source=source.rstrip(b"\0").decode() or None,
+        )
+        return _Mapping(mm=mm, inode=inode, snapshot=snapshot)
@@ -0,0 +1,194 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, NamedTuple
+
+__all__ = ["CpiRangeSlice", "CpiSeries", "CpiSnapshot"]
+
+
+class CpiRangeSlice(NamedTuple):
+    version: int
+    start_year: int
+    start_month: int
+    values: memoryview
+
+    def periods(self) -> list[str]:
+        start = self.start_year * 12 + self.start_month - 1
+        return [
+            f"{i // 12:04d}-{i % 12 + 1:02d}"
+            for i in range(start, start + len(self.values))
+        ]
+
+
+class CpiSeries:
+    """
+    Monthly CPI values in a contiguous float64 array.
+
+    The value for (year, month) lives at index
+    `(year - first_year) * 12 + (month - 1)`, a presence bitmap marks which
+    months actually have data. Lookups are index arithmetic, ranges are
+    memoryview slices over the same buffer.
+    """
+
+    __slots__ = ("_first_year", "_values", "_present", "_count")
+
+    def __init__(self):
+        self._first_year = 0
+        self._values = array("d")
+        self._present = bytearray()
+        self._count = 0
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[int, int, float]]) -> "CpiSeries":
+        items = list(items)
+        series = cls()
+        if items:
+            years = [year for year, _, _ in items]
+            series._first_year = min(years)
+            series._grow(first_year=min(years), last_year=max(years))
+
+        for year, month, value in items:
+            series.set(year, month, value)
+        return series
+
+    @classmethod
+    def from_buffers(
+        cls, first_year: int, values: memoryview, present: memoryview, count: int
+    ) -> "CpiSeries":
+        """
+        A read-only series over existing buffers, e.g. a shared memory
+        segment, laid out as returned by `buffers`. Nothing is copied.
+        """
+
+        series = cls()
+        series._first_year = first_year
+        series._values = values
+        series._present = present
+        series._count = count
+        return series
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CpiSeries):
+            return NotImplemented
+        return list(self.items()) == list(other.items())
+
+    @property
+    def first_year(self) -> int:
+        return self._first_year
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.itemsize * len(self._values) + len(self._present)
+
+    @property
+    def last_period(self) -> tuple[int, int] | None:
+        for i in range(len(self._values) - 1, -1, -1):
+            if self._present[i >> 3] & (1 << (i & 7)):
+                return self.period(i)
+        return None
+
+    def is_contiguous(self) -> bool:
+        """True if no month is missing between the first and last stored one."""
+
+        if not self._count:
+            return False
+        first = next(self.items())
+        last = self.last_period
+        return self._count == self.index(*last) - self.index(*first[:2]) + 1
+
+    def index(self, year: int, month: int) -> int:
+        return (year - self._first_year) * 12 + (month - 1)
+
+    def get(self, year: int, month: int) -> float | None:
+        i = (year - self._first_year) * 12 + (month - 1)
+        if 0 <= i < len(self._values) and self._present[i >> 3] & (1 << (i & 7)):
+            return self._values[i]
+        return None
+
+    def is_present(self, i: int) -> bool:
+        return 0 <= i < len(self._values) and bool(
+            self._present[i >> 3] & (1 << (i & 7))
+        )
+
+    def view(self, start: int, stop: int) -> memoryview:
+        """
+        Zero-copy view of the values between two indexes (stop exclusive).
+
+        Months without data read as NaN.
+        """
+
+        start = max(start, 0)
+        stop = min(stop, len(self._values))
+        return memoryview(self._values)[start : max(start, stop)]
+
+    def buffers(self) -> tuple[memoryview, memoryview]:
+        """The raw float64 values and the presence bitmap."""
+
+        return memoryview(self._values), memoryview(self._present)
+
+    def period(self, i: int) -> tuple[int, int]:
+        return self._first_year + i // 12, i % 12 + 1
+
+    def set(self, year: int, month: int, value: float) -> None:
+        if not 1 <= month <= 12:
+            raise ValueError(f"Invalid CPI month: {month}")
+
+        if not self._values:
+            self._first_year = year
+        if year < self._first_year:
+            self._grow(first_year=year, last_year=self._last_year())
+        elif year > self._last_year():
+            self._grow(first_year=self._first_year, last_year=year)
+
+        i = self.index(year, month)
+        if not self._present[i >> 3] & (1 << (i & 7)):
+            self._present[i >> 3] |= 1 << (i & 7)
+            self._count += 1
+        self._values[i] = value
+
+    def items(self) -> Iterator[tuple[int, int, float]]:
+        for i, value in enumerate(self._values):
+            if self._present[i >> 3] & (1 << (i & 7)):
+                yield self._first_year + i // 12, i % 12 + 1, value
+
+    def _last_year(self) -> int:
+        return self._first_year + len(self._values) // 12 - 1
+
+    def _grow(self, first_year: int, last_year: int) -> None:
+        # Build new buffers instead of resizing in place: arrays cannot be
+        # resized while a memoryview handed out by view() is still alive.
+        months = (last_year - first_year + 1) * 12
+        values = array("d", [float("nan")]) * months
+        present = bytearray((months + 7) // 8)
+
+        offset = (self._first_year - first_year) * 12
+        for year, month, value in self.items():
+            i = offset + self.index(year, month)
+            values[i] = value
+            present[i >> 3] |= 1 << (i & 7)
+
+        self._first_year = first_year
+        self._values = values
+        self._present = present
+
+
+@dataclass(frozen=True)
+class CpiSnapshot:
+    """
+    A published, never mutated CPI series.
+
+    Refreshes build a new series and swap in a new snapshot with a single
+    reference assignment, so readers need no locks and never see a partially
+    applied refresh. `version` increases with every published change and can
+    be used as a cache key.
+    """
+
+    version: int = 0
+    built_at: datetime = field(
+        default_factory=lambda: datetime.fromtimestamp(0, timezone.utc)
+    )
+    series: CpiSeries = field(default_factory=CpiSeries)
+    source: str | None = None
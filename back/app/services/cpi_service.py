@@ -1,15 +1,54 @@
-from back.app.schemas.cpi import CpiPeriod
-from back.app.services.cpi_parser_service import GermanyHistoricalCpiParser
+from back.app.core.constants import CPI_BASE_OCT_2001, DEFAULT_CPI_COUNTRY
+from back.app.services.cpi_parser_service import HistoricalCpiParser
+from back.app.services.cpi_series import CpiRangeSlice, CpiSnapshot
 
 
 class CpiService:
-    def __init__(self, cpi_parser_service: GermanyHistoricalCpiParser):
+    def __init__(self, cpi_parser_service: HistoricalCpiParser):
         self._cpi_parser_service = cpi_parser_service
 
+    @property
+    def parser(self) -> HistoricalCpiParser:
+        return self._cpi_parser_service
+
+    @property
+    def country(self) -> str:
+        return self._cpi_parser_service.country
+
+    @property
+    def snapshot(self) -> CpiSnapshot:
+        return self._cpi_parser_service.snapshot
+
     def get_cpi_october_previous_year(self, year: int) -> float | None:
-        key = CpiPeriod(year=year - 1, month=10)
-        return self._cpi_parser_service.get_cpi_period_data(key)
+        return self._cpi_parser_service.get_cpi_value(year - 1, 10)
+
+    def get_cpi_base_oct_2001(self) -> float | None:
+        """
+        CPI of October 2001, the base of the valuation index factor. The German
+        value is fixed, other countries read it from their own series.
+        """
+
+        if self._cpi_parser_service.country == DEFAULT_CPI_COUNTRY:
+            return CPI_BASE_OCT_2001
+        return self._cpi_parser_service.get_cpi_value(2001, 10)
 
     def get_cpi(self, year: int, month: int) -> float | None:
-        key = CpiPeriod(year=year, month=month)
-        return self._cpi_parser_service.get_cpi_period_data(key)
+        return self._cpi_parser_service.get_cpi_value(year, month)
+
+    def get_cpi_range(
+        self, start_year: int, start_month: int, end_year: int, end_month: int
+    ) -> CpiRangeSlice:
+        """
+        Zero-copy view of the stored CPI values between two months (inclusive),
+        clamped to the months the current snapshot covers.
+        """
+
+        snapshot = self._cpi_parser_service.snapshot
+        series = snapshot.series
+
+        start = max(series.index(start_year, start_month), 0)
+        values = series.view(start, series.index(end_year, end_month) + 1)
+        year, month = series.period(start) if values else (start_year, start_month)
+        return CpiRangeSlice(
+            version=snapshot.version, start_year=year, start_month=month, values=values
+        )
@@ -0,0 +1,202 @@
+from html.parser import HTMLParser
+from typing import Iterable, Literal
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+__all__ = ["CpiParserBackend", "CpiRows", "MONTHS", "parse_cpi_table"]
+
+CpiParserBackend = Literal["bs4", "lxml", "stream"]
+CpiRows = list[tuple[int, int, float]]
+
+MONTHS = {
+    "jan": "01",
+    "feb": "02",
+    "mar": "03",
+    "apr": "04",
+    "may": "05",
+    "jun": "06",
+    "jul": "07",
+    "aug": "08",
+    "sep": "09",
+    "oct": "10",
+    "nov": "11",
+    "dec": "12",
+}
+
+# The stream backend feeds the tokenizer in chunks of this size and stops as
+# soon as the first table is closed, so the rest of the page is never walked.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def parse_cpi_table(html: bytes, backend: CpiParserBackend = "lxml") -> CpiRows | None:
+    """
+    Extract (year, month, value) rows from the first table of the CPI page.
+
+    Returns None if the page has no usable table. This is plain CPU-bound
+    work, callers on the event loop should run it in a worker thread.
+    """
+
+    if backend == "bs4":
+        table = _parse_bs4(html)
+    elif backend == "lxml":
+        table = _parse_lxml(html)
+    elif backend == "stream":
+        table = _parse_stream(html)
+    else:
+        raise ValueError(f"Unknown CPI parser backend: {backend}")
+
+    if table is None:
+        return None
+
+    header, rows = table
+    return _extract_rows(header, rows)
+
+
+def _extract_rows(header: list[str], rows: Iterable[list[str]]) -> CpiRows:
+    months = [MONTHS.get(name.strip().lower()) for name in header]
+    result: CpiRows = []
+
+    for cells in rows:
+        if not cells:
+            continue
+
+        year_str = cells[0].strip()
+        if not year_str.isdigit():
+            continue
+        year = int(year_str)
+
+        for i in range(1, min(len(cells), len(months))):
+            month_num = months[i]
+            value = cells[i].strip()
+
+            if month_num and value:
+                result.append((year, int(month_num), float(value.replace(",", "."))))
+
+    return result
+
+
+def _parse_bs4(html: bytes) -> tuple[list[str], Iterable[list[str]]] | None:
+    soup = BeautifulSoup(html, "html.parser")
+
+    table = soup.find("table")
+    if not table or not table.find("thead") or not table.find("tbody"):
+        return None
+
+    header = [th.text for th in table.find("thead").find_all("th")]
+    rows = (
+        [td.text for td in tr.find_all("td")]
+        for tr in table.find("tbody").find_all("tr")
+    )
+    return header, rows
+
+
+def _parse_lxml(html: bytes) -> tuple[list[str], Iterable[list[str]]] | None:
+    document = lxml_html.fromstring(html)
+
+    table = document.find(".//table")
+    if table is None:
+        return None
+
+    thead = table.find("thead")
+    tbody = table.find("tbody")
+    if thead is None or tbody is None:
+        return None
+
+    header = [th.text_content() for th in thead.iter("th")]
+    rows = ([td.text_content() for td in tr.iter("td")] for tr in tbody.iter("tr"))
+    return header, rows
+
+
+def _parse_stream(html: bytes) -> tuple[list[str], Iterable[list[str]]] | None:
+    tokenizer = _FirstTableTokenizer()
+    text = html.decode("utf-8", errors="replace")
+
+    for start in range(0, len(text), STREAM_CHUNK_SIZE):
+        tokenizer.feed(text[start : start + STREAM_CHUNK_SIZE])
+        if tokenizer.done:
+            break
+    tokenizer.close()
+
+    if not tokenizer.has_thead or not tokenizer.has_tbody:
+        return None
+    return tokenizer.header, tokenizer.rows
+
+
+class _FirstTableTokenizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.header: list[str] = []
+        self.rows: list[list[str]] = []
+        self.has_thead = False
+        self.has_tbody = False
+        self.done = False
+
+        self._depth = 0
+        self._section: str | None = None
+        self._cells: list[tuple[str, str]] | None = None
+        self._cell_tag = "td"
+        self._cell_text: list[str] | None = None
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if self.done:
+            return
+
+        if tag == "table":
+            self._depth += 1
+        elif self._depth != 1:
+            return
+        elif tag == "thead":
+            self._section = tag
+            self.has_thead = True
+        elif tag == "tbody":
+            self._section = tag
+            self.has_tbody = True
+        elif tag == "tr":
+            self._cells = []
+        elif tag in ("th", "td"):
+            self._close_cell()
+            self._cell_text = []
+            self._cell_tag = tag
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done or self._depth == 0:
+            return
+
+        if tag == "table":
+            self._depth -= 1
+            if self._depth == 0:
+                self._close_row()
+                self.done = True
+        elif self._depth != 1:
+            return
+        elif tag in ("th", "td"):
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+        elif tag in ("thead", "tbody"):
+            self._close_row()
+            self._section = None
+
+    def handle_data(self, data: str) -> None:
+        if self._cell_text is not None:
+            self._cell_text.append(data)
+
+    def _close_cell(self) -> None:
+        if self._cell_text is None:
+            return
+
+        if self._cells is not None:
+            self._cells.append((self._cell_tag, "".join(self._cell_text)))
+        self._cell_text = None
+
+    def _close_row(self) -> None:
+        self._close_cell()
+        if self._cells is None:
+            return
+
+        if self._section == "thead":
+            self.header.extend(text for tag, text in self._cells if tag == "th")
+        elif self._section == "tbody":
+            self.rows.append([text for tag, text in self._cells if tag == "td"])
+        self._cells = None
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable
+
+from back.app.services.cpi_series import CpiSnapshot
+
+__all__ = ["IndexConstants", "IndexConstantsTable"]
+
+
+@dataclass(frozen=True)
+class IndexConstants:
+    """The CPI-derived factors of the valuations of one year."""
+
+    cpi_value: Decimal
+    cpi_base: Decimal
+    index_factor: Decimal
+    residential_maintenance_rate: Decimal
+    commercial_maintenance_rate: Decimal
+
+
+class IndexConstantsTable:
+    """
+    IndexConstants of every valuation year a CPI snapshot covers, built in
+    one pass over its October values: valuations in year Y index with the
+    CPI of October Y-1.
+
+    A table belongs to one snapshot object. Snapshots are never mutated, a
+    refresh swaps in a new one, so `is_for` is all it takes to tell whether
+    the table is still current.
+    """
+
+    def __init__(
+        self,
+        snapshot: CpiSnapshot,
+        cpi_base: Decimal,
+        compute: Callable[[Decimal, Decimal], IndexConstants],
+    ):
+        self.snapshot = snapshot
+        self.cpi_base = cpi_base
+        self._by_year = {
+            year + 1: compute(Decimal(str(value)), cpi_base)
+            for year, month, value in snapshot.series.items()
+            if month == 10
+        }
+
+    def __len__(self) -> int:
+        return len(self._by_year)
+
+    def is_for(self, snapshot: CpiSnapshot, cpi_base: Decimal) -> bool:
+        return self.snapshot is snapshot and self.cpi_base == cpi_base
+
+    def get(self, year: int) -> IndexConstants | None:
+        return self._by_year.get(year)
@@ -0,0 +1,141 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+__all__ = ["JsonStreamError", "iter_json_array", "iter_ndjson"]
+
+# Largest single item accepted, so a malformed stream cannot grow the
+# buffer without bound.
+MAX_ITEM_BYTES = 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+async def iter_ndjson(
+    chunks: AsyncIterable[bytes], max_item_bytes: int = MAX_ITEM_BYTES
+) -> AsyncIterator[Any]:
+    """
+    Decode one JSON value per line as the chunks arrive. A line that is not
+    valid JSON is yielded as a JsonStreamError and the stream goes on.
+    """
+
+    buffer = b""
+    skipping = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            if line.strip():
+                yield _decode_line(line)
+
+        if len(buffer) > max_item_bytes:
+            if not skipping:
+                yield JsonStreamError(f"Line longer than {max_item_bytes} bytes")
+            skipping = True
+            buffer = b""
+
+    if buffer.strip() and not skipping:
+        yield _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return JsonStreamError(f"Invalid JSON: {e}")
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], max_item_bytes: int = MAX_ITEM_BYTES
+) -> AsyncIterator[Any]:
+    """
+    Decode the elements of a top-level JSON array as the chunks arrive,
+    holding at most one element in memory.
+
+    A syntax error cannot be recovered from inside an array, it is yielded
+    as a JsonStreamError and ends the stream.
+    """
+
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = "start"
+
+    async for chunk in chunks:
+        buffer += text.decode(chunk)
+        buffer, state, items, error = _consume(decoder, buffer, state, final=False)
+        for item in items:
+            yield item
+        if error is None and len(buffer) > max_item_bytes:
+            error = JsonStreamError(f"Item larger than {max_item_bytes} bytes")
+        if error is not None:
+            yield error
+            return
+
+    buffer += text.decode(b"", final=True)
+    buffer, state, items, error = _consume(decoder, buffer, state, final=True)
+    for item in items:
+        yield item
+    if error is None and state != "end":
+        error = JsonStreamError("Unexpected end of JSON array")
+    if error is not None:
+        yield error
+
+
+def _consume(
+    decoder: json.JSONDecoder, buffer: str, state: str, final: bool
+) -> tuple[str, str, list, JsonStreamError | None]:
+    """
+    Decode as many complete elements from the buffer as possible.
+
+    States: "start" expects "[", "first" a value or "]", "value" a value,
+    "separator" "," or "]", "end" only whitespace.
+    """
+
+    items = []
+    pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            return "", state, items, None
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                return "", state, items, JsonStreamError("Expected a JSON array")
+            state, pos = "first", pos + 1
+        elif state == "separator" or (state == "first" and char == "]"):
+            if char == "]":
+                state, pos = "end", pos + 1
+            elif char == ",":
+                state, pos = "value", pos + 1
+            else:
+                return "", state, items, JsonStreamError(f"Unexpected {char!r}")
+        elif state == "end":
+            return "", state, items, JsonStreamError("Data after the JSON array")
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError as e:
+                if final:
+                    return "", state, items, JsonStreamError(f"Invalid JSON: {e}")
+                return buffer[pos:], state, items, None
+
+            # A value running to the end of the buffer may continue in the
+            # next chunk (a number, say), wait for what follows it.
+            if end == len(buffer) and not final:
+                return buffer[pos:], state, items, None
+
+            items.append(item)
+            state, pos = "separator", end
@@ -0,0 +1,201 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+__all__ = ["AdmissionRejected", "AdmissionStats", "LLMAdmission"]
+
+
+class AdmissionRejected(Exception):
+    """
+    A model call that was not admitted: the wait queue was full, or the call
+    waited longer than the queue timeout. `retry_after` estimates, in whole
+    seconds, when a retry could be admitted.
+    """
+
+    def __init__(self, reason: str, retry_after: int, queue_full: bool):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.queue_full = queue_full
+
+
+@dataclass
+class AdmissionStats:
+    in_flight: int = 0
+    queue_depth: int = 0
+    admitted: int = 0
+    # Turned away because the queue was full.
+    rejected: int = 0
+    # Turned away after waiting `queue_timeout` seconds.
+    timed_out: int = 0
+    # Time admitted calls spent in the queue, zero for those let straight in.
+    mean_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class LLMAdmission:
+    """
+    Admits model calls at most `max_concurrency` at a time and, with a
+    `rate`, at most `rate` per second on average through a token bucket of
+    `burst` tokens.
+
+    Calls that cannot start yet wait in a FIFO queue of `max_queue` places
+    for up to `queue_timeout` seconds. A call that finds the queue full is
+    rejected at once, so under overload requests fail fast with a retry hint
+    instead of piling up and slowing every call down together.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        rate: float | None = None,
+        burst: int = 1,
+        max_queue: int = 32,
+        queue_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._refilled_at = clock()
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+        self._stats = AdmissionStats()
+        self._total_wait = 0.0
+
+    @property
+    def stats(self) -> AdmissionStats:
+        admitted = self._stats.admitted
+        return AdmissionStats(
+            in_flight=self._in_flight,
+            queue_depth=self.queue_depth,
+            admitted=admitted,
+            rejected=self._stats.rejected,
+            timed_out=self._stats.timed_out,
+            mean_wait_seconds=self._total_wait / admitted if admitted else 0.0,
+            max_wait_seconds=self._stats.max_wait_seconds,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds until the calls queued now should have started."""
+
+        if not self.rate:
+            return 1
+        return max(1, math.ceil((self.queue_depth + 1) / self.rate))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        if not self._waiters and self._try_admit():
+            self._admitted(0.0)
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self._stats.rejected += 1
+            raise AdmissionRejected(
+                "Too many analyses are waiting for the model",
+                retry_after=self.retry_after,
+                queue_full=True,
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued_at = self._clock()
+        # Waiting for a token rather than a slot, nothing else would wake it.
+        self._dispatch()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            if not waiter.cancelled():
+                # Admitted as the timeout fired, the slot is taken anyway.
+                self._admitted(self._clock() - queued_at)
+                return
+            self._stats.timed_out += 1
+            self._dispatch()
+            raise AdmissionRejected(
+                "Timed out waiting for the model",
+                retry_after=self.retry_after,
+                queue_full=False,
+            )
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                self.release()
+            self._dispatch()
+            raise
+        self._admitted(self._clock() - queued_at)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _admitted(self, waited: float) -> None:
+        self._stats.admitted += 1
+        self._total_wait += waited
+        self._stats.max_wait_seconds = max(self._stats.max_wait_seconds, waited)
+
+    def _try_admit(self) -> bool:
+        """Take a slot and a token if both are free."""
+
+        if self._in_flight >= self.max_concurrency or not self._take_token():
+            return False
+        self._in_flight += 1
+        return True
+
+    def _take_token(self) -> bool:
+        if not self.rate:
+            return True
+
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Admit queued calls, first come first served, while there is room."""
+
+        while self._waiters:
+            if self._waiters[0].done():
+                # Cancelled by a timeout or its caller.
+                self._waiters.popleft()
+                continue
+            if not self._try_admit():
+                break
+            self._waiters.popleft().set_result(None)
+
+        if self._waiters and self._in_flight < self.max_concurrency:
+            # Out of tokens, come back when the next one is due.
+            self._schedule((1 - self._tokens) / self.rate)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._dispatch()
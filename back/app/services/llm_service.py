@@ -1,31 +1,231 @@
-from openai import AsyncOpenAI
+import asyncio
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+from openai import AsyncOpenAI, AsyncStream
+from openai.types.chat import ChatCompletionChunk
 
 from back.app.prompts.prompts import SYSTEM_MESSAGE, AI_ANALYST_USER_TEMPLATE
 from back.app.schemas.valuation import AIPromptSchema
+from back.app.services.analysis_cache import AnalysisCache, analysis_key
+from back.app.services.llm_admission import LLMAdmission
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task[str]
+    waiters: int = 0
+
+
+class AnalysisStream:
+    """
+    The text of a streamed completion, piece by piece.
+
+    Closing it, whether it was iterated or not, closes the upstream response
+    and calls `on_close`. Once the text has been read to its end it is also
+    passed to `on_complete`.
+    """
+
+    def __init__(
+        self,
+        stream: AsyncStream[ChatCompletionChunk],
+        on_complete: Callable[[str], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ):
+        self._stream = stream
+        self._chunks = stream.__aiter__()
+        self._on_complete = on_complete
+        self._on_close = on_close
+        self._parts: list[str] = []
+        self._closed = False
+
+    def __aiter__(self) -> "AnalysisStream":
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            while True:
+                chunk = await anext(self._chunks)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content = chunk.choices[0].delta.content
+                    self._parts.append(content)
+                    return content
+        except StopAsyncIteration:
+            if self._on_complete is not None and self._parts:
+                self._on_complete("".join(self._parts))
+            await self.aclose()
+            raise
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
 
 
 class LLMService:
-    def __init__(self, api_key: str, model: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        cache: AnalysisCache | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        admission: LLMAdmission | None = None,
+    ):
         self._model = model
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        self.cache = cache
+        self.admission = admission
+        # Analyses being requested, by fingerprint, see `_single_flight`.
+        self._in_flight: dict[str, _Flight] = {}
+
+    async def aclose(self) -> None:
+        """Close the client and its connection pool."""
+
+        await self._client.close()
 
     async def get_llm_analysis(self, finance_data: AIPromptSchema) -> str:
+        """
+        The analysis of `finance_data`. Concurrent calls for the same prompt
+        share one model request.
+        """
+
         populated_main_prompt = self.format_main_prompt(finance_data)
+        key = self._fingerprint(finance_data, populated_main_prompt)
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+
         template_messages = self.format_messages_payload(
             system_prompt=SYSTEM_MESSAGE, main_prompt=populated_main_prompt
         )
+        return await self._single_flight(
+            key, lambda: self._request_analysis(key, template_messages)
+        )
+
+    async def _request_analysis(
+        self, key: str, template_messages: list[dict[str, str]]
+    ) -> str:
         llm_response = await self.gpt_request(template_messages=template_messages)
 
+        if self.cache is not None and llm_response:
+            self.cache.put(key, llm_response)
         return llm_response
 
-    async def gpt_request(self, template_messages: list[dict[str, str]]) -> str:
-        llm_response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=template_messages,
+    async def _single_flight(
+        self, key: str, request: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Await the request in flight for `key`, starting it if there is none.
+
+        The request runs in its own task, so a waiter that is cancelled only
+        stops waiting; the request is cancelled once no one waits for it. Its
+        result or exception goes to every waiter, and it leaves the in-flight
+        table when it ends, so a failure is never served to later calls.
+        """
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(request()))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Taken out now, a call arriving before the task has wound
+                # down starts a new request instead of joining a cancelled one.
+                self._land(key, flight)
+                flight.task.cancel()
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    async def get_llm_analysis_stream(
+        self, finance_data: AIPromptSchema
+    ) -> AsyncIterator[str]:
+        """
+        Start an analysis and return its text as the model produces it.
+
+        The request is admitted and sent before this returns, so failing to
+        start it raises here. Closing the iterator early closes the upstream
+        stream. A cached analysis is returned as a single piece, and an
+        analysis streamed to the end is cached.
+        """
+
+        populated_main_prompt = self.format_main_prompt(finance_data)
+        key = self._fingerprint(finance_data, populated_main_prompt)
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return self._iter_cached(cached)
+
+        template_messages = self.format_messages_payload(
+            system_prompt=SYSTEM_MESSAGE, main_prompt=populated_main_prompt
+        )
+        on_complete = None
+        if self.cache is not None:
+            on_complete = partial(self.cache.put, key)
+        return await self.gpt_request_stream(
+            template_messages=template_messages, on_complete=on_complete
         )
 
+    async def gpt_request_stream(
+        self,
+        template_messages: list[dict[str, str]],
+        on_complete: Callable[[str], None] | None = None,
+    ) -> AnalysisStream:
+        # The admission slot is held until the stream is closed.
+        on_close = None
+        if self.admission is not None:
+            await self.admission.acquire()
+            on_close = self.admission.release
+
+        try:
+            stream = await self._client.chat.completions.create(
+                model=self._model,
+                messages=template_messages,
+                stream=True,
+            )
+        except BaseException:
+            if on_close is not None:
+                on_close()
+            raise
+
+        return AnalysisStream(stream, on_complete=on_complete, on_close=on_close)
+
+    async def gpt_request(self, template_messages: list[dict[str, str]]) -> str:
+        async with self._admitted():
+            llm_response = await self._client.chat.completions.create(
+                model=self._model,
+                messages=template_messages,
+            )
+
         return llm_response.choices[0].message.content
 
+    def _admitted(self) -> AbstractAsyncContextManager:
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot()
+
+    def _fingerprint(self, data: AIPromptSchema, main_prompt: str) -> str:
+        return analysis_key(self._model, SYSTEM_MESSAGE, main_prompt, data)
+
+    @staticmethod
+    async def _iter_cached(analysis: str) -> AsyncIterator[str]:
+        yield analysis
+
     @staticmethod
     def format_main_prompt(data: AIPromptSchema) -> str:
         return AI_ANALYST_USER_TEMPLATE.format(**data.model_dump())
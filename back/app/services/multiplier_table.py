@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from decimal import Decimal
+
+__all__ = ["MultiplierTable", "capitalization_multiplier"]
+
+
+def capitalization_multiplier(property_yield: Decimal, years: Decimal) -> Decimal:
+    """
+    The present value annuity factor (1 - q^-n) / i with q = 1 + i, for a
+    yield in percent, in Decimal arithmetic throughout.
+    """
+
+    if property_yield == 0:
+        return years
+
+    rate = property_yield / 100
+    return (1 - (1 + rate) ** -years) / rate
+
+
+class MultiplierTable:
+    """
+    Capitalization multipliers (Vervielfältiger) for yields in 0.01 % steps
+    and whole years of remaining useful life, filled lazily.
+
+    Valuations only ever use a small part of the grid, so cells are computed
+    on first use and at most `maxsize` of them are kept, least recently used
+    first out. Values off the grid are computed on demand and not kept.
+
+    Cells are keyed by the Decimal values themselves, equal values such as
+    5.0 and 5.00 share one. The grid is only checked on a miss, a hit costs
+    a single dict lookup.
+    """
+
+    YIELD_STEP = Decimal("0.01")
+
+    def __init__(
+        self,
+        max_yield: Decimal = Decimal("20"),
+        max_years: int = 100,
+        maxsize: int = 8192,
+    ):
+        self.max_yield = max_yield
+        self.max_years = max_years
+        self.maxsize = maxsize
+        self._cells: OrderedDict[tuple[Decimal, Decimal], Decimal] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def get(self, property_yield: Decimal, years: Decimal) -> Decimal:
+        key = (property_yield, years)
+        multiplier = self._cells.get(key)
+        if multiplier is not None:
+            self._cells.move_to_end(key)
+            return multiplier
+
+        multiplier = capitalization_multiplier(property_yield, years)
+        if self.on_grid(property_yield, years):
+            self._cells[key] = multiplier
+            if len(self._cells) > self.maxsize:
+                self._cells.popitem(last=False)
+        return multiplier
+
+    def on_grid(self, property_yield: Decimal, years: Decimal) -> bool:
+        return (
+            0 < property_yield <= self.max_yield
+            and 0 < years <= self.max_years
+            and property_yield % self.YIELD_STEP == 0
+            and years % 1 == 0
+        )
+
+    def clear(self) -> None:
+        self._cells.clear()
@@ -0,0 +1,276 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from back.app.schemas.valuation import BatchValuationItem, ValuationInput
+from back.app.services.batch_valuation_service import BatchValuationService
+
+__all__ = [
+    "PortfolioFormat",
+    "PortfolioProgress",
+    "PortfolioValuationService",
+    "PortfolioWriter",
+    "column_mapping",
+    "read_portfolio",
+]
+
+# Rows read, valued and written at a time.
+PORTFOLIO_CHUNK_ROWS = 10_000
+# Rows valued between two yields to the event loop.
+YIELD_EVERY_ROWS = 256
+
+# Valuation columns appended to every row of a portfolio, and where they are
+# found on a ValuationResult.
+RESULT_COLUMNS = {
+    "index_factor": attrgetter("index_factor"),
+    "annual_gross_income": attrgetter("annual_gross_income"),
+    "land_value": attrgetter("land_value"),
+    "administration": attrgetter("management_costs.administration"),
+    "maintenance": attrgetter("management_costs.maintenance"),
+    "risk_of_rent_loss": attrgetter("management_costs.risk_of_rent_loss"),
+    "management_costs_total": attrgetter("management_costs.total"),
+    "risk_percentage": attrgetter("management_costs.risk_percentage"),
+    "annual_net_income": attrgetter("annual_net_income"),
+    "land_interest": attrgetter("land_interest"),
+    "building_net_income": attrgetter("building_net_income"),
+    "multiplier": attrgetter("multiplier"),
+    "theoretical_building_value": attrgetter("theoretical_building_value"),
+    "theoretical_total_value": attrgetter("theoretical_total_value"),
+    "building_share_percent": attrgetter("building_share_percent"),
+    "land_share_percent": attrgetter("land_share_percent"),
+    "actual_building_value": attrgetter("actual_building_value"),
+    "actual_land_value": attrgetter("actual_land_value"),
+}
+ERROR_COLUMN = "error"
+
+
+class PortfolioFormat(StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+
+    @classmethod
+    def from_path(cls, path: str | Path) -> "PortfolioFormat":
+        suffix = Path(path).suffix.lower().lstrip(".")
+        if suffix in ("parquet", "pq"):
+            return cls.PARQUET
+        if suffix == "csv":
+            return cls.CSV
+        raise ValueError(f"Cannot tell the format of {path}, expected .csv or .parquet")
+
+
+@dataclass(frozen=True)
+class PortfolioProgress:
+    rows: int
+    errors: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def column_mapping(
+    columns: list[str], overrides: dict[str, str] | None = None
+) -> dict[str, str]:
+    """
+    Map the columns of a portfolio file onto ValuationInput fields.
+
+    A column maps onto the field of the same name, ignoring case and reading
+    spaces and dashes as underscores, unless `overrides` maps it explicitly.
+    Columns that map onto no field are passed through untouched.
+    """
+
+    fields = ValuationInput.model_fields
+    overrides = overrides or {}
+    unknown = sorted(set(overrides.values()) - set(fields))
+    if unknown:
+        raise ValueError(f"Unknown valuation input fields: {', '.join(unknown)}")
+
+    mapping = {}
+    for column in columns:
+        field = overrides.get(column)
+        if field is None:
+            field = column.strip().lower().replace(" ", "_").replace("-", "_")
+        if field in fields and field not in mapping.values():
+            mapping[column] = field
+    return mapping
+
+
+def read_portfolio(
+    path: str | Path, portfolio_format: PortfolioFormat, chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    The rows of a portfolio file, `chunk_rows` at a time. CSV values are
+    read as strings, so decimals reach ValuationInput unrounded.
+    """
+
+    if portfolio_format == PortfolioFormat.PARQUET:
+        with pq.ParquetFile(path) as reader:
+            for batch in reader.iter_batches(batch_size=chunk_rows):
+                yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+        return
+
+    with pd.read_csv(path, dtype=str, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+class PortfolioWriter:
+    """Appends valued chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str | Path, portfolio_format: PortfolioFormat):
+        self.path = Path(path)
+        self.format = portfolio_format
+        self._handle = None
+        self._parquet_writer = None
+        self._schema = None
+
+    def __enter__(self) -> "PortfolioWriter":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.format == PortfolioFormat.CSV:
+            first = self._handle is None
+            if first:
+                self._handle = self.path.open("w", newline="", encoding="utf-8")
+            frame.to_csv(self._handle, header=first, index=False)
+            return
+
+        if self._parquet_writer is None:
+            # Columns that are all empty in the first chunk carry no type;
+            # later chunks are cast to this schema, so they become strings.
+            schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            self._schema = pa.schema(
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in schema
+            )
+            self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+        table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+class PortfolioValuationService:
+    """
+    Values portfolio files chunk by chunk: rows are read, valued through
+    BatchValuationService and handed on one chunk at a time, so memory stays
+    flat whatever the size of the file.
+
+    Every row keeps its input columns and gains the valuation columns, plus
+    an `error` column for rows that could not be valued.
+    """
+
+    def __init__(
+        self,
+        batch_valuation_service: BatchValuationService,
+        chunk_rows: int = PORTFOLIO_CHUNK_ROWS,
+    ):
+        self._batch_valuation_service = batch_valuation_service
+        self.chunk_rows = chunk_rows
+
+    async def value_file(
+        self,
+        path: str | Path,
+        portfolio_format: PortfolioFormat,
+        column_overrides: dict[str, str] | None = None,
+        on_progress: Callable[[PortfolioProgress], None] | None = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        frames = read_portfolio(path, portfolio_format, self.chunk_rows)
+        started = time.perf_counter()
+        rows = errors = 0
+        mapping = None
+
+        while (frame := await asyncio.to_thread(next, frames, None)) is not None:
+            if mapping is None:
+                mapping = column_mapping(list(frame.columns), column_overrides)
+
+            valued = await self.value_frame(frame, mapping)
+            rows += len(valued)
+            errors += int(valued[ERROR_COLUMN].notna().sum())
+
+            progress = PortfolioProgress(
+                rows=rows, errors=errors, elapsed=time.perf_counter() - started
+            )
+            logger.info(
+                f"Portfolio {Path(path).name}: {progress.rows} rows valued, "
+                f"{progress.errors} failed, {progress.rows_per_second:.0f} rows/s"
+            )
+            if on_progress is not None:
+                on_progress(progress)
+            yield valued
+
+    async def value_to_file(
+        self,
+        source: str | Path,
+        target: str | Path,
+        source_format: PortfolioFormat | None = None,
+        target_format: PortfolioFormat | None = None,
+        column_overrides: dict[str, str] | None = None,
+        on_progress: Callable[[PortfolioProgress], None] | None = None,
+    ) -> None:
+        source_format = source_format or PortfolioFormat.from_path(source)
+        target_format = target_format or PortfolioFormat.from_path(target)
+
+        with PortfolioWriter(target, target_format) as writer:
+            async for frame in self.value_file(
+                source, source_format, column_overrides, on_progress
+            ):
+                await asyncio.to_thread(writer.write, frame)
+
+    async def value_frame(
+        self, frame: pd.DataFrame, mapping: dict[str, str]
+    ) -> pd.DataFrame:
+        inputs = frame[list(mapping)].rename(columns=mapping)
+        items = [
+            item
+            async for item in self._batch_valuation_service.calculate(_records(inputs))
+        ]
+        return _with_results(frame, items)
+
+
+async def _records(inputs: pd.DataFrame) -> AsyncIterator[dict[str, Any]]:
+    for i, record in enumerate(inputs.to_dict("records")):
+        # Valuing a chunk takes a while, let other requests in now and then.
+        if i % YIELD_EVERY_ROWS == 0:
+            await asyncio.sleep(0)
+        # Empty cells fall back to the field defaults.
+        yield {name: value for name, value in record.items() if not pd.isna(value)}
+
+
+def _with_results(frame: pd.DataFrame, items: list[BatchValuationItem]) -> pd.DataFrame:
+    values = np.full((len(RESULT_COLUMNS), len(items)), np.nan)
+    errors = []
+
+    for i, item in enumerate(items):
+        errors.append(item.error)
+        if item.result is None:
+            continue
+        for row, getter in enumerate(RESULT_COLUMNS.values()):
+            value = getter(item.result)
+            if value is not None:
+                values[row, i] = value
+
+    valued = frame.copy()
+    for row, name in enumerate(RESULT_COLUMNS):
+        valued[name] = values[row]
+    valued[ERROR_COLUMN] = pd.Series(errors, index=frame.index, dtype=str)
+    return valued
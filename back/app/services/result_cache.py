@@ -0,0 +1,186 @@
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Generic, TypeVar
+
+from loguru import logger
+
+__all__ = ["CacheStats", "ResultCache"]
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    # Hits served from the on-disk tier, also counted in `hits`.
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+    hit_rate: float = 0.0
+
+
+class ResultCache(ABC, Generic[T]):
+    """
+    Results by key, least recently used first out and dropped `ttl` seconds
+    after they were stored.
+
+    With a `path`, results are also written to a SQLite file that survives
+    restarts and is consulted on a memory miss. A failing disk tier only
+    costs its hits, it never fails the computation it caches.
+
+    Subclasses name their `TABLE` and how a result is stored as text.
+    """
+
+    TABLE: str
+    # Puts between two trims of the disk tier to `disk_maxsize` rows.
+    DISK_PRUNE_INTERVAL = 1_000
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 3600.0,
+        path: Path | None = None,
+        disk_maxsize: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.disk_maxsize = disk_maxsize
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._puts = 0
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        lookups = self._stats.hits + self._stats.misses
+        return replace(
+            self._stats,
+            size=len(self._entries),
+            hit_rate=self._stats.hits / lookups if lookups else 0.0,
+        )
+
+    def get(self, key: str) -> T | None:
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return result
+            del self._entries[key]
+            self._stats.expirations += 1
+
+        entry = self._read(key, now)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        self._stats.disk_hits += 1
+        self._remember(key, *entry)
+        return entry[1]
+
+    def put(self, key: str, result: T) -> None:
+        expires_at = self._clock() + self.ttl
+        self._remember(key, expires_at, result)
+        self._write(key, expires_at, result)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.path is not None:
+            self._execute(f"DELETE FROM {self.TABLE}")
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @abstractmethod
+    def _dump(self, result: T) -> str: ...
+
+    @abstractmethod
+    def _load(self, text: str) -> T:
+        """Parse a stored result, raising ValueError if it is unreadable."""
+
+    def _remember(self, key: str, expires_at: float, result: T) -> None:
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _read(self, key: str, now: float) -> tuple[float, T] | None:
+        if self.path is None:
+            return None
+
+        row = self._execute(
+            f"SELECT expires_at, result FROM {self.TABLE} "
+            "WHERE key = ? AND expires_at > ?",
+            (key, now),
+        )
+        if row is None:
+            return None
+
+        try:
+            return row[0], self._load(row[1])
+        except ValueError as e:
+            logger.warning(f"Dropping unreadable cached {self.TABLE} {key}: {e}")
+            self._execute(f"DELETE FROM {self.TABLE} WHERE key = ?", (key,))
+            return None
+
+    def _write(self, key: str, expires_at: float, result: T) -> None:
+        if self.path is None:
+            return
+
+        self._execute(
+            f"INSERT OR REPLACE INTO {self.TABLE} (key, expires_at, result) "
+            "VALUES (?, ?, ?)",
+            (key, expires_at, self._dump(result)),
+        )
+        self._puts += 1
+        if self._puts % self.DISK_PRUNE_INTERVAL == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        self._execute(
+            f"DELETE FROM {self.TABLE} WHERE expires_at <= ?", (self._clock(),)
+        )
+        self._execute(
+            f"DELETE FROM {self.TABLE} WHERE key IN (SELECT key FROM {self.TABLE} "
+            "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_maxsize,),
+        )
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> tuple | None:
+        try:
+            with self._connect() as db:
+                return db.execute(sql, parameters).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Cache {self.path} is unavailable: {e}")
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self._db = db
+        return self._db
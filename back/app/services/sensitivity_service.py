@@ -0,0 +1,52 @@
+import numpy as np
+
+from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.schemas.valuation import SensitivityRequest, SensitivityResult
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+
+
+class SensitivityService:
+    """
+    Values one input over the Cartesian grid of up to three swept
+    parameters in a single vectorized pass.
+
+    Each swept parameter gets its own axis and everything else stays 0-d,
+    so the engine computes every intermediate only at the shape of the
+    parameters it depends on: the land value and the index factor once,
+    the multiplier once per yield and life, and so on.
+    """
+
+    def __init__(self, engine: ValuationEngine):
+        self._engine = engine
+
+    def calculate(
+        self,
+        request: SensitivityRequest,
+        cpi_value: float,
+        cpi_base: float = CPI_BASE_OCT_2001,
+    ) -> SensitivityResult:
+        axes = [np.array(r.values(), dtype=np.float64) for r in request.ranges]
+        shape = [len(axis) for axis in axes]
+
+        overrides = {}
+        for dimension, (sweep, axis) in enumerate(zip(request.ranges, axes)):
+            axis_shape = [1] * len(axes)
+            axis_shape[dimension] = -1
+            overrides[sweep.parameter.value] = axis.reshape(axis_shape)
+
+        columns = ValuationColumns.from_input(
+            request.input_data, cpi_value, cpi_base, **overrides
+        )
+        arrays = self._engine.calculate_broadcast(columns)
+
+        def flatten(values: np.ndarray) -> list[float]:
+            return np.broadcast_to(values, shape).ravel().tolist()
+
+        return SensitivityResult(
+            parameters=[r.parameter for r in request.ranges],
+            axes=[axis.tolist() for axis in axes],
+            shape=shape,
+            theoretical_total_value=flatten(arrays.theoretical_total_value),
+            building_share_percent=flatten(arrays.building_share_percent),
+            land_share_percent=flatten(arrays.land_share_percent),
+        )
@@ -0,0 +1,221 @@
+import asyncio
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Awaitable, Callable
+
+import numpy as np
+from loguru import logger
+
+from back.app.core.config import settings
+from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.schemas.valuation import (
+    Distribution,
+    DistributionKind,
+    Histogram,
+    SimulationRequest,
+    SimulationResult,
+)
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+
+__all__ = [
+    "SimulationCancelled",
+    "SimulationService",
+    "default_simulation_workers",
+]
+
+# Sampled yields are kept inside the range ValuationInput accepts.
+MIN_YIELD = 0.01
+MAX_YIELD = 100.0
+
+
+class SimulationCancelled(Exception):
+    pass
+
+
+def default_simulation_workers() -> int:
+    """
+    The CPUs of the host split between the uvicorn workers, which read the
+    same `WEB_CONCURRENCY` as uvicorn, so together their pools use every CPU
+    once instead of each starting one process per CPU.
+    """
+
+    return max(1, (os.cpu_count() or 1) // settings.WEB_CONCURRENCY)
+
+
+class SimulationService:
+    """
+    Monte Carlo valuations on a process pool.
+
+    The iterations are split into fixed-size chunks, each valued as one
+    vectorized pass in a worker process, so the event loop only waits.
+    Every chunk draws from its own child of the run's seed sequence, which
+    makes a seeded run reproducible whatever the number of workers.
+
+    A worker process that dies, killed for memory say, breaks the whole
+    pool; it is then replaced and the simulation run again, once.
+    """
+
+    CHUNK_SIZE = 25_000
+    PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+    # How often a running simulation checks whether it was cancelled.
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self, max_workers: int | None = None, executor: Executor | None = None
+    ):
+        self._max_workers = max_workers
+        self._executor = executor
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use, spawned so workers inherit none of the
+        # threads or sockets of the server process.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def simulate(
+        self,
+        request: SimulationRequest,
+        cpi_value: float,
+        cpi_base: float = CPI_BASE_OCT_2001,
+        is_cancelled: Callable[[], Awaitable[bool]] | None = None,
+    ) -> SimulationResult:
+        """
+        Run the simulation. `is_cancelled` is polled while chunks run; once
+        it returns True the chunks not yet started are dropped and
+        SimulationCancelled is raised.
+        """
+
+        # Below 2**53, so clients reading JSON numbers as doubles keep it exact.
+        seed = request.seed if request.seed is not None else secrets.randbelow(2**53)
+        sizes = [
+            min(self.CHUNK_SIZE, request.iterations - start)
+            for start in range(0, request.iterations, self.CHUNK_SIZE)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        columns = ValuationColumns.from_input(request.input_data, cpi_value, cpi_base)
+        distributions = {
+            name: getattr(request, name)
+            for name in ("property_yield", "monthly_net_rent", "vacancy", "cpi_drift")
+        }
+
+        try:
+            totals = await self._run(columns, distributions, seeds, sizes, is_cancelled)
+        except BrokenProcessPool:
+            logger.warning("Simulation process pool broke, starting a new one")
+            self.shutdown()
+            totals = await self._run(columns, distributions, seeds, sizes, is_cancelled)
+        return await asyncio.to_thread(self._summarize, totals, seed, request.bins)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(
+        self,
+        columns: ValuationColumns,
+        distributions: dict[str, Distribution | None],
+        seeds: list[np.random.SeedSequence],
+        sizes: list[int],
+        is_cancelled: Callable[[], Awaitable[bool]] | None,
+    ) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                self.executor, _simulate_chunk, columns, distributions, chunk_seed, size
+            )
+            for chunk_seed, size in zip(seeds, sizes)
+        ]
+        try:
+            await self._wait(futures, is_cancelled)
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return np.concatenate([future.result() for future in futures])
+
+    async def _wait(
+        self,
+        futures: list[asyncio.Future],
+        is_cancelled: Callable[[], Awaitable[bool]] | None,
+    ) -> None:
+        pending = set(futures)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=self.POLL_INTERVAL)
+            if pending and is_cancelled is not None and await is_cancelled():
+                raise SimulationCancelled
+
+    def _summarize(self, totals: np.ndarray, seed: int, bins: int) -> SimulationResult:
+        values = totals[np.isfinite(totals)]
+        if not len(values):
+            raise ValueError("No simulated valuation has a finite value")
+
+        counts, edges = np.histogram(values, bins=bins)
+        return SimulationResult(
+            iterations=len(totals),
+            seed=seed,
+            mean=float(values.mean()),
+            std=float(values.std()),
+            percentiles={
+                f"p{p}": float(value)
+                for p, value in zip(
+                    self.PERCENTILES, np.percentile(values, self.PERCENTILES)
+                )
+            },
+            histogram=Histogram(edges=edges.tolist(), counts=counts.tolist()),
+        )
+
+
+def _simulate_chunk(
+    columns: ValuationColumns,
+    distributions: dict[str, Distribution | None],
+    seed: np.random.SeedSequence,
+    size: int,
+) -> np.ndarray:
+    """The theoretical total values of one chunk, run in a worker process."""
+
+    rng = np.random.default_rng(seed)
+
+    # Always drawn in this order, so a seed gives the same samples.
+    samples = {
+        name: _sample(rng, distribution, size)
+        for name, distribution in distributions.items()
+        if distribution is not None
+    }
+
+    overrides = {}
+    if "property_yield" in samples:
+        overrides["property_yield"] = np.clip(
+            samples["property_yield"], MIN_YIELD, MAX_YIELD
+        )
+
+    rent = samples.get("monthly_net_rent", columns.monthly_net_rent)
+    if "vacancy" in samples:
+        rent = rent * (1 - np.clip(samples["vacancy"], 0, 100) / 100)
+    overrides["monthly_net_rent"] = np.maximum(rent, 0)
+
+    if "cpi_drift" in samples:
+        overrides["cpi_value"] = columns.cpi_value * (1 + samples["cpi_drift"] / 100)
+
+    result = ValuationEngine().calculate_broadcast(replace(columns, **overrides))
+    return np.broadcast_to(result.theoretical_total_value, size).copy()
+
+
+def _sample(
+    rng: np.random.Generator, distribution: Distribution, size: int
+) -> np.ndarray:
+    if distribution.kind == DistributionKind.NORMAL:
+        return rng.normal(distribution.mean, distribution.std, size)
+    if distribution.kind == DistributionKind.UNIFORM:
+        return rng.uniform(distribution.low, distribution.high, size)
+    return rng.triangular(distribution.low, distribution.mode, distribution.high, size)
@@ -0,0 +1,83 @@
+from dataclasses import replace
+
+import numpy as np
+
+from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.schemas.valuation import TimelineRequest, TimelineResult
+from back.app.services.cpi_series import CpiSnapshot
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+
+__all__ = ["TimelineService"]
+
+
+class TimelineService:
+    """
+    Values one property for every purchase month of a span in one pass.
+
+    A purchase in year Y is indexed with the CPI of October Y-1, so the
+    months of a year share one valuation. The October values are read
+    straight out of the snapshot's buffer, one per year, and valued in a
+    single broadcast engine pass in which everything that does not depend
+    on the CPI, the land value, income and multiplier, is computed once.
+    The yearly rows are then spread over the months.
+    """
+
+    def __init__(self, engine: ValuationEngine):
+        self._engine = engine
+
+    def calculate(
+        self,
+        request: TimelineRequest,
+        snapshot: CpiSnapshot,
+        cpi_base: float = CPI_BASE_OCT_2001,
+    ) -> TimelineResult:
+        first, last = request.months()
+        months = np.arange(first, last + 1)
+        first_year = first // 12
+        years = np.arange(first_year, last // 12 + 1)
+
+        octobers = _october_values(snapshot, years - 1)
+        columns = replace(
+            ValuationColumns.from_input(request.input_data, np.nan, cpi_base),
+            cpi_value=octobers,
+        )
+        arrays = self._engine.calculate_broadcast(columns)
+
+        year_of_month = months // 12 - first_year
+
+        def monthly(values: np.ndarray) -> list[float | None]:
+            by_month = np.broadcast_to(values, octobers.shape)[year_of_month]
+            return [None if v != v else v for v in by_month.tolist()]
+
+        return TimelineResult(
+            version=snapshot.version,
+            periods=[f"{m // 12:04d}-{m % 12 + 1:02d}" for m in months.tolist()],
+            cpi_value=monthly(octobers),
+            index_factor=monthly(arrays.index_factor),
+            management_costs_total=monthly(arrays.management_total),
+            annual_net_income=monthly(arrays.annual_net_income),
+            building_net_income=monthly(arrays.building_net_income),
+            theoretical_building_value=monthly(arrays.theoretical_building_value),
+            theoretical_total_value=monthly(arrays.theoretical_total_value),
+            building_share_percent=monthly(arrays.building_share_percent),
+            land_share_percent=monthly(arrays.land_share_percent),
+            actual_building_value=monthly(arrays.actual_building_value),
+            actual_land_value=monthly(arrays.actual_land_value),
+        )
+
+
+def _october_values(snapshot: CpiSnapshot, years: np.ndarray) -> np.ndarray:
+    """The October CPI of each year, NaN where the snapshot has none."""
+
+    series = snapshot.series
+    values, present = series.buffers()
+    values = np.frombuffer(values, dtype=np.float64)
+    present = np.frombuffer(present, dtype=np.uint8)
+    indexes = (years - series.first_year) * 12 + 9
+    if not len(values):
+        return np.full(len(years), np.nan)
+
+    inside = (indexes >= 0) & (indexes < len(values))
+    indexes = np.where(inside, indexes, 0)
+    stored = inside & (present[indexes >> 3] >> (indexes & 7) & 1 == 1)
+    return np.where(stored, values[indexes], np.nan)
@@ -0,0 +1,47 @@
+import hashlib
+from decimal import Decimal
+
+from back.app.schemas.valuation import CpiData, ValuationInput, ValuationResult
+from back.app.services.result_cache import ResultCache
+
+__all__ = ["ValuationCache", "valuation_key"]
+
+_INPUT_FIELDS = tuple(ValuationInput.model_fields)
+_CPI_FIELDS = tuple(CpiData.model_fields)
+
+
+def valuation_key(
+    input_data: ValuationInput, cpi_data: CpiData, cpi_base: Decimal
+) -> str:
+    """
+    A SHA-256 of everything a valuation depends on: the validated input and
+    the CPI value and base it is indexed with.
+
+    The input is hashed in its validated form, so payloads that validate to
+    the same model share a key. Decimals keep their exponent, 5.0 and 5.00
+    are distinct keys because the results echo that precision.
+    """
+
+    parts = [f"{name}={getattr(input_data, name)}" for name in _INPUT_FIELDS]
+    parts += [f"{name}={getattr(cpi_data, name)}" for name in _CPI_FIELDS]
+    parts.append(f"cpi_base={cpi_base}")
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class ValuationCache(ResultCache[ValuationResult]):
+    """
+    Valuation results by `valuation_key`.
+
+    The key contains the CPI value each result was indexed with, so a CPI
+    refresh that changes that value makes the entry unreachable and one
+    that does not keeps it: a result is never served for a CPI it was not
+    computed with. Unreachable entries age out like any other.
+    """
+
+    TABLE = "valuations"
+
+    def _dump(self, result: ValuationResult) -> str:
+        return result.model_dump_json()
+
+    def _load(self, text: str) -> ValuationResult:
+        return ValuationResult.model_validate_json(text)
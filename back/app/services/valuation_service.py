@@ -1,4 +1,3 @@
-import math
 from decimal import Decimal, getcontext, ROUND_HALF_UP
 
 from back.app.core.constants import CPI_BASE_OCT_2001
@@ -9,6 +8,10 @@ from back.app.schemas.valuation import (
     ManagementCosts,
     PropertyType,
 )
+from back.app.services.cpi_service import CpiService
+from back.app.services.index_constants import IndexConstants, IndexConstantsTable
+from back.app.services.multiplier_table import MultiplierTable
+from back.app.services.valuation_cache import ValuationCache, valuation_key
 
 getcontext().prec = 28
 
@@ -30,9 +33,99 @@ class ValuationService:
     MAINTENANCE_RATE_DECIMALS = Decimal("0.1")
     EURO = Decimal("1")
 
+    def __init__(
+        self,
+        cache: ValuationCache | None = None,
+        multipliers: MultiplierTable | None = None,
+        index_tables: dict[str, IndexConstantsTable] | None = None,
+    ):
+        """
+        `multipliers` and `index_tables`, keyed by country, may be shared with
+        other instances, see `AppServices`; each instance has its own without.
+        """
+
+        self.cache = cache
+        self.multipliers = multipliers if multipliers is not None else MultiplierTable()
+        self.index_tables = index_tables if index_tables is not None else {}
+
+    def get_index_constants(
+        self, cpi_service: CpiService, year: int, cpi_base: Decimal | None = None
+    ) -> IndexConstants | None:
+        """
+        The index constants of valuations in `year`, from a table built once
+        per CPI snapshot of the service's country. None without an October
+        CPI of the previous year.
+        """
+
+        cpi_base = cpi_base or self.CPI_BASE_OCT_2001
+        snapshot = cpi_service.snapshot
+
+        table = self.index_tables.get(cpi_service.country)
+        if table is None or not table.is_for(snapshot, cpi_base):
+            table = IndexConstantsTable(snapshot, cpi_base, self.index_constants)
+            self.index_tables[cpi_service.country] = table
+        return table.get(year)
+
+    def index_constants(
+        self, current_cpi: Decimal, cpi_base: Decimal | None = None
+    ) -> IndexConstants:
+        cpi_base = cpi_base or self.CPI_BASE_OCT_2001
+        index_factor = self._calculate_index_factor(current_cpi, cpi_base)
+
+        return IndexConstants(
+            cpi_value=current_cpi,
+            cpi_base=cpi_base,
+            index_factor=index_factor,
+            residential_maintenance_rate=(
+                self.RES_MAINTENANCE_BASE_RATE * index_factor
+            ).quantize(self.MAINTENANCE_RATE_DECIMALS, ROUND_HALF_UP),
+            commercial_maintenance_rate=(
+                self.COM_MAINTENANCE_BASE_RATE * index_factor
+            ).quantize(self.MAINTENANCE_RATE_DECIMALS, ROUND_HALF_UP),
+        )
+
     def calculate_valuation(
-        self, input_data: ValuationInput, cpi_data: CpiData
+        self,
+        input_data: ValuationInput,
+        cpi_data: CpiData,
+        cpi_base: Decimal | None = None,
+        constants: IndexConstants | None = None,
     ) -> ValuationResult:
+        """
+        Value a property. `constants`, from `get_index_constants`, spares
+        deriving the index factor and rates again; they are only used if
+        they match the CPI value and base. With a cache, results are looked
+        up there first.
+        """
+
+        cpi_base = cpi_base or self.CPI_BASE_OCT_2001
+        if self.cache is None:
+            return self._calculate_valuation(input_data, cpi_data, cpi_base, constants)
+
+        key = valuation_key(input_data, cpi_data, cpi_base)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._calculate_valuation(
+                input_data, cpi_data, cpi_base, constants
+            )
+            self.cache.put(key, result)
+        return result
+
+    def _calculate_valuation(
+        self,
+        input_data: ValuationInput,
+        cpi_data: CpiData,
+        cpi_base: Decimal,
+        constants: IndexConstants | None,
+    ) -> ValuationResult:
+        current_cpi = Decimal(str(cpi_data.index_value))
+        if (
+            constants is None
+            or constants.cpi_value != current_cpi
+            or constants.cpi_base != cpi_base
+        ):
+            constants = self.index_constants(current_cpi, cpi_base)
+
         land_value = self._calculate_land_value(
             Decimal(str(input_data.land_value_per_sqm)),
             Decimal(str(input_data.plot_area)),
@@ -42,10 +135,8 @@ class ValuationService:
             Decimal(str(input_data.monthly_net_rent))
         )
 
-        index_factor = self._calculate_index_factor(Decimal(str(cpi_data.index_value)))
-
         management_costs = self._calculate_management_costs(
-            input_data, index_factor, annual_gross_income
+            input_data, constants, annual_gross_income
         )
 
         annual_net_income = annual_gross_income - management_costs.total
@@ -81,8 +172,8 @@ class ValuationService:
         return ValuationResult(
             input_data=input_data,
             cpi_used=cpi_data,
-            cpi_base_2001=self.CPI_BASE_OCT_2001,
-            index_factor=index_factor,
+            cpi_base_2001=cpi_base,
+            index_factor=constants.index_factor,
             annual_gross_income=annual_gross_income,
             land_value=self._round_euro(land_value),
             management_costs=management_costs,
@@ -107,27 +198,29 @@ class ValuationService:
     def _calculate_annual_gross_income(self, monthly_net_rent: Decimal) -> Decimal:
         return monthly_net_rent * self.MONTHS_IN_YEAR
 
-    def _calculate_index_factor(self, current_cpi: Decimal) -> Decimal:
-        return current_cpi / self.CPI_BASE_OCT_2001
+    def _calculate_index_factor(
+        self, current_cpi: Decimal, cpi_base: Decimal | None = None
+    ) -> Decimal:
+        return current_cpi / (cpi_base or self.CPI_BASE_OCT_2001)
 
     def _calculate_management_costs(
         self,
         input_data: ValuationInput,
-        index_factor: Decimal,
+        constants: IndexConstants,
         annual_gross_income: Decimal,
     ) -> ManagementCosts:
         if input_data.property_type == PropertyType.RESIDENTIAL:
             return self._calculate_residential_costs(
-                input_data, index_factor, annual_gross_income
+                input_data, constants, annual_gross_income
             )
         return self._calculate_commercial_costs(
-            input_data, index_factor, annual_gross_income
+            input_data, constants, annual_gross_income
         )
 
     def _calculate_residential_costs(
         self,
         input_data: ValuationInput,
-        index_factor: Decimal,
+        constants: IndexConstants,
         annual_gross_income: Decimal,
     ) -> ManagementCosts:
         units = Decimal(str(input_data.residential_units or 0))
@@ -135,19 +228,17 @@ class ValuationService:
         if units > 0:
             administration = (
                 (Decimal("4.5") + Decimal("0.25") * units)
-                * index_factor
+                * constants.index_factor
                 * units
                 * self.MONTHS_IN_YEAR
             ).quantize(self.EURO, ROUND_HALF_UP)
         else:
             administration = Decimal("0")
 
-        maintenance_per_sqm = (self.RES_MAINTENANCE_BASE_RATE * index_factor).quantize(
-            self.MAINTENANCE_RATE_DECIMALS, ROUND_HALF_UP
+        maintenance = constants.residential_maintenance_rate * Decimal(
+            str(input_data.living_area)
         )
 
-        maintenance = maintenance_per_sqm * Decimal(str(input_data.living_area))
-
         risk_of_rent_loss = annual_gross_income * self.RES_RENT_LOSS_PERCENT
 
         total = administration + maintenance + risk_of_rent_loss
@@ -165,17 +256,15 @@ class ValuationService:
     def _calculate_commercial_costs(
         self,
         input_data: ValuationInput,
-        index_factor: Decimal,
+        constants: IndexConstants,
         annual_gross_income: Decimal,
     ) -> ManagementCosts:
         administration = annual_gross_income * self.COM_ADMIN_PERCENT
 
-        maintenance_per_sqm = (self.COM_MAINTENANCE_BASE_RATE * index_factor).quantize(
-            self.MAINTENANCE_RATE_DECIMALS, ROUND_HALF_UP
+        maintenance = constants.commercial_maintenance_rate * Decimal(
+            str(input_data.living_area)
         )
 
-        maintenance = maintenance_per_sqm * Decimal(str(input_data.living_area))
-
         risk_of_rent_loss = annual_gross_income * self.COM_RENT_LOSS_PERCENT
 
         total = administration + maintenance + risk_of_rent_loss
@@ -193,14 +282,7 @@ class ValuationService:
     def _calculate_multiplier(
         self, property_yield: Decimal, remaining_useful_life: Decimal
     ) -> Decimal:
-        i = float(property_yield / Decimal("100"))
-        n = float(remaining_useful_life)
-
-        if i == 0:
-            return remaining_useful_life
-
-        value = (1 - math.pow(1 + i, -n)) / i
-        return Decimal(str(value))
+        return self.multipliers.get(property_yield, remaining_useful_life)
 
     @staticmethod
     def _round_euro(value: Decimal | None) -> Decimal | None:
@@ -1,14 +1,20 @@
 import pytest
 from decimal import Decimal
 from datetime import date
+from pathlib import Path
 from unittest.mock import Mock
 
 from back.app.schemas.cpi import CpiPeriod
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
 from back.app.schemas.valuation import (
+    AIPromptSchema,
     PropertyType,
     ValuationInput,
     CpiData,
 )
+from back.app.tests.model_server import FakeModelServer
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
 @pytest.fixture
@@ -55,17 +61,43 @@ def sample_commercial_input():
     )
 
 
+@pytest.fixture
+def sample_ai_prompt():
+    return AIPromptSchema(
+        property_type="residential",
+        purchase_date="2024-01-15",
+        actual_purchase_price=Decimal("500000"),
+        theoretical_total_value=Decimal("412499"),
+        building_share_percent=Decimal("51.52"),
+        land_share_percent=Decimal("48.48"),
+        admin_costs=Decimal("1500"),
+        maintenance_costs=Decimal("1800"),
+        risk_amount=Decimal("360"),
+        risk_percentage=Decimal("1.50"),
+        index_factor=Decimal("1.4"),
+        cpi_value=Decimal("118.5"),
+        cpi_base_2001=Decimal("84.5"),
+    )
+
+
 @pytest.fixture
 def mock_cpi_parser():
     parser = Mock()
+    parser.country = "DE"
     parser._cpi_data = {
-        CpiPeriod(year=2023, month=10): 118.5,
-        CpiPeriod(year=2022, month=10): 115.2,
-        CpiPeriod(year=2024, month=1): 120.5,
-        CpiPeriod(year=2024, month=6): 122.0,
+        (2023, 10): 118.5,
+        (2022, 10): 115.2,
+        (2024, 1): 120.5,
+        (2024, 6): 122.0,
     }
-    parser.get_cpi_period_data = Mock(
-        side_effect=lambda period: parser._cpi_data.get(period)
+    parser.get_cpi_value = Mock(
+        side_effect=lambda year, month: parser._cpi_data.get((year, month))
+    )
+    parser.snapshot = CpiSnapshot(
+        version=3,
+        series=CpiSeries.from_items(
+            (year, month, value) for (year, month), value in parser._cpi_data.items()
+        ),
     )
     return parser
 
@@ -130,3 +162,31 @@ def mock_httpx_response():
     """
     mock_response.raise_for_status = Mock()
     return mock_response
+
+
+@pytest.fixture
+def recorded_cpi_page():
+    return (FIXTURES_DIR / "germany_historical_cpi.html").read_bytes()
+
+
+class FakeClock:
+    """A clock for code taking a `clock`, moved on by setting `now`."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+async def model_server():
+    server = FakeModelServer()
+    await server.start()
+    yield server
+    await server.close()
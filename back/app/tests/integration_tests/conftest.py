@@ -1,3 +1,4 @@
+import asyncio
 from datetime import date
 
 import pytest
@@ -5,6 +6,8 @@ from fastapi.testclient import TestClient
 from unittest.mock import Mock, AsyncMock
 from decimal import Decimal
 
+from back.app.services.app_services import AppServices
+from back.app.services.cpi_registry import CpiRegistry
 from back.app.services.llm_service import LLMService
 from back.main import create_app
 from back.app.schemas.valuation import ValuationInput, PropertyType
@@ -13,9 +16,18 @@ from back.app.services.valuation_service import ValuationService
 
 
 @pytest.fixture
-def app():
+def cpi_registry():
+    return CpiRegistry()
+
+
+@pytest.fixture
+def app(cpi_registry):
+    # TestClient is used without its context manager, so the lifespan that
+    # creates the services does not run.
     app = create_app()
-    return app
+    app.state.services = AppServices.create(cpi_registry=cpi_registry)
+    yield app
+    asyncio.run(app.state.services.aclose())
 
 
 @pytest.fixture
@@ -33,6 +45,11 @@ def mock_cpi_service():
     return service
 
 
+@pytest.fixture
+def cpi_service(mock_cpi_parser):
+    return CpiService(cpi_parser_service=mock_cpi_parser)
+
+
 @pytest.fixture
 def valuation_input():
     return ValuationInput(
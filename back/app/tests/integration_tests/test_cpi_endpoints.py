@@ -1,9 +1,13 @@
+import math
+from array import array
+
 import pytest
 from datetime import date
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 
 from back.app.api.dependencies import get_cpi_service, cpi_service_dep
+from back.app.services.cpi_registry import CpiRegistry
 
 
 class TestCpiEndpoints:
@@ -95,3 +99,88 @@ class TestCpiEndpoints:
         assert "CPI" in response.json()["detail"]
 
         app.dependency_overrides.clear()
+
+
+class TestCpiRangeEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    def test_get_cpi_range_json(self, client):
+        response = client.get("/api/cpi/range?from=2023-10&to=2024-01")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "version": 3,
+            "periods": ["2023-10", "2023-11", "2023-12", "2024-01"],
+            "values": [118.5, None, None, 120.5],
+        }
+
+    def test_get_cpi_range_float64(self, client):
+        response = client.get("/api/cpi/range?from=2023-10&to=2024-01&encoding=f64")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["x-cpi-version"] == "3"
+        assert response.headers["x-cpi-from"] == "2023-10"
+        assert response.headers["x-cpi-months"] == "4"
+
+        values = array("d", response.content)
+        assert values[0] == 118.5
+        assert math.isnan(values[1])
+        assert values[3] == 120.5
+
+    def test_get_cpi_range_float32(self, client):
+        response = client.get("/api/cpi/range?from=2023-10&to=2024-01&encoding=f32")
+
+        assert response.status_code == 200
+        assert len(response.content) == 4 * 4
+        assert array("f", response.content)[0] == 118.5
+
+    def test_get_cpi_range_invalid_period_format(self, client):
+        response = client.get("/api/cpi/range?from=2023-13&to=2024-01")
+
+        assert response.status_code == 422
+
+    def test_get_cpi_range_start_after_end(self, client):
+        response = client.get("/api/cpi/range?from=2024-02&to=2024-01")
+
+        assert response.status_code == 400
+        assert "must not be after its end" in response.json()["detail"]
+
+    def test_get_cpi_range_year_too_early(self, client):
+        response = client.get("/api/cpi/range?from=2001-01&to=2024-01")
+
+        assert response.status_code == 400
+        assert "year must be between 2002 and today" in response.json()["detail"]
+
+
+class TestCountryCpiEndpoint:
+    @pytest.fixture
+    def cpi_registry(self, mock_cpi_parser):
+        mock_cpi_parser.country = "FR"
+        mock_cpi_parser.aclose = AsyncMock()
+        return CpiRegistry(
+            countries=["DE", "FR"], parser_factory=lambda country: mock_cpi_parser
+        )
+
+    def test_get_country_cpi(self, client, mock_cpi_parser):
+        response = client.get("/api/cpi/fr/2023/10")
+
+        assert response.status_code == 200
+        assert response.json() == 118.5
+        mock_cpi_parser.get_cpi_value.assert_called_with(2023, 10)
+
+    def test_get_country_cpi_unknown_country(self, client):
+        response = client.get("/api/cpi/US/2023/10")
+
+        assert response.status_code == 400
+        assert "US is not supported" in response.json()["detail"]
+
+    def test_get_country_cpi_invalid_month(self, client):
+        response = client.get("/api/cpi/FR/2023/13")
+
+        assert response.status_code == 400
+        assert "month must be between 1 and 12" in response.json()["detail"]
@@ -1,11 +1,28 @@
+import asyncio
+import io
+import json
+
+import httpx
+import pandas as pd
 import pytest
-from unittest.mock import Mock
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, Mock
+from concurrent.futures import ThreadPoolExecutor
+from starlette.requests import ClientDisconnect
 
 from back.app.api.dependencies import (
     get_cpi_service,
+    get_simulation_service,
     get_valuation_service,
     get_llm_service,
 )
+from back.app.services.analysis_cache import AnalysisCache
+from back.app.services.cpi_registry import CpiRegistry
+from back.app.services.llm_admission import LLMAdmission
+from back.app.services.llm_service import LLMService
+from back.app.services.simulation_service import SimulationService
+from back.app.services.valuation_cache import ValuationCache
+from back.app.services.valuation_service import ValuationService
 
 
 class TestValuationCalculateEndpoint:
@@ -205,6 +222,207 @@ class TestValuationCalculateEndpoint:
 
         app.dependency_overrides.clear()
 
+    @pytest.fixture
+    def cpi_registry(self, mock_cpi_parser):
+        mock_cpi_parser.country = "FR"
+        mock_cpi_parser.aclose = AsyncMock()
+        mock_cpi_parser._cpi_data[(2001, 10)] = 76.1
+        return CpiRegistry(
+            countries=["DE", "FR"], parser_factory=lambda country: mock_cpi_parser
+        )
+
+    def test_calculate_valuation_with_country(
+        self,
+        app,
+        client,
+        mock_cpi_service,
+        mock_valuation_service,
+        override_valuation_dependency,
+        valuation_input,
+    ):
+        app.dependency_overrides[get_valuation_service] = override_valuation_dependency
+
+        request_data = valuation_input.model_dump(mode="json") | {
+            "purchase_date": "2023-03-01",
+            "country": "fr",
+        }
+        response = client.post("/api/valuation/calculate", json=request_data)
+
+        assert response.status_code == 200
+        _, cpi_data = mock_valuation_service.calculate_valuation.call_args.args
+        assert cpi_data.index_value == Decimal("115.2")
+        assert mock_valuation_service.calculate_valuation.call_args.kwargs[
+            "cpi_base"
+        ] == Decimal("76.1")
+        mock_cpi_service.get_cpi_october_previous_year.assert_not_called()
+
+    def test_calculate_valuation_unknown_country(self, app, client, valuation_input):
+        request_data = valuation_input.model_dump(mode="json") | {"country": "US"}
+        response = client.post("/api/valuation/calculate", json=request_data)
+
+        assert response.status_code == 400
+        assert "US is not supported" in response.json()["detail"]
+
+
+class TestValuationBatchEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def payload(self, valuation_input):
+        return valuation_input.model_dump(mode="json") | {"purchase_date": "2024-03-01"}
+
+    @staticmethod
+    def _lines(response):
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_json_array(self, client, payload):
+        response = client.post("/api/valuation/calculate/batch", json=[payload] * 100)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = self._lines(response)
+        assert [line["index"] for line in lines] == list(range(100))
+        assert all("result" in line for line in lines)
+        assert lines[0]["result"]["cpi_used"]["index_value"] == "118.5"
+
+    def test_ndjson_with_per_item_errors(self, client, payload, cpi_service):
+        body = "\n".join(
+            [
+                json.dumps(payload),
+                "{not json",
+                json.dumps(payload | {"purchase_date": "2019-01-01"}),
+                json.dumps(payload),
+            ]
+        )
+
+        response = client.post(
+            "/api/valuation/calculate/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        lines = self._lines(response)
+        assert "result" in lines[0]
+        assert lines[1]["error"].startswith("Invalid JSON")
+        assert lines[2]["error"] == "CPI data not found for October 2018"
+        assert "result" in lines[3]
+
+    def test_single_result_matches_calculate(self, client, payload):
+        single = client.post("/api/valuation/calculate", json=payload).json()
+
+        response = client.post("/api/valuation/calculate/batch", json=[payload])
+
+        assert self._lines(response)[0]["result"] == single
+
+
+class TestValuationCacheEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_dependencies(self, app, cpi_service):
+        service = ValuationService(cache=ValuationCache())
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        app.dependency_overrides[get_valuation_service] = lambda: service
+        yield
+        app.dependency_overrides.clear()
+
+    def test_repeated_valuation_is_a_hit(self, client, valuation_input):
+        payload = valuation_input.model_dump(mode="json") | {
+            "purchase_date": "2024-03-01"
+        }
+
+        first = client.post("/api/valuation/calculate", json=payload)
+        second = client.post("/api/valuation/calculate", json=payload)
+        stats = client.get("/api/valuation/cache").json()
+
+        assert second.json() == first.json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+
+class TestValuationPortfolioEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def csv_body(self, valuation_input):
+        row = valuation_input.model_dump(mode="json") | {"purchase_date": "2024-03-01"}
+        frame = pd.DataFrame([row] * 3).rename(columns={"monthly_net_rent": "Rent"})
+        frame["portfolio_id"] = ["A", "B", "C"]
+        frame.loc[1, "Rent"] = "-1"
+        return frame.to_csv(index=False)
+
+    def test_csv(self, client, csv_body):
+        response = client.post(
+            "/api/valuation/portfolio",
+            params={"column": "Rent=monthly_net_rent"},
+            content=csv_body,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        valued = pd.read_csv(io.StringIO(response.text))
+        assert valued["portfolio_id"].tolist() == ["A", "B", "C"]
+        assert valued["theoretical_total_value"].notna().tolist() == [
+            True,
+            False,
+            True,
+        ]
+        assert valued["error"][1].startswith("monthly_net_rent")
+
+    def test_parquet(self, client, csv_body):
+        response = client.post(
+            "/api/valuation/portfolio",
+            params={"column": "Rent=monthly_net_rent", "output": "parquet"},
+            content=csv_body,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.parquet"
+        valued = pd.read_parquet(io.BytesIO(response.content))
+        assert valued["portfolio_id"].tolist() == ["A", "B", "C"]
+        assert valued["error"][1].startswith("monthly_net_rent")
+
+        csv = client.post(
+            "/api/valuation/portfolio",
+            params={"output": "csv"},
+            content=response.content,
+            headers={"Content-Type": "application/vnd.apache.parquet"},
+        )
+
+        assert csv.status_code == 200
+        assert csv.headers["content-type"].startswith("text/csv")
+        assert len(pd.read_csv(io.StringIO(csv.text))) == 3
+
+    def test_bad_column_mapping(self, client, csv_body):
+        response = client.post(
+            "/api/valuation/portfolio",
+            params={"column": "Rent=rent"},
+            content=csv_body,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 400
+        assert "rent" in response.json()["detail"]
+
+    def test_empty_file(self, client):
+        response = client.post(
+            "/api/valuation/portfolio",
+            content=b"",
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 400
+
 
 class TestValuationAnalysisEndpoint:
     def test_ai_analysis_success(
@@ -344,3 +562,555 @@ class TestValuationAnalysisEndpoint:
         response = client.post("/api/valuation/calculate/analysis", json=invalid_result)
 
         assert response.status_code == 422
+
+
+class TestValuationTimelineEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    def test_months_match_calculate(self, client, valuation_input):
+        input_data = valuation_input.model_dump(mode="json")
+
+        response = client.post(
+            "/api/valuation/timeline",
+            json={"input_data": input_data, "start": "2022-11", "end": "2024-02"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["periods"]) == 16
+        assert data["cpi_value"][:2] == [None, None]
+        assert data["cpi_value"][2:14] == [115.2] * 12
+        assert data["cpi_value"][14:] == [118.5] * 2
+
+        single = client.post(
+            "/api/valuation/calculate",
+            json=input_data | {"purchase_date": "2024-02-01"},
+        ).json()
+        assert data["theoretical_total_value"][-1] == float(
+            single["theoretical_total_value"]
+        )
+
+    def test_invalid_span(self, client, valuation_input):
+        response = client.post(
+            "/api/valuation/timeline",
+            json={
+                "input_data": valuation_input.model_dump(mode="json"),
+                "start": "2024-02",
+                "end": "2023-01",
+            },
+        )
+
+        assert response.status_code == 422
+
+
+class TestValuationImpliedYieldEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def input_data(self, client, valuation_input):
+        payload = valuation_input.model_dump(mode="json") | {
+            "purchase_date": "2024-03-01"
+        }
+        # Priced at its value at a 5.5 % yield, then solved from 3 %.
+        value = client.post("/api/valuation/calculate", json=payload).json()
+        return payload | {
+            "actual_purchase_price": value["theoretical_total_value"],
+            "property_yield": "3",
+        }
+
+    def test_recovers_yield(self, client, input_data):
+        response = client.post(
+            "/api/valuation/implied-yield", json={"input_data": input_data}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "converged"
+        assert data["property_yield"] == pytest.approx(5.5, abs=1e-4)
+        assert data["iterations"] > 0
+
+    def test_batch(self, client, input_data):
+        unreachable = input_data | {"actual_purchase_price": "1e12"}
+
+        response = client.post(
+            "/api/valuation/implied-yield/batch",
+            json={"inputs": [input_data, unreachable, input_data]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["status"] for r in data["results"]] == [
+            "converged",
+            "no_solution",
+            "converged",
+        ]
+        assert data["converged"] == 2
+
+    def test_price_is_required(self, client, input_data):
+        input_data.pop("actual_purchase_price")
+
+        response = client.post(
+            "/api/valuation/implied-yield", json={"input_data": input_data}
+        )
+
+        assert response.status_code == 422
+
+
+class TestValuationSensitivityEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_cpi_service(self, app, cpi_service):
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.fixture
+    def payload(self, valuation_input):
+        return {
+            "input_data": valuation_input.model_dump(mode="json")
+            | {"purchase_date": "2024-03-01"},
+            "ranges": [
+                {"parameter": "property_yield", "start": 3, "stop": 7, "step": 0.01},
+                {
+                    "parameter": "monthly_net_rent",
+                    "start": 1500,
+                    "stop": 2500,
+                    "step": 10,
+                },
+            ],
+        }
+
+    def test_grid(self, client, payload):
+        response = client.post("/api/valuation/sensitivity", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["parameters"] == ["property_yield", "monthly_net_rent"]
+        assert data["shape"] == [401, 101]
+        assert len(data["theoretical_total_value"]) == 401 * 101
+        assert len(data["land_share_percent"]) == 401 * 101
+
+    def test_point_matches_calculate(self, client, payload):
+        payload["ranges"] = [
+            {"parameter": "property_yield", "start": 5.5, "stop": 5.5, "step": 1}
+        ]
+
+        grid = client.post("/api/valuation/sensitivity", json=payload).json()
+        single = client.post(
+            "/api/valuation/calculate", json=payload["input_data"]
+        ).json()
+
+        assert grid["theoretical_total_value"] == [
+            float(single["theoretical_total_value"])
+        ]
+        assert grid["building_share_percent"] == [
+            float(single["building_share_percent"])
+        ]
+
+    def test_missing_cpi(self, client, payload):
+        payload["input_data"]["purchase_date"] = "2019-01-01"
+
+        response = client.post("/api/valuation/sensitivity", json=payload)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "CPI data not found for October 2018"
+
+    def test_grid_too_large(self, client, payload):
+        payload["ranges"][0]["step"] = 0.001
+
+        response = client.post("/api/valuation/sensitivity", json=payload)
+
+        assert response.status_code == 422
+
+
+class TestValuationSimulateEndpoint:
+    @pytest.fixture(autouse=True)
+    def override_services(self, app, cpi_service):
+        simulation_service = SimulationService(executor=ThreadPoolExecutor(2))
+        app.dependency_overrides[get_cpi_service] = lambda: cpi_service
+        app.dependency_overrides[get_simulation_service] = lambda: simulation_service
+        yield
+        app.dependency_overrides.clear()
+        simulation_service.shutdown()
+
+    @pytest.fixture
+    def payload(self, valuation_input):
+        return {
+            "input_data": valuation_input.model_dump(mode="json")
+            | {"purchase_date": "2024-03-01"},
+            "property_yield": {"kind": "normal", "mean": 5.5, "std": 0.5},
+            "vacancy": {"kind": "uniform", "low": 0, "high": 10},
+            "iterations": 20_000,
+            "seed": 7,
+            "bins": 20,
+        }
+
+    def test_simulate(self, client, payload):
+        response = client.post("/api/valuation/simulate", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["iterations"] == 20_000
+        assert data["seed"] == 7
+        assert data["percentiles"]["p5"] < data["percentiles"]["p95"]
+        assert sum(data["histogram"]["counts"]) == 20_000
+        assert len(data["histogram"]["edges"]) == 21
+
+    def test_seeded_runs_are_reproducible(self, client, payload):
+        first = client.post("/api/valuation/simulate", json=payload).json()
+        second = client.post("/api/valuation/simulate", json=payload).json()
+
+        assert first == second
+
+    def test_invalid_distribution(self, client, payload):
+        payload["vacancy"] = {"kind": "uniform", "low": 10, "high": 0}
+
+        response = client.post("/api/valuation/simulate", json=payload)
+
+        assert response.status_code == 422
+
+    def test_missing_cpi(self, client, payload):
+        payload["input_data"]["purchase_date"] = "2019-01-01"
+
+        response = client.post("/api/valuation/simulate", json=payload)
+
+        assert response.status_code == 400
+
+
+class TestValuationAnalysisStreamEndpoint:
+    @pytest.fixture
+    def valuation_result(self, sample_residential_input, sample_cpi_data):
+        from back.app.services.valuation_service import ValuationService
+
+        return (
+            ValuationService()
+            .calculate_valuation(sample_residential_input, sample_cpi_data)
+            .model_dump(mode="json")
+        )
+
+    @pytest.fixture
+    def llm_service(self, app):
+        service = Mock()
+        app.dependency_overrides[get_llm_service] = lambda: service
+        yield service
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def _events(text):
+        events = []
+        for block in text.strip().split("\n\n"):
+            fields = dict(
+                line.split(": ", 1) for line in block.splitlines() if ": " in line
+            )
+            if "data" in fields:
+                events.append((fields.get("event", "message"), fields["data"]))
+        return events
+
+    def test_streams_chunks(self, client, llm_service, valuation_result):
+        async def chunks():
+            yield "Fair "
+            yield "value.\nLine two"
+
+        llm_service.get_llm_analysis_stream = AsyncMock(return_value=chunks())
+
+        response = client.post(
+            "/api/valuation/calculate/analysis/stream", json=valuation_result
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self._events(response.text)
+        assert events == [
+            ("message", '"Fair "'),
+            ("message", '"value.\\nLine two"'),
+            ("done", "{}"),
+        ]
+        assert "".join(json.loads(data) for _, data in events[:-1]) == (
+            "Fair value.\nLine two"
+        )
+
+    def test_failure_part_way(self, client, llm_service, valuation_result):
+        async def chunks():
+            yield "Fair "
+            raise RuntimeError("stream reset")
+
+        llm_service.get_llm_analysis_stream = AsyncMock(return_value=chunks())
+
+        response = client.post(
+            "/api/valuation/calculate/analysis/stream", json=valuation_result
+        )
+
+        events = self._events(response.text)
+        assert events[0] == ("message", '"Fair "')
+        assert events[-1][0] == "error"
+        assert "stream reset" in json.loads(events[-1][1])
+
+    def test_failure_to_start(self, client, llm_service, valuation_result):
+        llm_service.get_llm_analysis_stream = AsyncMock(
+            side_effect=RuntimeError("LLM API error")
+        )
+
+        response = client.post(
+            "/api/valuation/calculate/analysis/stream", json=valuation_result
+        )
+
+        assert response.status_code == 500
+        assert "LLM API error" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_upstream(self, app, llm_service, valuation_result):
+        closed = asyncio.Event()
+        first_sent = asyncio.Event()
+
+        async def chunks():
+            try:
+                yield "Fair "
+                await asyncio.Event().wait()
+                yield "never sent"
+            finally:
+                closed.set()
+
+        llm_service.get_llm_analysis_stream = AsyncMock(return_value=chunks())
+        body = json.dumps(valuation_result).encode()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await first_sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and b"data:" in message.get(
+                "body", b""
+            ):
+                first_sent.set()
+
+        await asyncio.wait_for(app(self._scope("2.3"), receive, send), timeout=5)
+
+        assert closed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_before_the_first_chunk_frees_the_slot(
+        self, app, valuation_result
+    ):
+        admission = LLMAdmission(max_concurrency=1)
+        service = LLMService(api_key="test", model="test-model", admission=admission)
+        upstream = MagicMock()
+        upstream.close = AsyncMock()
+        service._client = Mock()
+        service._client.chat.completions.create = AsyncMock(return_value=upstream)
+        app.dependency_overrides[get_llm_service] = lambda: service
+        body = json.dumps(valuation_result).encode()
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            # The client is gone before anything reaches it.
+            raise OSError("connection reset")
+
+        with pytest.raises(ClientDisconnect):
+            await asyncio.wait_for(app(self._scope("2.4"), receive, send), timeout=5)
+        app.dependency_overrides.clear()
+
+        assert admission.stats.in_flight == 0
+        upstream.close.assert_awaited_once()
+
+    @staticmethod
+    def _scope(spec_version):
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": spec_version},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/api/valuation/calculate/analysis/stream",
+            "raw_path": b"/api/valuation/calculate/analysis/stream",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+
+
+class TestValuationAnalysisCacheEndpoint:
+    @pytest.fixture
+    def valuation_result(self, sample_residential_input, sample_cpi_data):
+        from back.app.services.valuation_service import ValuationService
+
+        return (
+            ValuationService()
+            .calculate_valuation(sample_residential_input, sample_cpi_data)
+            .model_dump(mode="json")
+        )
+
+    @pytest.fixture
+    def llm_service(self, app):
+        cache = AnalysisCache()
+        service = LLMService(api_key="test", model="test-model", cache=cache)
+        service._client = Mock()
+        service._client.chat.completions.create = AsyncMock(
+            return_value=Mock(choices=[Mock(message=Mock(content="Fair value."))])
+        )
+        app.dependency_overrides[get_llm_service] = lambda: service
+        yield service
+        app.dependency_overrides.clear()
+
+    def test_repeated_analysis_is_a_hit(self, client, llm_service, valuation_result):
+        first = client.post("/api/valuation/calculate/analysis", json=valuation_result)
+        second = client.post("/api/valuation/calculate/analysis", json=valuation_result)
+        stats = client.get("/api/valuation/calculate/analysis/cache").json()
+
+        assert first.json() == second.json() == "Fair value."
+        assert llm_service._client.chat.completions.create.await_count == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+class TestAppServicesDependency:
+    def test_requests_share_the_app_services(self, app, client):
+        services = app.state.services
+        client.get("/api/valuation/cache")
+        client.get("/api/valuation/cache")
+
+        assert app.state.services is services
+        assert isinstance(services.valuation_service.cache, ValuationCache)
+
+    def test_missing_services_raise(self, app, client):
+        services = app.state.services
+        del app.state.services
+
+        with pytest.raises(RuntimeError, match="services were not created"):
+            client.get("/api/valuation/cache")
+
+        app.state.services = services
+
+
+class TestValuationAnalysisSingleFlight:
+    @pytest.fixture
+    def valuation_result(self, sample_residential_input, sample_cpi_data):
+        return (
+            ValuationService()
+            .calculate_valuation(sample_residential_input, sample_cpi_data)
+            .model_dump(mode="json")
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_make_one_model_call(
+        self, app, model_server, valuation_result
+    ):
+        service = model_server.llm_service()
+        app.dependency_overrides[get_llm_service] = lambda: service
+        model_server.hold = True
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            requests = [
+                asyncio.ensure_future(
+                    client.post(
+                        "/api/valuation/calculate/analysis", json=valuation_result
+                    )
+                )
+                for _ in range(8)
+            ]
+            await model_server.received.wait()
+            model_server.release.set()
+            responses = await asyncio.gather(*requests)
+
+        await service.aclose()
+        app.dependency_overrides.clear()
+
+        assert [r.status_code for r in responses] == [200] * 8
+        assert {r.json() for r in responses} == {"Fair value."}
+        assert model_server.requests == 1
+
+
+class TestValuationAnalysisAdmission:
+    @pytest.fixture
+    def valuation_result(self, sample_residential_input, sample_cpi_data):
+        return (
+            ValuationService()
+            .calculate_valuation(sample_residential_input, sample_cpi_data)
+            .model_dump(mode="json")
+        )
+
+    @pytest.fixture
+    async def service(self, app, model_server):
+        service = model_server.llm_service()
+        app.dependency_overrides[get_llm_service] = lambda: service
+        yield service
+        await service.aclose()
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    async def _overload(app, model_server, valuation_result, url):
+        other = valuation_result | {"theoretical_total_value": 1}
+        model_server.hold = True
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            first = asyncio.ensure_future(
+                client.post("/api/valuation/calculate/analysis", json=valuation_result)
+            )
+            await model_server.received.wait()
+            rejected = await client.post(url, json=other)
+            stats = (await client.get("/api/valuation/calculate/analysis/queue")).json()
+            model_server.release.set()
+            assert (await first).status_code == 200
+        return rejected, stats
+
+    @pytest.mark.asyncio
+    async def test_full_queue_answers_429(
+        self, app, model_server, service, valuation_result
+    ):
+        service.admission = LLMAdmission(max_concurrency=1, rate=0.5, max_queue=0)
+
+        response, stats = await self._overload(
+            app, model_server, valuation_result, "/api/valuation/calculate/analysis"
+        )
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert stats["in_flight"] == 1
+        assert stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timed_out_wait_answers_503(
+        self, app, model_server, service, valuation_result
+    ):
+        service.admission = LLMAdmission(max_concurrency=1, queue_timeout=0.01)
+
+        response, stats = await self._overload(
+            app,
+            model_server,
+            valuation_result,
+            "/api/valuation/calculate/analysis/stream",
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert stats["timed_out"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_queue_stats_without_admission(self, app, client):
+        service = Mock(admission=None)
+        app.dependency_overrides[get_llm_service] = lambda: service
+
+        response = client.get("/api/valuation/calculate/analysis/queue")
+        app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["in_flight"] == 0
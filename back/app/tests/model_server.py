@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from back.app.services.llm_service import LLMService
+
+__all__ = ["FakeModelServer"]
+
+
+class FakeModelServer:
+    """
+    A local HTTP server answering chat completions like the model provider.
+
+    Answers wait for `release` while `hold` is set, so tests can pile up
+    concurrent requests; `status` other than 200 answers with an error.
+    """
+
+    def __init__(self, content: str = "Fair value."):
+        self.content = content
+        self.status = 200
+        self.hold = False
+        self.release = asyncio.Event()
+        self.requests = 0
+        self.connections = 0
+        self.received = asyncio.Event()
+        self.base_url = ""
+        self._server = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+
+    async def close(self) -> None:
+        self.release.set()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def llm_service(self, **kwargs) -> LLMService:
+        service = LLMService(api_key="test", model="test-model", **kwargs)
+        service._client = service._client.with_options(
+            base_url=self.base_url, max_retries=0
+        )
+        return service
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                self.requests += 1
+                self.received.set()
+                if self.hold:
+                    await self.release.wait()
+                writer.write(self._response())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _response(self) -> bytes:
+        if self.status == 200:
+            body = {
+                "id": "test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "test-model",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": self.content},
+                    }
+                ],
+            }
+        else:
+            body = {"error": {"message": "model unavailable", "type": "server_error"}}
+        payload = json.dumps(body).encode()
+        return (
+            f"HTTP/1.1 {self.status} X\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        ).encode() + payload
@@ -0,0 +1,55 @@
+import pytest
+from decimal import Decimal
+
+from back.app.schemas.valuation import AIPromptSchema
+from back.app.services.analysis_cache import AnalysisCache, analysis_key
+
+
+class TestAnalysisKey:
+    def test_same_request_shares_a_key(self, sample_ai_prompt):
+        same = AIPromptSchema.model_validate(sample_ai_prompt.model_dump(mode="json"))
+
+        assert analysis_key("gpt-4o", "system", "user", same) == analysis_key(
+            "gpt-4o", "system", "user", sample_ai_prompt
+        )
+
+    def test_model_and_prompts_are_part_of_the_key(self, sample_ai_prompt):
+        key = analysis_key("gpt-4o", "system", "user", sample_ai_prompt)
+
+        assert key != analysis_key("gpt-4o-mini", "system", "user", sample_ai_prompt)
+        assert key != analysis_key("gpt-4o", "system v2", "user", sample_ai_prompt)
+        assert key != analysis_key("gpt-4o", "system", "user v2", sample_ai_prompt)
+
+    def test_fields_rounded_away_by_the_prompt_are_part_of_the_key(
+        self, sample_ai_prompt
+    ):
+        # The prompt shows the building share to one decimal.
+        other = sample_ai_prompt.model_copy(
+            update={"building_share_percent": Decimal("51.53")}
+        )
+
+        assert analysis_key("gpt-4o", "system", "user", other) != analysis_key(
+            "gpt-4o", "system", "user", sample_ai_prompt
+        )
+
+
+class TestAnalysisCache:
+    def test_hit_rate(self):
+        cache = AnalysisCache()
+        cache.put("a", "Fair value.")
+
+        assert cache.get("a") == "Fair value."
+        assert cache.get("a") == "Fair value."
+        assert cache.get("b") is None
+        assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_disk_tier_survives_restarts(self, tmp_path):
+        path = tmp_path / "analyses.sqlite3"
+        cache = AnalysisCache(path=path)
+        cache.put("a", "Fair value.\nSecond line.")
+        cache.close()
+
+        restarted = AnalysisCache(path=path)
+
+        assert restarted.get("a") == "Fair value.\nSecond line."
+        assert restarted.stats.disk_hits == 1
@@ -0,0 +1,141 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from back.app.core.config import settings
+from back.app.services.analysis_cache import AnalysisCache
+from back.app.services.app_services import AppServices
+from back.app.services.cpi_registry import CpiRegistry, UnknownCpiCountryError
+from back.app.services.valuation_cache import ValuationCache
+
+
+@pytest.fixture
+async def services():
+    services = AppServices.create(caches=False)
+    yield services
+    await services.aclose()
+
+
+def _parser(country):
+    parser = Mock()
+    parser.country = country
+    return parser
+
+
+class TestAppServices:
+    @pytest.mark.asyncio
+    async def test_engine_services_share_one_engine(self, services):
+        engine = services.sensitivity_service._engine
+
+        assert services.implied_yield_service._engine is engine
+        assert services.timeline_service._engine is engine
+
+    @pytest.mark.asyncio
+    async def test_llm_client_uses_the_tuned_pool(self, services):
+        pool = services.llm_service._client._client._transport._pool
+
+        assert pool._max_connections == settings.LLM_MAX_CONNECTIONS
+        assert pool._max_keepalive_connections == (
+            settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+        )
+        assert pool._keepalive_expiry == settings.LLM_KEEPALIVE_EXPIRY
+
+    @pytest.mark.asyncio
+    async def test_caches_follow_the_settings(self):
+        services = AppServices.create()
+
+        assert isinstance(services.valuation_service.cache, ValuationCache)
+        assert services.valuation_service.cache.maxsize == (
+            settings.VALUATION_CACHE_SIZE
+        )
+        assert isinstance(services.llm_service.cache, AnalysisCache)
+        assert services.llm_service.cache.ttl == settings.ANALYSIS_CACHE_TTL
+        assert services.uncached_valuation_service.cache is None
+        await services.aclose()
+
+    @pytest.mark.asyncio
+    async def test_without_caches(self, services):
+        assert services.valuation_service.cache is None
+        assert services.llm_service.cache is None
+
+    @pytest.mark.asyncio
+    async def test_cpi_service_is_kept_per_parser(self, services):
+        de, at = _parser("DE"), _parser("AT")
+
+        service = services.cpi_service(de)
+
+        assert services.cpi_service(de) is service
+        assert services.cpi_service(at) is not service
+        assert services.cpi_service(at).parser is at
+
+    @pytest.mark.asyncio
+    async def test_cpi_service_follows_a_replaced_parser(self, services):
+        services.cpi_service(_parser("DE"))
+        replacement = _parser("DE")
+
+        assert services.cpi_service(replacement).parser is replacement
+
+    @pytest.mark.asyncio
+    async def test_valuation_services_share_their_tables(self, services):
+        cached = services.valuation_service
+        uncached = services.uncached_valuation_service
+
+        assert cached.multipliers is uncached.multipliers
+        assert cached.index_tables is uncached.index_tables
+
+    @pytest.mark.asyncio
+    async def test_apps_do_not_share_tables(self, services):
+        other = AppServices.create(caches=False)
+
+        assert other.valuation_service.multipliers is not (
+            services.valuation_service.multipliers
+        )
+        assert other.valuation_service.index_tables is not (
+            services.valuation_service.index_tables
+        )
+        await other.aclose()
+
+    @pytest.mark.asyncio
+    async def test_country_cpi_service_is_kept_per_country(self):
+        parser = _parser("FR")
+        parser.snapshot.series = [118.5]
+        parser.aclose = AsyncMock()
+        registry = CpiRegistry(countries=["DE", "FR"], parser_factory=lambda c: parser)
+        services = AppServices.create(caches=False, cpi_registry=registry)
+
+        service = await services.country_cpi_service("fr")
+
+        assert service.parser is parser
+        assert await services.country_cpi_service("FR") is service
+        with pytest.raises(UnknownCpiCountryError):
+            await services.country_cpi_service("US")
+        await services.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_the_pool(self):
+        services = AppServices.create(caches=False)
+        client = services.llm_service._client._client
+
+        await services.aclose()
+
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_caches_and_simulations(self, tmp_path):
+        services = AppServices.create(caches=False)
+        services.valuation_service.cache = ValuationCache(path=tmp_path / "v.sqlite3")
+        services.valuation_service.cache.clear()
+        services.simulation_service.executor
+
+        await services.aclose()
+
+        assert services.valuation_service.cache._db is None
+        assert services.simulation_service._executor is None
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_the_cpi_registry(self):
+        registry = Mock(spec=CpiRegistry)
+        services = AppServices.create(caches=False, cpi_registry=registry)
+
+        await services.aclose()
+
+        registry.aclose.assert_awaited_once()
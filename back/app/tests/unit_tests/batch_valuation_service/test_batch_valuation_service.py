@@ -0,0 +1,104 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import Mock
+
+from back.app.schemas.valuation import CpiData
+from back.app.services.batch_valuation_service import BatchValuationService
+from back.app.services.cpi_registry import CpiRegistry
+from back.app.services.cpi_service import CpiService
+from back.app.services.json_stream import JsonStreamError
+from back.app.services.valuation_service import ValuationService
+
+
+async def _items(*items):
+    for item in items:
+        yield item
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestBatchValuationService:
+    @pytest.fixture
+    def cpi_service(self, mock_cpi_parser):
+        return CpiService(cpi_parser_service=mock_cpi_parser)
+
+    @pytest.fixture
+    def french_parser(self, mock_cpi_parser):
+        parser = Mock()
+        parser.country = "FR"
+        data = {(2001, 10): 76.1, (2023, 10): 117.1}
+        parser.get_cpi_value = Mock(side_effect=lambda y, m: data.get((y, m)))
+        parser.snapshot = mock_cpi_parser.snapshot
+        return parser
+
+    @pytest.fixture
+    def service(self, cpi_service, french_parser):
+        registry = CpiRegistry(
+            countries=["DE", "FR"], parser_factory=lambda country: french_parser
+        )
+
+        async def country_cpi_service(country):
+            return CpiService(cpi_parser_service=await registry.acquire(country))
+
+        return BatchValuationService(
+            valuation_service=ValuationService(),
+            cpi_service=cpi_service,
+            country_cpi_service=country_cpi_service,
+        )
+
+    @pytest.fixture
+    def payload(self, sample_residential_input):
+        return sample_residential_input.model_dump(mode="json")
+
+    @pytest.mark.asyncio
+    async def test_results_match_single_valuation(
+        self, service, payload, sample_residential_input
+    ):
+        results = await _collect(service.calculate(_items(payload, payload)))
+
+        expected = ValuationService().calculate_valuation(
+            sample_residential_input,
+            CpiData(year=2024, month=1, index_value=118.5),
+        )
+        assert [item.index for item in results] == [0, 1]
+        assert results[0].result == expected
+        assert results[1].error is None
+
+    @pytest.mark.asyncio
+    async def test_cpi_resolved_once_per_year(self, service, payload, mock_cpi_parser):
+        other_year = payload | {"purchase_date": "2023-05-01"}
+
+        await _collect(
+            service.calculate(_items(payload, other_year, payload, other_year))
+        )
+
+        assert mock_cpi_parser.get_cpi_value.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_per_item_errors(self, service, payload):
+        results = await _collect(
+            service.calculate(
+                _items(
+                    payload | {"monthly_net_rent": -1},
+                    JsonStreamError("Invalid JSON: Expecting value"),
+                    payload | {"purchase_date": "2020-01-01"},
+                    payload | {"country": "US"},
+                    payload,
+                )
+            )
+        )
+
+        assert "monthly_net_rent" in results[0].error
+        assert results[1].error == "Invalid JSON: Expecting value"
+        assert results[2].error == "CPI data not found for October 2019"
+        assert results[3].error == "CPI country US is not supported"
+        assert results[4].result is not None
+
+    @pytest.mark.asyncio
+    async def test_country_uses_its_own_base(self, service, payload):
+        (item,) = await _collect(service.calculate(_items(payload | {"country": "FR"})))
+
+        assert item.result.cpi_used.index_value == Decimal("117.1")
+        assert item.result.cpi_base_2001 == Decimal("76.1")
@@ -1,48 +1,82 @@
-import pytest
-from unittest.mock import Mock, AsyncMock, patch
-import httpx
-
-from back.app.services.cpi_parser_service import GermanyHistoricalCpiParser
-from back.app.schemas.cpi import CpiPeriod
+import asyncio
+import hashlib
+import json
 
-
-class TestGermanyHistoricalCpiParser:
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from back.app.services.cpi_parser_service import (
+    HistoricalCpiParser,
+    SNAPSHOT_FORMAT_VERSION,
+)
+from back.app.services.cpi_providers import (
+    CpiProvider,
+    RateInflationHtmlProvider,
+    StaticFileProvider,
+    _Page,
+)
+from back.app.services.cpi_series import CpiSeries
+from back.app.services.cpi_table_parser import MONTHS
+from back.app.tests.conftest import FIXTURES_DIR
+
+
+def _page(content: bytes) -> _Page:
+    return _Page(
+        content=content,
+        etag=None,
+        last_modified=None,
+        content_hash=hashlib.sha256(content).hexdigest(),
+    )
+
+
+def _parser(snapshot_path) -> HistoricalCpiParser:
+    return HistoricalCpiParser(
+        snapshot_path=snapshot_path,
+        providers=[RateInflationHtmlProvider(url="https://cpi.example/germany")],
+    )
+
+
+class TestHistoricalCpiParser:
     @pytest.fixture
-    def parser(self):
-        return GermanyHistoricalCpiParser()
+    def parser(self, tmp_path):
+        return _parser(tmp_path / "cpi.json")
 
     @pytest.mark.asyncio
     async def test_parse_into_mapper_success(self, parser, mock_httpx_response):
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = mock_httpx_response.content
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(mock_httpx_response.content)
 
             await parser.parse_into_mapper()
 
-            assert len(parser._cpi_data) > 0
+            assert len(parser.snapshot.series) > 0
+            assert parser.snapshot.version == 1
 
-            jan_2023 = CpiPeriod(year=2023, month="01")
-            assert jan_2023 in parser._cpi_data
-            assert parser._cpi_data[jan_2023] == 115.0
-
-            oct_2023 = CpiPeriod(year=2023, month="10")
-            assert oct_2023 in parser._cpi_data
-            assert parser._cpi_data[oct_2023] == 118.5
+            assert parser.get_cpi_value(2023, 1) == 115.0
+            assert parser.get_cpi_value(2023, 10) == 118.5
 
     @pytest.mark.asyncio
     async def test_parse_into_mapper_no_table(self, parser):
         html_without_table = b"<html><body><p>No table here</p></body></html>"
 
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = html_without_table
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(html_without_table)
 
             await parser.parse_into_mapper()
 
-            assert len(parser._cpi_data) == 0
+            assert len(parser.snapshot.series) == 0
+            assert parser.snapshot.version == 0
 
     @pytest.mark.asyncio
     async def test_parse_handles_empty_cells(self, parser):
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = b"""
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(
+                b"""
             <html>
                 <table>
                     <thead>
@@ -60,14 +94,12 @@ class TestGermanyHistoricalCpiParser:
                 </table>
             </html>
             """
+            )
 
             await parser.parse_into_mapper()
 
-            jan_2024 = CpiPeriod(year=2024, month="01")
-            feb_2024 = CpiPeriod(year=2024, month="02")
-
-            assert jan_2024 in parser._cpi_data
-            assert feb_2024 not in parser._cpi_data
+            assert parser.get_cpi_value(2024, 1) == 120.5
+            assert parser.get_cpi_value(2024, 2) is None
 
     @pytest.mark.asyncio
     async def test_parse_handles_invalid_rows(self, parser):
@@ -85,88 +117,24 @@ class TestGermanyHistoricalCpiParser:
         </html>
         """
 
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = html_with_invalid
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(html_with_invalid)
 
             await parser.parse_into_mapper()
 
-            jan_2024 = CpiPeriod(year=2024, month="01")
-            assert jan_2024 in parser._cpi_data
-            assert parser._cpi_data[jan_2024] == 121.0
-
-    @pytest.mark.asyncio
-    async def test_fetch_page_success(self, parser):
-        mock_response = Mock()
-        mock_response.content = b"<html>test</html>"
-        mock_response.raise_for_status = Mock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
-
-            result = await parser._fetch_page()
-
-            assert result == b"<html>test</html>"
-            mock_response.raise_for_status.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_fetch_page_retry_on_request_error(self, parser):
-        mock_response = Mock()
-        mock_response.content = b"<html>test</html>"
-        mock_response.raise_for_status = Mock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                side_effect=[
-                    httpx.RequestError("Connection failed"),
-                    httpx.RequestError("Connection failed"),
-                    mock_response,
-                ]
-            )
-
-            result = await parser._fetch_page()
-
-            assert result == b"<html>test</html>"
-
-    @pytest.mark.asyncio
-    async def test_fetch_page_retry_exhausted(self, parser):
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                side_effect=httpx.RequestError("Connection failed")
-            )
-
-            with pytest.raises(httpx.RequestError):
-                await parser._fetch_page()
-
-    @pytest.mark.asyncio
-    async def test_fetch_page_http_status_error(self, parser):
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_response = Mock()
-            mock_response.raise_for_status = Mock(
-                side_effect=httpx.HTTPStatusError(
-                    "404 Not Found", request=Mock(), response=Mock()
-                )
-            )
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
-
-            with pytest.raises(httpx.HTTPStatusError):
-                await parser._fetch_page()
+            assert parser.get_cpi_value(2024, 1) == 121.0
 
-    def test_get_cpi_period_data_exists(self, parser):
-        period = CpiPeriod(year=2023, month=10)
-        parser._cpi_data[period] = 118.5
+    def test_get_cpi_value_exists(self, parser):
+        parser._publish(CpiSeries.from_items([(2023, 10, 118.5)]))
 
-        result = parser.get_cpi_period_data(period)
+        result = parser.get_cpi_value(2023, 10)
 
         assert result == 118.5
 
-    def test_get_cpi_period_data_not_exists(self, parser):
-        period = CpiPeriod(year=2099, month=12)
-
-        result = parser.get_cpi_period_data(period)
+    def test_get_cpi_value_not_exists(self, parser):
+        result = parser.get_cpi_value(2099, 12)
 
         assert result is None
 
@@ -185,45 +153,48 @@ class TestGermanyHistoricalCpiParser:
         </html>
         """
 
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = html_with_comma
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(html_with_comma)
 
             await parser.parse_into_mapper()
 
-            jan_2024 = CpiPeriod(year=2024, month="01")
-            assert parser._cpi_data[jan_2024] == 120.5
-
-    def test_month_mapping(self, parser):
-        assert parser.months["jan"] == "01"
-        assert parser.months["feb"] == "02"
-        assert parser.months["mar"] == "03"
-        assert parser.months["apr"] == "04"
-        assert parser.months["may"] == "05"
-        assert parser.months["jun"] == "06"
-        assert parser.months["jul"] == "07"
-        assert parser.months["aug"] == "08"
-        assert parser.months["sep"] == "09"
-        assert parser.months["oct"] == "10"
-        assert parser.months["nov"] == "11"
-        assert parser.months["dec"] == "12"
+            assert parser.get_cpi_value(2024, 1) == 120.5
+
+    def test_month_mapping(self):
+        assert MONTHS["jan"] == "01"
+        assert MONTHS["feb"] == "02"
+        assert MONTHS["mar"] == "03"
+        assert MONTHS["apr"] == "04"
+        assert MONTHS["may"] == "05"
+        assert MONTHS["jun"] == "06"
+        assert MONTHS["jul"] == "07"
+        assert MONTHS["aug"] == "08"
+        assert MONTHS["sep"] == "09"
+        assert MONTHS["oct"] == "10"
+        assert MONTHS["nov"] == "11"
+        assert MONTHS["dec"] == "12"
 
     @pytest.mark.asyncio
     async def test_parse_multiple_years(self, parser, mock_httpx_response):
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = mock_httpx_response.content
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(mock_httpx_response.content)
 
             await parser.parse_into_mapper()
 
-            has_2023_data = any(p.year == 2023 for p in parser._cpi_data.keys())
-            has_2024_data = any(p.year == 2024 for p in parser._cpi_data.keys())
+            years = {year for year, _, _ in parser.snapshot.series.items()}
+            has_2023_data = 2023 in years
+            has_2024_data = 2024 in years
 
             assert has_2023_data
             assert has_2024_data
 
     @pytest.mark.asyncio
     async def test_parse_updates_existing_data(self, parser):
-        old_period = CpiPeriod(year=2023, month="01")
-        parser._cpi_data[old_period] = 100.0
+        parser._publish(CpiSeries.from_items([(2023, 1, 100.0)]))
 
         html = b"""
         <html>
@@ -238,9 +209,253 @@ class TestGermanyHistoricalCpiParser:
         </html>
         """
 
-        with patch.object(parser, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-            mock_fetch.return_value = html
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(html)
+
+            await parser.parse_into_mapper()
+
+            assert parser.get_cpi_value(2023, 1) == 115.0
+            assert parser.snapshot.version == 2
+
+    @pytest.mark.asyncio
+    async def test_parse_replaces_snapshot_atomically(self, parser):
+        parser._publish(
+            CpiSeries.from_items([(2023, 1, 100.0), (2023, 2, 101.0)]),
+            source="rateinflation_html",
+        )
+        published = parser.snapshot
+        html = b"""
+        <html>
+            <table>
+                <thead><tr><th>Year</th><th>Jan</th></tr></thead>
+                <tbody><tr><td>2023</td><td>115.0</td></tr></tbody>
+            </table>
+        </html>
+        """
+
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(html)
+
+            await parser.parse_into_mapper()
+
+        assert parser.snapshot is not published
+        assert parser.snapshot.version == published.version + 1
+        assert parser.snapshot.built_at >= published.built_at
+        assert parser.get_cpi_value(2023, 2) is None
+        assert published.series.get(2023, 1) == 100.0
+
+    @pytest.mark.asyncio
+    async def test_parse_unchanged_data_keeps_version(
+        self, parser, mock_httpx_response
+    ):
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(mock_httpx_response.content)
+
+            await parser.parse_into_mapper()
+            published = parser.snapshot
+            await parser.parse_into_mapper()
+
+        assert parser.snapshot is published
+
+
+class TestCpiSnapshot:
+    @pytest.fixture
+    def snapshot_path(self, tmp_path):
+        return tmp_path / "cpi.json"
+
+    @pytest.fixture
+    def parser(self, snapshot_path):
+        return _parser(snapshot_path)
+
+    @pytest.mark.asyncio
+    async def test_parse_writes_snapshot(
+        self, parser, snapshot_path, mock_httpx_response
+    ):
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(mock_httpx_response.content)
+
+            await parser.parse_into_mapper()
+
+        snapshot = json.loads(snapshot_path.read_text())
+        assert snapshot["format_version"] == SNAPSHOT_FORMAT_VERSION
+        assert snapshot["data"]["2023-10"] == 118.5
+        assert len(snapshot["data"]) == len(parser.snapshot.series)
+        assert snapshot["version"] == parser.snapshot.version
+
+    @pytest.mark.asyncio
+    async def test_snapshot_not_written_without_table(self, parser, snapshot_path):
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = _page(b"<html><body></body></html>")
+
+            await parser.parse_into_mapper()
+
+        assert not snapshot_path.exists()
 
+    @pytest.mark.asyncio
+    async def test_load_snapshot_restores_data(
+        self, parser, snapshot_path, mock_httpx_response
+    ):
+        page = _page(mock_httpx_response.content)._replace(etag='"abc"')
+        with patch.object(
+            parser.providers[0], "_fetch_page", new_callable=AsyncMock
+        ) as mock_fetch:
+            mock_fetch.return_value = page
             await parser.parse_into_mapper()
 
-            assert parser._cpi_data[old_period] == 115.0
+        restarted = _parser(snapshot_path)
+
+        assert restarted.load_snapshot() is True
+        assert restarted.snapshot == parser.snapshot
+        assert restarted.snapshot.source == "rateinflation_html"
+        assert restarted.providers[0]._etag == '"abc"'
+        assert restarted.get_cpi_value(2023, 10) == 118.5
+
+    def test_load_snapshot_missing_file(self, parser):
+        assert parser.load_snapshot() is False
+        assert len(parser.snapshot.series) == 0
+
+    def test_load_snapshot_corrupt_file(self, parser, snapshot_path):
+        snapshot_path.write_text("{not json")
+
+        assert parser.load_snapshot() is False
+        assert len(parser.snapshot.series) == 0
+
+    def test_load_snapshot_unsupported_format(self, parser, snapshot_path):
+        snapshot_path.write_text(
+            json.dumps(
+                {
+                    "format_version": SNAPSHOT_FORMAT_VERSION + 1,
+                    "saved_at": "2026-01-01T00:00:00+00:00",
+                    "data": {"2023-10": 118.5},
+                }
+            )
+        )
+
+        assert parser.load_snapshot() is False
+        assert len(parser.snapshot.series) == 0
+
+
+class FakeProvider(CpiProvider):
+    def __init__(self, name, rows=None, delay=0.0, error=None, timeout=1.0):
+        self.name = name
+        self.rows = rows
+        self.delay = delay
+        self.error = error
+        self.timeout = timeout
+
+    async def fetch(self):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.rows
+
+
+def _months(last_year, last_month, value=100.0):
+    return [
+        (year, month, value)
+        for year in range(2022, last_year + 1)
+        for month in range(1, 13)
+        if (year, month) <= (last_year, last_month)
+    ]
+
+
+class TestCpiProviderSelection:
+    @pytest.fixture
+    def make_parser(self, tmp_path):
+        def _make(*providers):
+            return HistoricalCpiParser(
+                snapshot_path=tmp_path / "cpi.json", providers=list(providers)
+            )
+
+        return _make
+
+    @pytest.mark.asyncio
+    async def test_freshest_result_wins(self, make_parser):
+        parser = make_parser(
+            FakeProvider("html", _months(2024, 6)),
+            FakeProvider("genesis", _months(2024, 8)),
+        )
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.source == "genesis"
+        assert parser.snapshot.series.last_period == (2024, 8)
+
+    @pytest.mark.asyncio
+    async def test_tie_goes_to_first_provider(self, make_parser):
+        parser = make_parser(
+            FakeProvider("html", _months(2024, 6, 101.0)),
+            FakeProvider("genesis", _months(2024, 6, 102.0)),
+        )
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.source == "html"
+        assert parser.get_cpi_value(2024, 6) == 101.0
+
+    @pytest.mark.asyncio
+    async def test_slow_and_broken_providers_are_skipped(self, make_parser):
+        parser = make_parser(
+            FakeProvider("slow", _months(2025, 1), delay=5, timeout=0.05),
+            FakeProvider("broken", error=RuntimeError("boom")),
+            FakeProvider("static", _months(2024, 6)),
+        )
+
+        started = asyncio.get_running_loop().time()
+        await parser.parse_into_mapper()
+
+        assert asyncio.get_running_loop().time() - started < 1
+        assert parser.snapshot.source == "static"
+
+    @pytest.mark.asyncio
+    async def test_incomplete_result_is_ignored(self, make_parser):
+        gappy = [row for row in _months(2024, 8) if row[:2] != (2023, 5)]
+        parser = make_parser(
+            FakeProvider("gappy", gappy),
+            FakeProvider("static", _months(2024, 6)),
+        )
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.source == "static"
+
+    @pytest.mark.asyncio
+    async def test_staler_source_does_not_replace_snapshot(self, make_parser):
+        parser = make_parser(
+            FakeProvider("html", None),
+            FakeProvider("static", _months(2024, 6)),
+        )
+        parser._publish(CpiSeries.from_items(_months(2024, 8)), source="html")
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.version == 1
+        assert parser.snapshot.source == "html"
+
+    @pytest.mark.asyncio
+    async def test_no_new_data(self, make_parser):
+        parser = make_parser(FakeProvider("html", None))
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.version == 0
+        assert not parser.snapshot_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_static_file_fixture(self, make_parser):
+        parser = make_parser(StaticFileProvider(FIXTURES_DIR / "cpi_static.json"))
+
+        await parser.parse_into_mapper()
+
+        assert parser.snapshot.source == "static_file"
+        assert parser.get_cpi_value(2024, 6) == 119.4
@@ -0,0 +1,50 @@
+import pytest
+
+from back.app.services.cpi_table_parser import parse_cpi_table
+
+BACKENDS = ["bs4", "lxml", "stream"]
+
+
+class TestParseCpiTable:
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_parse_success(self, backend, mock_httpx_response):
+        rows = parse_cpi_table(mock_httpx_response.content, backend)
+
+        assert (2023, 1, 115.0) in rows
+        assert (2023, 10, 118.5) in rows
+        assert (2024, 6, 122.0) in rows
+        assert not any(year == 2024 and month > 6 for year, month, _ in rows)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_parse_no_table(self, backend):
+        html = b"<html><body><p>No table here</p></body></html>"
+
+        assert parse_cpi_table(html, backend) is None
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_parse_cell_markup_and_separator(self, backend):
+        html = b"""
+        <html>
+            <table>
+                <thead><tr><th>Year</th><th>Jan</th><th>Feb</th><th>Annual</th></tr></thead>
+                <tbody>
+                    <tr><td><a href="/2024">2024</a></td><td>120,5</td><td></td><td>1</td></tr>
+                    <tr><td>invalid</td><td>99.0</td></tr>
+                </tbody>
+            </table>
+        </html>
+        """
+
+        assert parse_cpi_table(html, backend) == [(2024, 1, 120.5)]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_parse_recorded_page(self, backend, recorded_cpi_page):
+        rows = parse_cpi_table(recorded_cpi_page, backend)
+
+        assert rows == parse_cpi_table(recorded_cpi_page, "bs4")
+        assert len(rows) == len({(year, month) for year, month, _ in rows})
+        assert min(year for year, _, _ in rows) == 2002
+
+    def test_unknown_backend(self, mock_httpx_response):
+        with pytest.raises(ValueError):
+            parse_cpi_table(mock_httpx_response.content, "regex")
@@ -0,0 +1,202 @@
+import json
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+import httpx
+
+from back.app.services.cpi_providers import (
+    GenesisExportProvider,
+    RateInflationHtmlProvider,
+    StaticFileProvider,
+    parse_genesis_export,
+)
+from back.app.tests.conftest import FIXTURES_DIR
+
+
+class TestRateInflationHtmlProvider:
+    @pytest.fixture
+    def provider(self):
+        return RateInflationHtmlProvider(url="https://cpi.example/germany")
+
+    @pytest.fixture
+    def cpi_page(self, mock_httpx_response):
+        return mock_httpx_response.content
+
+    @pytest.fixture
+    def mock_client(self, provider):
+        client = Mock()
+        client.get = AsyncMock()
+        with patch.object(provider, "_get_client", return_value=client):
+            yield client
+
+    @staticmethod
+    def _response(content=b"<html>test</html>", status_code=200, headers=None):
+        response = Mock()
+        response.status_code = status_code
+        response.content = content
+        response.headers = headers or {}
+        response.raise_for_status = Mock()
+        return response
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_success(self, provider, mock_client):
+        mock_response = self._response()
+        mock_client.get.return_value = mock_response
+
+        result = await provider._fetch_page()
+
+        assert result.content == b"<html>test</html>"
+        mock_response.raise_for_status.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_retry_on_request_error(self, provider, mock_client):
+        mock_client.get.side_effect = [
+            httpx.RequestError("Connection failed"),
+            httpx.RequestError("Connection failed"),
+            self._response(),
+        ]
+
+        result = await provider._fetch_page()
+
+        assert result.content == b"<html>test</html>"
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_retry_exhausted(self, provider, mock_client):
+        mock_client.get.side_effect = httpx.RequestError("Connection failed")
+
+        with pytest.raises(httpx.RequestError):
+            await provider._fetch_page()
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_http_status_error(self, provider, mock_client):
+        mock_response = self._response()
+        mock_response.raise_for_status = Mock(
+            side_effect=httpx.HTTPStatusError(
+                "404 Not Found", request=Mock(), response=Mock()
+            )
+        )
+        mock_client.get.return_value = mock_response
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider._fetch_page()
+
+    @pytest.mark.asyncio
+    async def test_fetch_sends_validators(self, provider, mock_client, cpi_page):
+        mock_client.get.return_value = self._response(
+            content=cpi_page,
+            headers={"ETag": '"abc"', "Last-Modified": "Mon, 02 Feb 2026 10:00:00 GMT"},
+        )
+        await provider.fetch()
+
+        mock_client.get.return_value = self._response(status_code=304)
+        result = await provider.fetch()
+
+        assert result is None
+        _, kwargs = mock_client.get.call_args
+        assert kwargs["headers"] == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 02 Feb 2026 10:00:00 GMT",
+        }
+
+    @pytest.mark.asyncio
+    async def test_fetch_unchanged_content(self, provider, mock_client, cpi_page):
+        mock_client.get.return_value = self._response(content=cpi_page)
+
+        assert (2023, 10, 118.5) in await provider.fetch()
+        assert await provider.fetch() is None
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_without_table(self, provider, mock_client):
+        mock_client.get.return_value = self._response()
+
+        with pytest.raises(ValueError):
+            await provider.fetch()
+
+        assert provider.state()["content_hash"] is None
+
+    @pytest.mark.asyncio
+    async def test_state_round_trip(self, provider, mock_client, cpi_page):
+        mock_client.get.return_value = self._response(
+            content=cpi_page, headers={"ETag": '"abc"'}
+        )
+        await provider.fetch()
+
+        restored = RateInflationHtmlProvider(url=provider.url)
+        restored.restore(provider.state())
+
+        assert restored.state() == provider.state()
+        assert restored.state()["etag"] == '"abc"'
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self, provider):
+        client = provider._get_client()
+
+        assert provider._get_client() is client
+
+        await provider.aclose()
+        assert client.is_closed
+
+
+class TestGenesisExportProvider:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "file_name", ["genesis_61111-0004.csv", "genesis_61111-0004.json"]
+    )
+    async def test_fetch_export(self, file_name):
+        provider = GenesisExportProvider(FIXTURES_DIR / file_name)
+
+        rows = await provider.fetch()
+
+        assert len(rows) == 24
+        assert (2023, 3, 116.1) in rows
+        assert (2024, 12, 120.5) in rows
+        assert not any(year == 2025 for year, _, _ in rows)
+
+    @pytest.mark.asyncio
+    async def test_fetch_unchanged_file(self, tmp_path):
+        path = tmp_path / "export.csv"
+        path.write_bytes((FIXTURES_DIR / "genesis_61111-0004.csv").read_bytes())
+        provider = GenesisExportProvider(path)
+
+        assert await provider.fetch()
+        assert await provider.fetch() is None
+
+        path.write_text("2025;Januar;121,0;2,4\n", encoding="utf-8")
+        assert await provider.fetch() == [(2025, 1, 121.0)]
+
+    @pytest.mark.asyncio
+    async def test_fetch_latin1_export(self, tmp_path):
+        path = tmp_path / "export.csv"
+        path.write_bytes("2024;März;118,6;2,2\n".encode("latin-1"))
+
+        assert await GenesisExportProvider(path).fetch() == [(2024, 3, 118.6)]
+
+    @pytest.mark.asyncio
+    async def test_fetch_missing_file(self, tmp_path):
+        provider = GenesisExportProvider(tmp_path / "missing.csv")
+
+        with pytest.raises(FileNotFoundError):
+            await provider.fetch()
+
+    def test_parse_skips_missing_values_and_metadata(self):
+        text = "Verbraucherpreisindex;;;\n2024;Januar;117,6;2,9\n2024;Februar;-;-\n"
+
+        assert parse_genesis_export(text) == [(2024, 1, 117.6)]
+
+
+class TestStaticFileProvider:
+    @pytest.mark.asyncio
+    async def test_fetch_mapping(self):
+        provider = StaticFileProvider(FIXTURES_DIR / "cpi_static.json")
+
+        rows = await provider.fetch()
+
+        assert len(rows) == 18
+        assert (2024, 6, 119.4) in rows
+
+    @pytest.mark.asyncio
+    async def test_fetch_snapshot_file(self, tmp_path):
+        path = tmp_path / "cpi_snapshot.json"
+        path.write_text(json.dumps({"format_version": 2, "data": {"2024-01": 117.6}}))
+
+        assert await StaticFileProvider(path).fetch() == [(2024, 1, 117.6)]
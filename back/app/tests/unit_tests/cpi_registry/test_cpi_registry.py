@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from back.app.core.leader import LeaderLease
+from back.app.services.cpi_parser_service import HistoricalCpiParser
+from back.app.services.cpi_providers import CpiProvider
+from back.app.services.cpi_registry import CpiRegistry, UnknownCpiCountryError
+from back.app.services.cpi_series import CpiSeries
+
+
+class CountingProvider(CpiProvider):
+    name = "counting"
+    timeout = 1.0
+
+    def __init__(self, value: float, delay: float = 0.0, error: Exception = None):
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [(2023, month, self.value) for month in range(1, 13)]
+
+
+class TestCpiRegistry:
+    @pytest.fixture
+    def providers(self):
+        return {
+            "DE": CountingProvider(117.8),
+            "FR": CountingProvider(117.1, delay=0.05),
+            "IT": CountingProvider(118.9),
+        }
+
+    @pytest.fixture
+    def registry(self, tmp_path, providers):
+        def _factory(country):
+            return HistoricalCpiParser(
+                country=country,
+                snapshot_path=tmp_path / f"cpi_{country}.json",
+                providers=[providers[country]],
+            )
+
+        return CpiRegistry(countries=providers, parser_factory=_factory)
+
+    def test_countries_are_loaded_lazily(self, registry):
+        assert registry.loaded == []
+
+        parser = registry.get("fr")
+
+        assert parser.country == "FR"
+        assert registry.loaded == ["FR"]
+        assert registry.get("FR") is parser
+
+    def test_unknown_country(self, registry):
+        assert "US" not in registry
+        with pytest.raises(UnknownCpiCountryError):
+            registry.get("US")
+
+    def test_get_loads_snapshot(self, registry, tmp_path):
+        seed = HistoricalCpiParser(
+            country="IT", snapshot_path=tmp_path / "cpi_IT.json", providers=[]
+        )
+        seed._publish(CpiSeries.from_items([(2023, 10, 118.9)]), source="counting")
+        seed._save_snapshot()
+
+        assert registry.get("IT").get_cpi_value(2023, 10) == 118.9
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_a_single_first_refresh(self, registry, providers):
+        parsers = await asyncio.gather(*(registry.acquire("FR") for _ in range(5)))
+
+        assert all(parser is parsers[0] for parser in parsers)
+        assert parsers[0].get_cpi_value(2023, 10) == 117.1
+        assert providers["FR"].calls == 1
+
+        await registry.acquire("FR")
+        assert providers["FR"].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_only_refreshes_loaded_countries(
+        self, registry, providers
+    ):
+        registry.get("DE")
+        registry.get("IT")
+
+        await registry.refresh_all()
+
+        assert providers["DE"].calls == 1
+        assert providers["IT"].calls == 1
+        assert providers["FR"].calls == 0
+        assert registry.get("IT").get_cpi_value(2023, 1) == 118.9
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_picks_up_countries_loaded_elsewhere(
+        self, registry, providers, tmp_path
+    ):
+        seed = HistoricalCpiParser(
+            country="FR", snapshot_path=tmp_path / "cpi_FR.json", providers=[]
+        )
+        seed._publish(CpiSeries.from_items([(2023, 10, 117.1)]), source="counting")
+        seed._save_snapshot()
+
+        await registry.refresh_all()
+
+        assert "FR" in registry.loaded
+        assert providers["FR"].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_reload_snapshots_picks_up_newer_files(self, registry, tmp_path):
+        registry.get("DE")
+        assert registry.get("DE").snapshot.version == 0
+
+        leader = HistoricalCpiParser(
+            country="DE", snapshot_path=tmp_path / "cpi_DE.json", providers=[]
+        )
+        leader._publish(CpiSeries.from_items([(2023, 10, 117.8)]), source="counting")
+        leader._save_snapshot()
+        await registry.reload_snapshots()
+
+        assert registry.get("DE").get_cpi_value(2023, 10) == 117.8
+        assert "FR" not in registry.loaded
+
+        leader._publish(CpiSeries.from_items([(2023, 10, 117.9)]), source="counting")
+        leader._save_snapshot()
+        await registry.reload_snapshots()
+
+        assert registry.get("DE").get_cpi_value(2023, 10) == 117.9
+
+    @pytest.mark.asyncio
+    async def test_follower_picks_up_the_leaders_first_publish(
+        self, registry, tmp_path
+    ):
+        path = tmp_path / "leader.sqlite3"
+        assert LeaderLease(path, ttl=30).try_acquire()
+        follower = LeaderLease(path, ttl=0.2)
+        registry.get("DE")
+        task = asyncio.create_task(follower.run(on_follow=registry.reload_snapshots))
+
+        try:
+            await asyncio.sleep(0.05)
+            assert registry.get("DE").get_cpi_value(2023, 10) is None
+
+            leader = HistoricalCpiParser(
+                country="DE", snapshot_path=tmp_path / "cpi_DE.json", providers=[]
+            )
+            leader._publish(
+                CpiSeries.from_items([(2023, 10, 117.8)]), source="counting"
+            )
+            leader._save_snapshot()
+            await asyncio.sleep(0.5)
+
+            assert not follower.is_leader
+            assert registry.get("DE").get_cpi_value(2023, 10) == 117.8
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_isolates_failures(self, registry, providers):
+        providers["DE"].error = RuntimeError("boom")
+        registry.get("DE")
+        registry.get("IT")
+
+        await registry.refresh_all()
+
+        assert registry.get("DE").snapshot.version == 0
+        assert registry.get("IT").snapshot.version == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_runs_countries_concurrently(self, registry, providers):
+        for country, provider in providers.items():
+            provider.delay = 0.2
+            registry.get(country)
+
+        started = asyncio.get_running_loop().time()
+        await registry.refresh_all()
+
+        assert asyncio.get_running_loop().time() - started < 0.5
@@ -0,0 +1,143 @@
+import mmap
+import multiprocessing
+from datetime import datetime, timezone
+
+import pytest
+
+from back.app.services.cpi_parser_service import HistoricalCpiParser
+from back.app.services.cpi_providers import CpiProvider
+from back.app.services.cpi_segment import CpiSegment
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
+
+
+def _snapshot(version: int, value: float = 117.8) -> CpiSnapshot:
+    return CpiSnapshot(
+        version=version,
+        built_at=datetime(2024, 11, 1, tzinfo=timezone.utc),
+        series=CpiSeries.from_items(
+            [(2023, month, value) for month in range(1, 13)] + [(2024, 1, value + 1)]
+        ),
+        source="rateinflation_html",
+    )
+
+
+def _read_in_child(path, year, month):
+    snapshot = CpiSegment(path).latest()
+    return snapshot.version, snapshot.series.get(year, month)
+
+
+def _lock_in_child(path):
+    return CpiSegment(path).try_lock()
+
+
+class StaticProvider(CpiProvider):
+    name = "static"
+    timeout = 1.0
+
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        return [(2023, month, 117.8) for month in range(1, 13)]
+
+
+class TestCpiSegment:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return tmp_path / "cpi.seg"
+
+    def test_nothing_published(self, path):
+        assert CpiSegment(path).latest() is None
+
+    def test_round_trip_is_zero_copy(self, path):
+        CpiSegment(path).publish(_snapshot(4))
+
+        snapshot = CpiSegment(path).latest()
+
+        assert snapshot.version == 4
+        assert snapshot.source == "rateinflation_html"
+        assert snapshot.built_at == datetime(2024, 11, 1, tzinfo=timezone.utc)
+        assert snapshot.series == _snapshot(4).series
+        assert snapshot.series.last_period == (2024, 1)
+        assert snapshot.series.get(2024, 2) is None
+        assert isinstance(snapshot.series.buffers()[0].obj, mmap.mmap)
+
+    def test_reader_sees_new_version_without_waiting(self, path):
+        writer = CpiSegment(path)
+        reader = CpiSegment(path, check_interval=3600)
+        writer.publish(_snapshot(1))
+        old = reader.latest()
+
+        writer.publish(_snapshot(2, value=118.0))
+
+        assert reader.latest().version == 2
+        assert reader.latest().series.get(2023, 5) == 118.0
+        # Views of the superseded segment stay valid.
+        assert old.series.get(2023, 5) == 117.8
+
+    def test_readers_in_other_processes(self, path):
+        CpiSegment(path).publish(_snapshot(7))
+
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            assert pool.apply(_read_in_child, (path, 2024, 1)) == (7, 118.8)
+
+    def test_publish_lock_is_exclusive_per_host(self, path):
+        owner = CpiSegment(path)
+        assert owner.try_lock()
+        assert not CpiSegment(path).try_lock()
+
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            assert pool.apply(_lock_in_child, (path,)) is False
+
+        owner.unlock()
+        assert CpiSegment(path).try_lock()
+
+
+class TestSharedCpiParser:
+    @pytest.fixture
+    def providers(self):
+        return [StaticProvider(), StaticProvider()]
+
+    @pytest.fixture
+    def workers(self, tmp_path, providers):
+        return [
+            HistoricalCpiParser(
+                snapshot_path=tmp_path / "cpi.json", providers=[provider], shared=True
+            )
+            for provider in providers
+        ]
+
+    @pytest.mark.asyncio
+    async def test_other_workers_read_published_data(self, workers, providers):
+        writer, reader = workers
+
+        await writer.parse_into_mapper()
+
+        assert providers[1].calls == 0
+        assert reader.snapshot.version == 1
+        assert reader.get_cpi_value(2023, 10) == 117.8
+        assert isinstance(reader.snapshot.series.buffers()[0].obj, mmap.mmap)
+        assert not writer.segment.is_locked
+
+    @pytest.mark.asyncio
+    async def test_refresh_running_elsewhere_is_not_duplicated(
+        self, workers, providers
+    ):
+        writer, reader = workers
+        await writer.parse_into_mapper()
+
+        assert writer.segment.try_lock()
+        await reader.parse_into_mapper()
+
+        assert providers[1].calls == 0
+
+    @pytest.mark.asyncio
+    async def test_any_worker_continues_from_the_last_refresh(self, workers, providers):
+        first, second = workers
+        await first.parse_into_mapper()
+
+        await second.parse_into_mapper()
+
+        assert providers[1].calls == 1
+        assert second.snapshot.version == 1
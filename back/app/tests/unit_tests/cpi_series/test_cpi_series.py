@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from back.app.services.cpi_series import CpiSeries
+
+
+class TestCpiSeries:
+    @pytest.fixture
+    def series(self):
+        series = CpiSeries()
+        series.set(2023, 10, 118.5)
+        series.set(2023, 12, 119.0)
+        series.set(2024, 1, 120.5)
+        return series
+
+    def test_get_existing(self, series):
+        assert series.get(2023, 10) == 118.5
+        assert series.get(2024, 1) == 120.5
+
+    def test_get_missing(self, series):
+        assert series.get(2023, 11) is None
+        assert series.get(2024, 2) is None
+        assert series.get(2001, 1) is None
+        assert series.get(2099, 12) is None
+
+    def test_len_counts_present_months(self, series):
+        assert len(series) == 3
+
+        series.set(2023, 10, 118.7)
+
+        assert len(series) == 3
+        assert series.get(2023, 10) == 118.7
+
+    def test_grows_backwards(self, series):
+        series.set(2002, 1, 78.4)
+
+        assert series.first_year == 2002
+        assert series.get(2002, 1) == 78.4
+        assert series.get(2023, 10) == 118.5
+        assert len(series) == 4
+
+    def test_items_in_period_order(self, series):
+        series.set(2002, 1, 78.4)
+
+        assert list(series.items()) == [
+            (2002, 1, 78.4),
+            (2023, 10, 118.5),
+            (2023, 12, 119.0),
+            (2024, 1, 120.5),
+        ]
+
+    def test_view_is_zero_copy_slice(self, series):
+        view = series.view(series.index(2023, 10), series.index(2024, 2))
+
+        assert len(view) == 4
+        assert view[0] == 118.5
+        assert math.isnan(view[1])
+        assert view[3] == 120.5
+
+        series.set(2023, 11, 118.9)
+        assert view[1] == 118.9
+
+    def test_view_clamped_to_bounds(self, series):
+        assert len(series.view(-5, 1000)) == 24
+        assert len(series.view(30, 10)) == 0
+
+    def test_grow_with_live_view(self, series):
+        view = series.view(0, 12)
+
+        series.set(2030, 1, 140.0)
+
+        assert series.get(2030, 1) == 140.0
+        assert len(view) == 12
+
+    def test_invalid_month(self, series):
+        with pytest.raises(ValueError):
+            series.set(2024, 13, 1.0)
@@ -13,5 +13,5 @@ def cpi_service(mock_cpi_parser):
 def cpi_service_empty():
     empty_parser = Mock()
     empty_parser._cpi_data = {}
-    empty_parser.get_cpi_period_data = Mock(return_value=None)
+    empty_parser.get_cpi_value = Mock(return_value=None)
     return CpiService(cpi_parser_service=empty_parser)
@@ -1,4 +1,7 @@
-from back.app.schemas.cpi import CpiPeriod
+import math
+
+from back.app.core.constants import CPI_BASE_OCT_2001
+from back.app.services.cpi_service import CpiService
 
 
 class TestCpiService:
@@ -8,9 +11,7 @@ class TestCpiService:
         result = cpi_service.get_cpi_october_previous_year(year)
 
         assert result == 118.5
-        cpi_service._cpi_parser_service.get_cpi_period_data.assert_called_once_with(
-            CpiPeriod(year=2023, month=10)
-        )
+        cpi_service._cpi_parser_service.get_cpi_value.assert_called_once_with(2023, 10)
 
     def test_get_cpi_october_previous_year_not_found(self, cpi_service_empty):
         year = 2024
@@ -26,9 +27,7 @@ class TestCpiService:
         result = cpi_service.get_cpi(year, month)
 
         assert result == 120.5
-        cpi_service._cpi_parser_service.get_cpi_period_data.assert_called_once_with(
-            CpiPeriod(year=2024, month=1)
-        )
+        cpi_service._cpi_parser_service.get_cpi_value.assert_called_once_with(2024, 1)
 
     def test_get_cpi_not_found(self, cpi_service):
         year = 2025
@@ -57,3 +56,40 @@ class TestCpiService:
         # Test October (month 10)
         result_oct = cpi_service.get_cpi(2023, 10)
         assert result_oct == 118.5
+
+    def test_snapshot_is_parser_snapshot(self, cpi_service):
+        assert cpi_service.snapshot is cpi_service._cpi_parser_service.snapshot
+
+    def test_get_cpi_range(self, cpi_service):
+        result = cpi_service.get_cpi_range(2023, 10, 2024, 1)
+
+        assert result.version == 3
+        assert (result.start_year, result.start_month) == (2023, 10)
+        assert result.periods() == ["2023-10", "2023-11", "2023-12", "2024-01"]
+        assert result.values[0] == 118.5
+        assert math.isnan(result.values[1])
+        assert result.values[3] == 120.5
+
+    def test_get_cpi_range_clamped_to_stored_months(self, cpi_service):
+        result = cpi_service.get_cpi_range(2002, 1, 2030, 12)
+
+        assert (result.start_year, result.start_month) == (2022, 1)
+        assert len(result.values) == 36
+
+    def test_get_cpi_range_outside_stored_months(self, cpi_service):
+        result = cpi_service.get_cpi_range(2030, 1, 2030, 12)
+
+        assert (result.start_year, result.start_month) == (2030, 1)
+        assert len(result.values) == 0
+
+    def test_get_cpi_base_oct_2001_germany_is_fixed(self, cpi_service):
+        assert cpi_service.country == "DE"
+        assert cpi_service.get_cpi_base_oct_2001() == CPI_BASE_OCT_2001
+
+    def test_get_cpi_base_oct_2001_other_country(self, mock_cpi_parser):
+        mock_cpi_parser.country = "FR"
+        mock_cpi_parser._cpi_data[(2001, 10)] = 76.1
+
+        service = CpiService(cpi_parser_service=mock_cpi_parser)
+
+        assert service.get_cpi_base_oct_2001() == 76.1
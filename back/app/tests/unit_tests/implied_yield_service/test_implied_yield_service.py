@@ -0,0 +1,102 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from back.app.schemas.valuation import CpiData, ImpliedYieldStatus
+from back.app.services.implied_yield_service import ImpliedYieldService
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+from back.app.services.valuation_service import ValuationService
+from back.app.tests.unit_tests.valuation_engine.test_valuation_engine import (
+    _random_input,
+)
+
+CPI = CpiData(year=2024, month=1, index_value=Decimal("118.5"))
+
+
+def _priced_at(input_data, property_yield: Decimal):
+    """The input, priced at its theoretical total value at `property_yield`."""
+
+    result = ValuationService().calculate_valuation(
+        input_data.model_copy(update={"property_yield": property_yield}), CPI
+    )
+    return input_data.model_copy(
+        update={"actual_purchase_price": result.theoretical_total_value}
+    )
+
+
+def _solve(inputs):
+    columns = ValuationColumns.from_inputs(inputs, [118.5] * len(inputs))
+    return ImpliedYieldService(ValuationEngine()).solve(columns)
+
+
+class TestImpliedYieldService:
+    @pytest.mark.parametrize("start", ["0.5", "5.0", "40"])
+    def test_recovers_the_yield_of_a_price(self, sample_residential_input, start):
+        input_data = _priced_at(sample_residential_input, Decimal("4.25"))
+        input_data = input_data.model_copy(update={"property_yield": Decimal(start)})
+
+        arrays = _solve([input_data])
+
+        assert arrays.converged[0]
+        assert arrays.property_yield[0] == pytest.approx(4.25, abs=1e-4)
+        assert abs(arrays.residual[0]) <= ImpliedYieldService.VALUE_TOLERANCE
+
+    def test_solved_yield_reproduces_the_price(self):
+        rng = random.Random(19)
+        inputs = [
+            _priced_at(_random_input(rng), Decimal(rng.randint(50, 1_200)) / 100)
+            for _ in range(200)
+        ]
+        # Costs above the income can value a property below zero, no price.
+        inputs = [i for i in inputs if i.actual_purchase_price > 0]
+
+        arrays = _solve(inputs)
+
+        assert arrays.converged.all()
+        assert arrays.iterations.max() <= 15
+        for input_data, solved in zip(inputs, arrays.property_yield):
+            result = ValuationService().calculate_valuation(
+                input_data.model_copy(
+                    update={"property_yield": Decimal(str(float(solved)))}
+                ),
+                CPI,
+            )
+            # Only the euro rounding of the value separates them.
+            assert (
+                abs(result.theoretical_total_value - input_data.actual_purchase_price)
+                <= 1
+            )
+
+    def test_price_beyond_any_yield_has_no_solution(self, sample_residential_input):
+        input_data = sample_residential_input.model_copy(
+            update={"actual_purchase_price": Decimal("1e12")}
+        )
+
+        [result] = _solve([input_data]).to_results()
+
+        assert result.status == ImpliedYieldStatus.NO_SOLUTION
+        assert result.property_yield is None
+        assert result.residual is None
+
+    def test_results_report_diagnostics(self, sample_commercial_input):
+        input_data = _priced_at(sample_commercial_input, Decimal("7.5"))
+
+        [result] = _solve([input_data]).to_results()
+
+        assert result.status == ImpliedYieldStatus.CONVERGED
+        assert result.property_yield == pytest.approx(7.5, abs=1e-4)
+        assert 0 < result.iterations <= 10
+        assert result.bisections <= result.iterations
+
+    def test_iteration_limit(self, sample_residential_input):
+        input_data = _priced_at(sample_residential_input, Decimal("4.25"))
+        service = ImpliedYieldService(ValuationEngine())
+        service.MAX_ITERATIONS = 1
+
+        arrays = service.solve(ValuationColumns.from_inputs([input_data], [118.5]))
+
+        [result] = arrays.to_results()
+        assert result.status == ImpliedYieldStatus.MAX_ITERATIONS
+        assert np.isfinite(result.property_yield)
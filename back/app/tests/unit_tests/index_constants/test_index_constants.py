@@ -0,0 +1,122 @@
+from dataclasses import replace
+from decimal import Decimal
+
+import pytest
+
+from back.app.schemas.valuation import CpiData
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
+from back.app.services.cpi_service import CpiService
+from back.app.services.index_constants import IndexConstantsTable
+from back.app.services.valuation_service import ValuationService
+
+
+@pytest.fixture
+def valuation_service():
+    return ValuationService()
+
+
+@pytest.fixture
+def cpi_service(mock_cpi_parser):
+    return CpiService(cpi_parser_service=mock_cpi_parser)
+
+
+class TestIndexConstantsTable:
+    def test_one_entry_per_october(self, mock_cpi_parser, valuation_service):
+        table = IndexConstantsTable(
+            mock_cpi_parser.snapshot,
+            ValuationService.CPI_BASE_OCT_2001,
+            valuation_service.index_constants,
+        )
+
+        assert len(table) == 2
+        assert table.get(2024).cpi_value == Decimal("118.5")
+        assert table.get(2023).cpi_value == Decimal("115.2")
+        assert table.get(2025) is None
+
+    def test_constants_match_direct_computation(self, valuation_service):
+        constants = valuation_service.index_constants(Decimal("118.5"))
+
+        index_factor = Decimal("118.5") / Decimal("84.5")
+        assert constants.index_factor == index_factor
+        assert constants.residential_maintenance_rate == Decimal("10.5")
+        assert constants.commercial_maintenance_rate == Decimal("12.6")
+
+
+class TestGetIndexConstants:
+    def test_table_is_reused_for_the_same_snapshot(
+        self, valuation_service, cpi_service
+    ):
+        shared = ValuationService(index_tables=valuation_service.index_tables)
+
+        first = valuation_service.get_index_constants(cpi_service, 2024)
+        second = shared.get_index_constants(cpi_service, 2024)
+
+        assert first is second
+
+    def test_tables_are_per_instance_by_default(self, valuation_service, cpi_service):
+        first = valuation_service.get_index_constants(cpi_service, 2024)
+        second = ValuationService().get_index_constants(cpi_service, 2024)
+
+        assert first == second
+        assert first is not second
+
+    def test_refresh_rebuilds_the_table(
+        self, valuation_service, cpi_service, mock_cpi_parser
+    ):
+        before = valuation_service.get_index_constants(cpi_service, 2024)
+
+        mock_cpi_parser.snapshot = CpiSnapshot(
+            version=mock_cpi_parser.snapshot.version + 1,
+            series=CpiSeries.from_items([(2023, 10, 119.0)]),
+        )
+        after = valuation_service.get_index_constants(cpi_service, 2024)
+
+        assert before.cpi_value == Decimal("118.5")
+        assert after.cpi_value == Decimal("119.0")
+
+    def test_cpi_base_change_rebuilds_the_table(self, valuation_service, cpi_service):
+        german = valuation_service.get_index_constants(cpi_service, 2024)
+        other = valuation_service.get_index_constants(
+            cpi_service, 2024, cpi_base=Decimal("76.1")
+        )
+
+        assert german.cpi_base == Decimal("84.5")
+        assert other.cpi_base == Decimal("76.1")
+
+    def test_missing_october(self, valuation_service, cpi_service):
+        assert valuation_service.get_index_constants(cpi_service, 2030) is None
+
+
+class TestValuationWithIndexConstants:
+    def test_same_result_as_without(
+        self, valuation_service, cpi_service, sample_residential_input
+    ):
+        cpi_data = CpiData(year=2024, month=1, index_value=118.5)
+        constants = valuation_service.get_index_constants(cpi_service, 2024)
+
+        with_constants = valuation_service.calculate_valuation(
+            sample_residential_input, cpi_data, constants=constants
+        )
+        without = valuation_service.calculate_valuation(
+            sample_residential_input, cpi_data
+        )
+
+        assert with_constants == without
+
+    def test_mismatched_constants_are_ignored(
+        self, valuation_service, sample_commercial_input
+    ):
+        cpi_data = CpiData(year=2024, month=1, index_value=118.5)
+        stale = replace(
+            valuation_service.index_constants(Decimal("118.5")),
+            cpi_value=Decimal("100.0"),
+            commercial_maintenance_rate=Decimal("99.9"),
+        )
+
+        result = valuation_service.calculate_valuation(
+            sample_commercial_input, cpi_data, constants=stale
+        )
+
+        assert result == valuation_service.calculate_valuation(
+            sample_commercial_input, cpi_data
+        )
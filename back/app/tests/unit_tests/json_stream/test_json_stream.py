@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from back.app.services.json_stream import (
+    JsonStreamError,
+    iter_json_array,
+    iter_ndjson,
+)
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+ITEMS = [{"a": 1, "b": "ü"}, {"a": 23.5, "nested": [1, {"c": None}]}, 7, "x"]
+
+
+class TestIterJsonArray:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 3, 7, 4096])
+    async def test_any_chunking(self, size):
+        data = json.dumps(ITEMS, ensure_ascii=False, indent=2).encode()
+
+        assert await _collect(iter_json_array(_chunks(data, size))) == ITEMS
+
+    @pytest.mark.asyncio
+    async def test_empty_array(self):
+        assert await _collect(iter_json_array(_chunks(b" [ ] ", 1))) == []
+
+    @pytest.mark.asyncio
+    async def test_not_an_array(self):
+        items = await _collect(iter_json_array(_chunks(b'{"a": 1}', 4)))
+
+        assert len(items) == 1
+        assert isinstance(items[0], JsonStreamError)
+
+    @pytest.mark.asyncio
+    async def test_syntax_error_ends_stream(self):
+        data = b'[{"a": 1}, {"a": }, {"a": 3}]'
+
+        items = await _collect(iter_json_array(_chunks(data, 5)))
+
+        assert items[0] == {"a": 1}
+        assert isinstance(items[1], JsonStreamError)
+        assert len(items) == 2
+
+    @pytest.mark.asyncio
+    async def test_truncated_array(self):
+        items = await _collect(iter_json_array(_chunks(b'[{"a": 1}, {"a"', 5)))
+
+        assert items[0] == {"a": 1}
+        assert isinstance(items[-1], JsonStreamError)
+
+    @pytest.mark.asyncio
+    async def test_oversized_item(self):
+        data = b'[{"a": "' + b"x" * 100 + b'"}]'
+
+        items = await _collect(iter_json_array(_chunks(data, 16), max_item_bytes=50))
+
+        assert len(items) == 1
+        assert isinstance(items[0], JsonStreamError)
+
+
+class TestIterNdjson:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 5, 4096])
+    async def test_any_chunking(self, size):
+        data = "\n".join(json.dumps(item) for item in ITEMS).encode()
+
+        assert await _collect(iter_ndjson(_chunks(data, size))) == ITEMS
+
+    @pytest.mark.asyncio
+    async def test_bad_line_does_not_stop_stream(self):
+        data = b'{"a": 1}\n{"a": \n\n{"a": 3}\n'
+
+        items = await _collect(iter_ndjson(_chunks(data, 4)))
+
+        assert items[0] == {"a": 1}
+        assert isinstance(items[1], JsonStreamError)
+        assert items[2] == {"a": 3}
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_is_skipped(self):
+        data = b'{"a": 1}\n"' + b"x" * 100 + b'"\n{"a": 3}'
+
+        items = await _collect(iter_ndjson(_chunks(data, 16), max_item_bytes=50))
+
+        assert items[0] == {"a": 1}
+        assert isinstance(items[1], JsonStreamError)
+        assert items[2:] == [{"a": 3}]
@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+
+import pytest
+
+from back.app.core.leader import LeaderLease
+
+
+def _acquire_in_child(path):
+    return LeaderLease(path).try_acquire()
+
+
+class TestLeaderLease:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return tmp_path / "leader.sqlite3"
+
+    @pytest.fixture
+    def make_lease(self, path, clock):
+        def _make():
+            return LeaderLease(path, ttl=30, clock=clock)
+
+        return _make
+
+    def test_single_leader(self, make_lease):
+        first, second = make_lease(), make_lease()
+
+        assert first.try_acquire()
+        assert not second.try_acquire()
+        assert first.is_leader
+        assert not second.is_leader
+
+    def test_single_leader_across_processes(self, path):
+        lease = LeaderLease(path, ttl=30)
+        assert lease.try_acquire()
+
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            assert pool.apply(_acquire_in_child, (path,)) is False
+
+    def test_renewal_keeps_leadership(self, make_lease, clock):
+        leader, follower = make_lease(), make_lease()
+        leader.try_acquire()
+
+        for _ in range(5):
+            clock.now += 20
+            assert leader.try_acquire()
+            assert not follower.try_acquire()
+
+    def test_takeover_after_leader_stops_renewing(self, make_lease, clock):
+        leader, follower = make_lease(), make_lease()
+        leader.try_acquire()
+
+        clock.now += 31
+
+        assert not leader.is_leader
+        assert follower.try_acquire()
+        assert not leader.try_acquire()
+
+    def test_release_allows_immediate_takeover(self, make_lease):
+        leader, follower = make_lease(), make_lease()
+        leader.try_acquire()
+
+        leader.release()
+
+        assert not leader.is_leader
+        assert follower.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_run_calls_on_elected_once_and_releases(self, path):
+        elected = []
+
+        async def on_elected():
+            elected.append(True)
+
+        lease = LeaderLease(path, ttl=0.3)
+        task = asyncio.create_task(lease.run(on_elected=on_elected))
+        await asyncio.sleep(0.5)
+
+        assert lease.is_leader
+        assert elected == [True]
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert not lease.is_leader
+        assert LeaderLease(path, ttl=0.3).try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_run_calls_on_follow_while_following(self, path):
+        assert LeaderLease(path, ttl=30).try_acquire()
+        checks = []
+
+        async def on_follow():
+            checks.append(True)
+            if len(checks) == 1:
+                raise RuntimeError("unreadable")
+
+        follower = LeaderLease(path, ttl=0.1)
+        task = asyncio.create_task(follower.run(on_follow=on_follow))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert len(checks) >= 2
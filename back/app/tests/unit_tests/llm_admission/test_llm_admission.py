@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+from back.app.services.llm_admission import AdmissionRejected, LLMAdmission
+
+
+async def _queued(admission, count):
+    tasks = [asyncio.ensure_future(admission.acquire()) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+class TestLLMAdmission:
+    @pytest.mark.asyncio
+    async def test_admits_up_to_the_concurrency_limit(self):
+        admission = LLMAdmission(max_concurrency=2)
+
+        await admission.acquire()
+        await admission.acquire()
+        (waiting,) = await _queued(admission, 1)
+
+        assert not waiting.done()
+        assert admission.stats.in_flight == 2
+        assert admission.stats.queue_depth == 1
+
+        admission.release()
+        await waiting
+        assert admission.stats.in_flight == 2
+        assert admission.stats.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_is_first_come_first_served(self):
+        admission = LLMAdmission(max_concurrency=1)
+        await admission.acquire()
+        order = []
+
+        async def call(name):
+            async with admission.slot():
+                order.append(name)
+
+        tasks = [asyncio.ensure_future(call(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        admission.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c"]
+        assert admission.stats.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_at_once(self):
+        admission = LLMAdmission(max_concurrency=1, max_queue=1)
+        await admission.acquire()
+        await _queued(admission, 1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+
+        assert rejected.value.queue_full
+        assert rejected.value.retry_after >= 1
+        assert admission.stats.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_waiting_too_long_times_out(self):
+        admission = LLMAdmission(max_concurrency=1, queue_timeout=0.01)
+        await admission.acquire()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+
+        assert not rejected.value.queue_full
+        assert admission.stats.timed_out == 1
+        assert admission.stats.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        admission = LLMAdmission(max_concurrency=1)
+        await admission.acquire()
+        first, second = await _queued(admission, 2)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        admission.release()
+        await second
+
+        assert first.cancelled()
+        assert admission.stats.in_flight == 1
+        assert admission.stats.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_spaces_out_calls(self):
+        admission = LLMAdmission(max_concurrency=10, rate=50.0, burst=2)
+        started = time.monotonic()
+
+        for _ in range(4):
+            await admission.acquire()
+
+        # Two from the burst, then one every 20 ms.
+        assert time.monotonic() - started >= 0.035
+        assert admission.stats.admitted == 4
+        assert admission.stats.max_wait_seconds > 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_follows_the_rate(self):
+        admission = LLMAdmission(max_concurrency=1, rate=0.5, max_queue=3)
+        await admission.acquire()
+        await _queued(admission, 3)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+
+        # Four calls ahead at one every two seconds.
+        assert rejected.value.retry_after == 8
@@ -0,0 +1,322 @@
+import asyncio
+
+import openai
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from back.app.services.analysis_cache import AnalysisCache
+from back.app.services.llm_admission import AdmissionRejected, LLMAdmission
+from back.app.services.llm_service import LLMService
+
+
+class FakeStream:
+    def __init__(self, contents):
+        self._contents = contents
+        self.closed = False
+
+    async def __aiter__(self):
+        for content in self._contents:
+            if content is None:
+                yield SimpleNamespace(choices=[])
+            else:
+                yield SimpleNamespace(
+                    choices=[SimpleNamespace(delta=SimpleNamespace(content=content))]
+                )
+
+    async def close(self):
+        self.closed = True
+
+
+def _service(stream, cache=None):
+    service = LLMService(api_key="test", model="test-model", cache=cache)
+    service._client = Mock()
+    service._client.chat.completions.create = AsyncMock(return_value=stream)
+    return service
+
+
+class TestLLMServiceStream:
+    @pytest.mark.asyncio
+    async def test_yields_content_as_it_arrives(self, sample_ai_prompt):
+        stream = FakeStream(["The ", None, "", "value", " is fair."])
+        service = _service(stream)
+
+        chunks = await service.get_llm_analysis_stream(sample_ai_prompt)
+
+        assert [chunk async for chunk in chunks] == ["The ", "value", " is fair."]
+        assert stream.closed
+        kwargs = service._client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        assert kwargs["model"] == "test-model"
+        assert kwargs["messages"][1]["content"] == service.format_main_prompt(
+            sample_ai_prompt
+        )
+
+    @pytest.mark.asyncio
+    async def test_closing_early_closes_upstream(self, sample_ai_prompt):
+        stream = FakeStream(["a", "b", "c"])
+
+        chunks = await _service(stream).get_llm_analysis_stream(sample_ai_prompt)
+        assert await anext(chunks) == "a"
+        await chunks.aclose()
+
+        assert stream.closed
+
+    @pytest.mark.asyncio
+    async def test_request_is_sent_before_returning(self, sample_ai_prompt):
+        service = _service(None)
+        service._client.chat.completions.create.side_effect = RuntimeError("denied")
+
+        with pytest.raises(RuntimeError, match="denied"):
+            await service.get_llm_analysis_stream(sample_ai_prompt)
+
+
+def _completion(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+class TestLLMServiceCache:
+    @pytest.mark.asyncio
+    async def test_repeated_analysis_is_served_from_cache(self, sample_ai_prompt):
+        cache = AnalysisCache()
+        service = _service(_completion("Fair value."), cache=cache)
+
+        first = await service.get_llm_analysis(sample_ai_prompt)
+        second = await service.get_llm_analysis(sample_ai_prompt)
+
+        assert first == second == "Fair value."
+        assert service._client.chat.completions.create.await_count == 1
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_other_model_is_a_miss(self, sample_ai_prompt):
+        cache = AnalysisCache()
+        await _service(_completion("Fair value."), cache=cache).get_llm_analysis(
+            sample_ai_prompt
+        )
+        other = LLMService(api_key="test", model="other-model", cache=cache)
+        other._client = Mock()
+        other._client.chat.completions.create = AsyncMock(
+            return_value=_completion("Overpriced.")
+        )
+
+        assert await other.get_llm_analysis(sample_ai_prompt) == "Overpriced."
+
+    @pytest.mark.asyncio
+    async def test_completed_stream_is_cached(self, sample_ai_prompt):
+        cache = AnalysisCache()
+        service = _service(FakeStream(["Fair ", "value."]), cache=cache)
+
+        chunks = await service.get_llm_analysis_stream(sample_ai_prompt)
+        assert [chunk async for chunk in chunks] == ["Fair ", "value."]
+
+        cached = await service.get_llm_analysis_stream(sample_ai_prompt)
+        assert [chunk async for chunk in cached] == ["Fair value."]
+        assert await service.get_llm_analysis(sample_ai_prompt) == "Fair value."
+        assert service._client.chat.completions.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_interrupted_stream_is_not_cached(self, sample_ai_prompt):
+        cache = AnalysisCache()
+        stream = FakeStream(["Fair ", "value."])
+
+        chunks = await _service(stream, cache=cache).get_llm_analysis_stream(
+            sample_ai_prompt
+        )
+        assert await anext(chunks) == "Fair "
+        await chunks.aclose()
+
+        assert stream.closed
+        assert len(cache) == 0
+
+
+class TestLLMServiceSingleFlight:
+    @pytest.fixture
+    async def service(self, model_server):
+        service = model_server.llm_service()
+        yield service
+        await service.aclose()
+
+    @staticmethod
+    async def _in_flight(model_server, *calls):
+        model_server.hold = True
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        await model_server.received.wait()
+        return tasks
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_analyses_share_one_request(
+        self, model_server, service, sample_ai_prompt
+    ):
+        tasks = await self._in_flight(
+            model_server,
+            *(service.get_llm_analysis(sample_ai_prompt) for _ in range(5)),
+        )
+        model_server.release.set()
+
+        assert await asyncio.gather(*tasks) == ["Fair value."] * 5
+        assert model_server.requests == 1
+        assert not service._in_flight
+
+    @pytest.mark.asyncio
+    async def test_different_prompts_are_not_coalesced(
+        self, model_server, service, sample_ai_prompt
+    ):
+        other = sample_ai_prompt.model_copy(update={"cpi_value": Decimal("119.0")})
+
+        await asyncio.gather(
+            service.get_llm_analysis(sample_ai_prompt), service.get_llm_analysis(other)
+        )
+
+        assert model_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_finished_analysis_is_not_reused_without_cache(
+        self, model_server, service, sample_ai_prompt
+    ):
+        await service.get_llm_analysis(sample_ai_prompt)
+        await service.get_llm_analysis(sample_ai_prompt)
+
+        assert model_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter_and_is_not_kept(
+        self, model_server, service, sample_ai_prompt
+    ):
+        model_server.status = 500
+        tasks = await self._in_flight(
+            model_server,
+            *(service.get_llm_analysis(sample_ai_prompt) for _ in range(3)),
+        )
+        model_server.release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, openai.InternalServerError) for r in results)
+        model_server.status = 200
+        assert await service.get_llm_analysis(sample_ai_prompt) == "Fair value."
+        assert model_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_others_waiting(
+        self, model_server, service, sample_ai_prompt
+    ):
+        first, second = await self._in_flight(
+            model_server,
+            service.get_llm_analysis(sample_ai_prompt),
+            service.get_llm_analysis(sample_ai_prompt),
+        )
+
+        first.cancel()
+        await asyncio.sleep(0)
+        model_server.release.set()
+
+        assert await second == "Fair value."
+        assert first.cancelled()
+        assert model_server.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_request_is_cancelled_when_no_one_waits(
+        self, model_server, service, sample_ai_prompt
+    ):
+        (only,) = await self._in_flight(
+            model_server, service.get_llm_analysis(sample_ai_prompt)
+        )
+        flight = service._in_flight[next(iter(service._in_flight))]
+
+        only.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        assert not service._in_flight
+
+        model_server.hold = False
+        assert await service.get_llm_analysis(sample_ai_prompt) == "Fair value."
+        assert flight.task.cancelled()
+        assert model_server.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_analysis_skips_the_flight(
+        self, model_server, sample_ai_prompt
+    ):
+        service = model_server.llm_service(cache=AnalysisCache())
+
+        await asyncio.gather(
+            *(service.get_llm_analysis(sample_ai_prompt) for _ in range(3))
+        )
+        await service.get_llm_analysis(sample_ai_prompt)
+        await service.aclose()
+
+        assert model_server.requests == 1
+
+
+class TestLLMServiceAdmission:
+    @pytest.mark.asyncio
+    async def test_stream_holds_its_slot_until_closed(self, sample_ai_prompt):
+        admission = LLMAdmission(max_concurrency=1)
+        stream = FakeStream(["a", "b"])
+        service = _service(stream)
+        service.admission = admission
+
+        chunks = await service.get_llm_analysis_stream(sample_ai_prompt)
+        assert admission.stats.in_flight == 1
+
+        # Never iterated, closing still frees the slot and the upstream.
+        await chunks.aclose()
+        assert admission.stats.in_flight == 0
+        assert stream.closed
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_start_frees_its_slot(self, sample_ai_prompt):
+        admission = LLMAdmission(max_concurrency=1)
+        service = _service(None)
+        service.admission = admission
+        service._client.chat.completions.create.side_effect = RuntimeError("denied")
+
+        with pytest.raises(RuntimeError):
+            await service.get_llm_analysis_stream(sample_ai_prompt)
+
+        assert admission.stats.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesced_analyses_take_one_slot(
+        self, model_server, sample_ai_prompt
+    ):
+        admission = LLMAdmission(max_concurrency=1, max_queue=0)
+        service = model_server.llm_service(admission=admission)
+        model_server.hold = True
+
+        tasks = [
+            asyncio.ensure_future(service.get_llm_analysis(sample_ai_prompt))
+            for _ in range(3)
+        ]
+        await model_server.received.wait()
+        model_server.release.set()
+        results = await asyncio.gather(*tasks)
+        await service.aclose()
+
+        assert results == ["Fair value."] * 3
+        assert admission.stats.admitted == 1
+        assert admission.stats.rejected == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_other_analyses(
+        self, model_server, sample_ai_prompt
+    ):
+        admission = LLMAdmission(max_concurrency=1, max_queue=0)
+        service = model_server.llm_service(admission=admission)
+        other = sample_ai_prompt.model_copy(update={"cpi_value": Decimal("119.0")})
+        model_server.hold = True
+
+        first = asyncio.ensure_future(service.get_llm_analysis(sample_ai_prompt))
+        await model_server.received.wait()
+
+        with pytest.raises(AdmissionRejected):
+            await service.get_llm_analysis(other)
+
+        model_server.release.set()
+        assert await first == "Fair value."
+        await service.aclose()
+        assert model_server.requests == 1
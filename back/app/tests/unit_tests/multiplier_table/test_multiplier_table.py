@@ -0,0 +1,94 @@
+import math
+from decimal import Decimal
+
+import pytest
+
+from back.app.services.multiplier_table import (
+    MultiplierTable,
+    capitalization_multiplier,
+)
+
+
+class TestCapitalizationMultiplier:
+    @pytest.mark.parametrize(
+        "property_yield, years, expected",
+        [
+            # Published Vervielfältiger, rounded to two places.
+            ("5.0", "50", "18.26"),
+            ("3.5", "30", "18.39"),
+            ("6.0", "40", "15.05"),
+            ("1.0", "100", "63.03"),
+        ],
+    )
+    def test_matches_published_table(self, property_yield, years, expected):
+        result = capitalization_multiplier(Decimal(property_yield), Decimal(years))
+
+        assert result.quantize(Decimal("0.01")) == Decimal(expected)
+
+    def test_matches_float_formula(self):
+        for basis_points in range(1, 2001, 37):
+            for years in range(1, 101, 7):
+                i = basis_points / 10_000
+                expected = (1 - math.pow(1 + i, -years)) / i
+
+                result = capitalization_multiplier(
+                    Decimal(basis_points) / 100, Decimal(years)
+                )
+
+                assert math.isclose(result, expected, rel_tol=1e-12)
+
+    def test_zero_yield_is_remaining_life(self):
+        assert capitalization_multiplier(Decimal("0"), Decimal("50")) == 50
+
+
+class TestMultiplierTable:
+    def test_grid_values_are_cached(self):
+        table = MultiplierTable()
+
+        first = table.get(Decimal("5.0"), Decimal("50"))
+        second = table.get(Decimal("5.00"), Decimal("50.0"))
+
+        assert first == second
+        assert first == capitalization_multiplier(Decimal("5"), Decimal("50"))
+        assert len(table) == 1
+
+    @pytest.mark.parametrize(
+        "property_yield, years",
+        [("5.005", "50"), ("5.0", "50.5"), ("25", "50"), ("5.0", "120")],
+    )
+    def test_off_grid_values_are_computed_on_demand(self, property_yield, years):
+        table = MultiplierTable()
+
+        result = table.get(Decimal(property_yield), Decimal(years))
+
+        assert result == capitalization_multiplier(
+            Decimal(property_yield), Decimal(years)
+        )
+        assert len(table) == 0
+
+    def test_recently_used_cells_are_kept(self):
+        table = MultiplierTable(maxsize=2)
+
+        table.get(Decimal("4.5"), Decimal("1"))
+        table.get(Decimal("4.5"), Decimal("2"))
+        table.get(Decimal("4.5"), Decimal("1"))
+        table.get(Decimal("4.5"), Decimal("3"))
+
+        assert set(table._cells) == {
+            (Decimal("4.5"), Decimal("1")),
+            (Decimal("4.5"), Decimal("3")),
+        }
+
+    def test_cache_is_bounded(self):
+        table = MultiplierTable(maxsize=8)
+
+        for years in range(1, 50):
+            table.get(Decimal("4.5"), Decimal(years))
+
+        assert len(table) == 8
+        assert table.get(Decimal("4.5"), Decimal("49")) == capitalization_multiplier(
+            Decimal("4.5"), Decimal("49")
+        )
+
+    def test_zero_yield(self):
+        assert MultiplierTable().get(Decimal("0"), Decimal("30")) == Decimal("30")
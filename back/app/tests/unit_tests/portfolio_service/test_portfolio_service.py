@@ -0,0 +1,153 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pandas as pd
+
+from back.app.schemas.valuation import CpiData
+from back.app.services.batch_valuation_service import BatchValuationService
+from back.app.services.cpi_registry import UnknownCpiCountryError
+from back.app.services.cpi_service import CpiService
+from back.app.services.portfolio_service import (
+    ERROR_COLUMN,
+    RESULT_COLUMNS,
+    PortfolioFormat,
+    PortfolioValuationService,
+    column_mapping,
+)
+from back.app.services.valuation_service import ValuationService
+
+HEADER = (
+    "Property Type,purchase_date,Monthly Net Rent,living_area,residential_units,"
+    "land_value_per_sqm,plot_area,remaining_useful_life,property_yield,"
+    "actual_purchase_price,portfolio_id"
+)
+ROW = "residential,2024-01-15,2000.00,150.0,3,500.00,400.0,50.0,5.0,500000.00,A-{i}"
+
+
+def _write_csv(path, rows):
+    path.write_text("\n".join([HEADER, *rows]) + "\n")
+    return path
+
+
+class TestColumnMapping:
+    def test_matches_field_names_loosely(self):
+        mapping = column_mapping(["Property Type", "monthly-net-rent", "notes"])
+
+        assert mapping == {
+            "Property Type": "property_type",
+            "monthly-net-rent": "monthly_net_rent",
+        }
+
+    def test_overrides(self):
+        mapping = column_mapping(["Rent", "yield"], {"Rent": "monthly_net_rent"})
+
+        assert mapping == {"Rent": "monthly_net_rent"}
+
+    def test_unknown_override_field(self):
+        with pytest.raises(ValueError, match="rent"):
+            column_mapping(["Rent"], {"Rent": "rent"})
+
+    def test_first_column_of_a_field_wins(self):
+        mapping = column_mapping(["plot_area", "Plot Area"])
+
+        assert mapping == {"plot_area": "plot_area"}
+
+
+class TestPortfolioValuationService:
+    @pytest.fixture
+    def service(self, mock_cpi_parser):
+        batch_valuation_service = BatchValuationService(
+            valuation_service=ValuationService(),
+            cpi_service=CpiService(cpi_parser_service=mock_cpi_parser),
+            country_cpi_service=AsyncMock(side_effect=UnknownCpiCountryError),
+        )
+        return PortfolioValuationService(batch_valuation_service, chunk_rows=4)
+
+    @pytest.mark.asyncio
+    async def test_values_in_chunks(self, service, tmp_path):
+        source = _write_csv(tmp_path / "in.csv", [ROW.format(i=i) for i in range(10)])
+        progress = []
+
+        frames = [
+            frame
+            async for frame in service.value_file(
+                source, PortfolioFormat.CSV, on_progress=progress.append
+            )
+        ]
+
+        assert [len(frame) for frame in frames] == [4, 4, 2]
+        assert [p.rows for p in progress] == [4, 8, 10]
+        assert all(p.errors == 0 for p in progress)
+
+    @pytest.mark.asyncio
+    async def test_results_match_single_valuation(
+        self, service, tmp_path, sample_residential_input
+    ):
+        source = _write_csv(tmp_path / "in.csv", [ROW.format(i=0)])
+
+        [frame] = [
+            frame async for frame in service.value_file(source, PortfolioFormat.CSV)
+        ]
+
+        expected = ValuationService().calculate_valuation(
+            sample_residential_input,
+            CpiData(year=2024, month=1, index_value=Decimal("118.5")),
+        )
+        row = frame.iloc[0]
+        for name, getter in RESULT_COLUMNS.items():
+            assert row[name] == pytest.approx(float(getter(expected))), name
+        assert pd.isna(row[ERROR_COLUMN])
+        assert row["portfolio_id"] == "A-0"
+
+    @pytest.mark.asyncio
+    async def test_bad_rows_fail_alone(self, service, tmp_path):
+        source = _write_csv(
+            tmp_path / "in.csv",
+            [
+                ROW.format(i=0),
+                ROW.format(i=1).replace("2000.00", "-5"),
+                ROW.format(i=2).replace("2024-01-15", "2019-01-15"),
+                ROW.format(i=3).replace(",500000.00,", ",,"),
+            ],
+        )
+
+        [frame] = [
+            frame async for frame in service.value_file(source, PortfolioFormat.CSV)
+        ]
+
+        errors = frame[ERROR_COLUMN].tolist()
+        assert pd.isna(errors[0])
+        assert errors[1].startswith("monthly_net_rent")
+        assert errors[2] == "CPI data not found for October 2018"
+        assert pd.isna(errors[3])
+        assert pd.isna(frame["theoretical_total_value"][1])
+        assert pd.isna(frame["actual_land_value"][3])
+        assert not pd.isna(frame["theoretical_total_value"][3])
+
+    @pytest.mark.asyncio
+    async def test_value_to_csv(self, service, tmp_path):
+        source = _write_csv(tmp_path / "in.csv", [ROW.format(i=i) for i in range(10)])
+        target = tmp_path / "out.csv"
+
+        await service.value_to_file(source, target)
+
+        valued = pd.read_csv(target)
+        assert len(valued) == 10
+        assert valued["portfolio_id"].tolist() == [f"A-{i}" for i in range(10)]
+        assert set(RESULT_COLUMNS) <= set(valued.columns)
+
+    @pytest.mark.asyncio
+    async def test_value_to_parquet(self, service, tmp_path):
+        source = _write_csv(tmp_path / "in.csv", [ROW.format(i=i) for i in range(10)])
+        target = tmp_path / "out.parquet"
+
+        await service.value_to_file(source, target)
+
+        valued = pd.read_parquet(target)
+        assert len(valued) == 10
+        assert valued["error"].isna().all()
+
+    def test_unknown_extension(self):
+        with pytest.raises(ValueError, match="xlsx"):
+            PortfolioFormat.from_path("portfolio.xlsx")
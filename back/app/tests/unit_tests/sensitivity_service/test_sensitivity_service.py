@@ -0,0 +1,148 @@
+import itertools
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from back.app.core.constants import MAX_SENSITIVITY_POINTS
+from back.app.schemas.valuation import (
+    CpiData,
+    SensitivityParameter,
+    SensitivityRange,
+    SensitivityRequest,
+)
+from back.app.services.sensitivity_service import SensitivityService
+from back.app.services.valuation_engine import ValuationEngine
+from back.app.services.valuation_service import ValuationService
+
+
+@pytest.fixture
+def service():
+    return SensitivityService(engine=ValuationEngine())
+
+
+def _range(parameter, start, stop, step):
+    return SensitivityRange(
+        parameter=parameter,
+        start=Decimal(start),
+        stop=Decimal(stop),
+        step=Decimal(step),
+    )
+
+
+class TestSensitivityService:
+    def test_grid_matches_single_valuations(self, service, sample_residential_input):
+        request = SensitivityRequest(
+            input_data=sample_residential_input,
+            ranges=[
+                _range(SensitivityParameter.PROPERTY_YIELD, "3.5", "5.5", "0.5"),
+                _range(SensitivityParameter.MONTHLY_NET_RENT, "1800", "2200", "100"),
+                _range(SensitivityParameter.REMAINING_USEFUL_LIFE, "30", "60", "15"),
+            ],
+        )
+
+        result = service.calculate(request, cpi_value=118.5)
+
+        assert result.shape == [5, 5, 3]
+        assert len(result.theoretical_total_value) == 75
+
+        valuation_service = ValuationService()
+        cpi_data = CpiData(year=2024, month=1, index_value=Decimal("118.5"))
+        grid = itertools.product(*(r.values() for r in request.ranges))
+        for i, point in enumerate(grid):
+            input_data = sample_residential_input.model_copy(
+                update={
+                    r.parameter.value: value for r, value in zip(request.ranges, point)
+                }
+            )
+            expected = valuation_service.calculate_valuation(input_data, cpi_data)
+
+            assert result.theoretical_total_value[i] == expected.theoretical_total_value
+            assert result.building_share_percent[i] == float(
+                expected.building_share_percent
+            )
+            assert result.land_share_percent[i] == float(expected.land_share_percent)
+
+    def test_last_parameter_varies_fastest(self, service, sample_commercial_input):
+        request = SensitivityRequest(
+            input_data=sample_commercial_input,
+            ranges=[
+                _range(SensitivityParameter.PLOT_AREA, "400", "500", "100"),
+                _range(SensitivityParameter.PROPERTY_YIELD, "5", "7", "1"),
+            ],
+        )
+
+        result = service.calculate(request, cpi_value=118.5)
+
+        assert result.parameters == ["plot_area", "property_yield"]
+        assert result.axes == [[400.0, 500.0], [5.0, 6.0, 7.0]]
+        values = result.theoretical_total_value
+        # A higher yield lowers the value, a larger plot raises it.
+        assert values[0] > values[1] > values[2]
+        assert values[3] > values[0]
+
+    def test_country_cpi_base(self, service, sample_residential_input):
+        request = SensitivityRequest(
+            input_data=sample_residential_input,
+            ranges=[_range(SensitivityParameter.LIVING_AREA, "100", "100", "1")],
+        )
+
+        result = service.calculate(request, cpi_value=117.1, cpi_base=76.1)
+
+        expected = ValuationService().calculate_valuation(
+            sample_residential_input.model_copy(update={"living_area": Decimal(100)}),
+            CpiData(year=2024, month=1, index_value=Decimal("117.1")),
+            cpi_base=Decimal("76.1"),
+        )
+        assert result.theoretical_total_value == [
+            float(expected.theoretical_total_value)
+        ]
+
+
+class TestSensitivityRequest:
+    def test_range_values_include_stop(self):
+        sweep = _range(SensitivityParameter.PROPERTY_YIELD, "4", "5", "0.25")
+
+        assert sweep.values() == [
+            Decimal("4"),
+            Decimal("4.25"),
+            Decimal("4.5"),
+            Decimal("4.75"),
+            Decimal("5"),
+        ]
+
+    def test_stop_below_start(self):
+        with pytest.raises(ValidationError):
+            _range(SensitivityParameter.PROPERTY_YIELD, "5", "4", "0.1")
+
+    def test_yield_above_100(self):
+        with pytest.raises(ValidationError):
+            _range(SensitivityParameter.PROPERTY_YIELD, "50", "150", "10")
+
+    def test_duplicate_parameter(self, sample_residential_input):
+        sweep = _range(SensitivityParameter.PLOT_AREA, "100", "200", "10")
+
+        with pytest.raises(ValidationError, match="only be swept once"):
+            SensitivityRequest(
+                input_data=sample_residential_input, ranges=[sweep, sweep]
+            )
+
+    def test_too_many_points(self, sample_residential_input):
+        with pytest.raises(ValidationError, match=str(MAX_SENSITIVITY_POINTS)):
+            SensitivityRequest(
+                input_data=sample_residential_input,
+                ranges=[
+                    _range(SensitivityParameter.PLOT_AREA, "1", "1000", "1"),
+                    _range(SensitivityParameter.LIVING_AREA, "1", "1000", "1"),
+                ],
+            )
+
+    def test_at_most_three_ranges(self, sample_residential_input):
+        with pytest.raises(ValidationError):
+            SensitivityRequest(
+                input_data=sample_residential_input,
+                ranges=[
+                    _range(parameter, "1", "2", "1")
+                    for parameter in list(SensitivityParameter)[:4]
+                ],
+            )
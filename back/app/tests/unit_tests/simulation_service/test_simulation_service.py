@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from pydantic import ValidationError
+
+from back.app.schemas.valuation import Distribution, SimulationRequest
+from back.app.services.simulation_service import (
+    SimulationCancelled,
+    SimulationService,
+)
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+
+
+@pytest.fixture
+def service():
+    service = SimulationService(executor=ThreadPoolExecutor(max_workers=2))
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def request_data(sample_residential_input):
+    return SimulationRequest(
+        input_data=sample_residential_input,
+        property_yield=Distribution(kind="normal", mean=5.0, std=0.5),
+        monthly_net_rent=Distribution(kind="uniform", low=1800, high=2200),
+        vacancy=Distribution(kind="triangular", low=0, mode=3, high=10),
+        cpi_drift=Distribution(kind="normal", mean=2, std=1),
+        iterations=60_000,
+        seed=42,
+    )
+
+
+class TestSimulationService:
+    @pytest.mark.asyncio
+    async def test_seeded_runs_are_reproducible(self, service, request_data):
+        first = await service.simulate(request_data, cpi_value=118.5)
+        second = await service.simulate(request_data, cpi_value=118.5)
+
+        assert first == second
+        assert first.seed == 42
+        assert first.iterations == 60_000
+
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_threads(self, service, request_data):
+        process_service = SimulationService(max_workers=2)
+        try:
+            in_processes = await process_service.simulate(request_data, cpi_value=118.5)
+        finally:
+            process_service.shutdown()
+
+        assert in_processes == await service.simulate(request_data, cpi_value=118.5)
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_is_replaced(self, service, request_data):
+        process_service = SimulationService(max_workers=1)
+        broken = process_service.executor
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        try:
+            result = await process_service.simulate(request_data, cpi_value=118.5)
+            assert process_service.executor is not broken
+        finally:
+            process_service.shutdown()
+
+        assert result == await service.simulate(request_data, cpi_value=118.5)
+
+    @pytest.mark.asyncio
+    async def test_unseeded_run_reports_its_seed(self, service, request_data):
+        request_data = request_data.model_copy(update={"seed": None})
+
+        result = await service.simulate(request_data, cpi_value=118.5)
+        replay = await service.simulate(
+            request_data.model_copy(update={"seed": result.seed}), cpi_value=118.5
+        )
+
+        assert result == replay
+
+    @pytest.mark.asyncio
+    async def test_summary(self, service, request_data):
+        result = await service.simulate(request_data, cpi_value=118.5)
+
+        percentiles = list(result.percentiles.values())
+        assert list(result.percentiles) == [f"p{p}" for p in service.PERCENTILES]
+        assert percentiles == sorted(percentiles)
+        assert percentiles[0] < result.mean < percentiles[-1]
+        assert sum(result.histogram.counts) == 60_000
+        assert len(result.histogram.edges) == request_data.bins + 1
+
+    @pytest.mark.asyncio
+    async def test_without_distributions_every_value_is_the_point_estimate(
+        self, service, sample_residential_input
+    ):
+        request_data = SimulationRequest(
+            input_data=sample_residential_input, iterations=1000, seed=1
+        )
+
+        result = await service.simulate(request_data, cpi_value=118.5)
+
+        expected = ValuationEngine().calculate_broadcast(
+            ValuationColumns.from_input(sample_residential_input, 118.5)
+        )
+        assert result.std == 0
+        assert set(result.percentiles.values()) == {
+            float(expected.theoretical_total_value)
+        }
+
+    @pytest.mark.asyncio
+    async def test_vacancy_lowers_the_value(self, service, sample_residential_input):
+        base = SimulationRequest(
+            input_data=sample_residential_input, iterations=1000, seed=1
+        )
+        vacant = base.model_copy(
+            update={"vacancy": Distribution(kind="uniform", low=5, high=15)}
+        )
+
+        point = await service.simulate(base, cpi_value=118.5)
+        with_vacancy = await service.simulate(vacant, cpi_value=118.5)
+
+        assert with_vacancy.percentiles["p99"] < point.mean
+
+    @pytest.mark.asyncio
+    async def test_cancelled(self, request_data):
+        service = SimulationService(executor=ThreadPoolExecutor(max_workers=1))
+        service.CHUNK_SIZE = 100
+        service.POLL_INTERVAL = 0.01
+        request_data = request_data.model_copy(update={"iterations": 1_000_000})
+
+        async def is_cancelled():
+            return True
+
+        started = time.perf_counter()
+        with pytest.raises(SimulationCancelled):
+            await service.simulate(
+                request_data, cpi_value=118.5, is_cancelled=is_cancelled
+            )
+        service.shutdown()
+
+        # 10,000 chunks were queued, far fewer ran.
+        assert time.perf_counter() - started < 2
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, request_data):
+        service = SimulationService(max_workers=1)
+        request_data = request_data.model_copy(update={"iterations": 500_000})
+        max_lag = 0.0
+
+        async def heartbeat():
+            nonlocal max_lag
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.perf_counter() - started - 0.01)
+
+        task = asyncio.create_task(heartbeat())
+        try:
+            await service.simulate(request_data, cpi_value=118.5)
+        finally:
+            task.cancel()
+            service.shutdown()
+
+        assert max_lag < 0.25
+
+
+class TestDistribution:
+    @pytest.mark.parametrize(
+        "parameters",
+        [
+            {"kind": "normal", "mean": 5},
+            {"kind": "normal", "mean": 5, "std": -1},
+            {"kind": "uniform", "low": 5},
+            {"kind": "uniform", "low": 5, "high": 4},
+            {"kind": "triangular", "low": 1, "high": 3},
+            {"kind": "triangular", "low": 1, "mode": 4, "high": 3},
+            {"kind": "triangular", "low": 2, "mode": 2, "high": 2},
+            {"kind": "poisson", "mean": 1},
+        ],
+    )
+    def test_invalid(self, parameters):
+        with pytest.raises(ValidationError):
+            Distribution(**parameters)
+
+    def test_iterations_bounded(self, sample_residential_input):
+        with pytest.raises(ValidationError):
+            SimulationRequest(
+                input_data=sample_residential_input, iterations=10_000_000
+            )
@@ -0,0 +1,123 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from back.app.schemas.valuation import CpiData, TimelineRequest
+from back.app.services.cpi_series import CpiSeries, CpiSnapshot
+from back.app.services.timeline_service import TimelineService
+from back.app.services.valuation_engine import ValuationEngine
+from back.app.services.valuation_service import ValuationService
+
+OCTOBERS = {year: 85.0 + 1.3 * (year - 2001) for year in range(2001, 2024)}
+# No October 2010: purchases in 2011 cannot be valued.
+del OCTOBERS[2010]
+
+
+@pytest.fixture
+def snapshot():
+    items = [(year, 10, value) for year, value in OCTOBERS.items()]
+    items += [(2015, 3, 99.9), (2023, 12, 120.0)]
+    return CpiSnapshot(version=7, series=CpiSeries.from_items(items))
+
+
+class TestTimelineService:
+    def test_every_month_matches_calculate(self, snapshot, sample_residential_input):
+        request = TimelineRequest(
+            input_data=sample_residential_input, start="2009-11", end="2012-02"
+        )
+
+        timeline = TimelineService(ValuationEngine()).calculate(request, snapshot)
+
+        assert timeline.version == 7
+        assert timeline.periods[0] == "2009-11"
+        assert timeline.periods[-1] == "2012-02"
+        assert len(timeline.periods) == 28
+
+        service = ValuationService()
+        for i, period in enumerate(timeline.periods):
+            year, month = int(period[:4]), int(period[5:])
+            if year == 2011:
+                assert timeline.cpi_value[i] is None
+                assert timeline.theoretical_total_value[i] is None
+                continue
+
+            expected = service.calculate_valuation(
+                sample_residential_input.model_copy(
+                    update={"purchase_date": date(year, month, 1)}
+                ),
+                CpiData(
+                    year=year,
+                    month=month,
+                    index_value=Decimal(str(OCTOBERS[year - 1])),
+                ),
+            )
+            assert timeline.cpi_value[i] == OCTOBERS[year - 1]
+            assert Decimal(str(timeline.theoretical_total_value[i])) == (
+                expected.theoretical_total_value
+            )
+            assert Decimal(str(timeline.land_share_percent[i])) == (
+                expected.land_share_percent
+            )
+            assert Decimal(str(timeline.actual_building_value[i])) == (
+                expected.actual_building_value
+            )
+
+    def test_one_engine_pass(self, snapshot, sample_commercial_input):
+        request = TimelineRequest(
+            input_data=sample_commercial_input, start="2002-01", end="2024-12"
+        )
+        engine = ValuationEngine()
+
+        with patch.object(
+            engine, "calculate_broadcast", wraps=engine.calculate_broadcast
+        ) as calculate_broadcast:
+            timeline = TimelineService(engine).calculate(request, snapshot)
+
+        calculate_broadcast.assert_called_once()
+        assert len(timeline.periods) == 23 * 12
+        assert timeline.theoretical_total_value[-1] is not None
+
+    def test_months_outside_the_series(self, sample_commercial_input):
+        snapshot = CpiSnapshot(series=CpiSeries.from_items([(2020, 10, 110.0)]))
+        request = TimelineRequest(
+            input_data=sample_commercial_input, start="2020-06", end="2021-01"
+        )
+
+        timeline = TimelineService(ValuationEngine()).calculate(request, snapshot)
+
+        assert timeline.cpi_value == [None] * 7 + [110.0]
+
+    def test_missing_price_leaves_actual_values_empty(
+        self, snapshot, sample_commercial_input
+    ):
+        request = TimelineRequest(
+            input_data=sample_commercial_input.model_copy(
+                update={"actual_purchase_price": None}
+            ),
+            start="2020-01",
+            end="2020-03",
+        )
+
+        timeline = TimelineService(ValuationEngine()).calculate(request, snapshot)
+
+        assert timeline.actual_land_value == [None] * 3
+        assert all(v is not None for v in timeline.theoretical_total_value)
+
+
+class TestTimelineRequest:
+    def test_end_defaults_to_this_month(self, sample_commercial_input):
+        request = TimelineRequest(input_data=sample_commercial_input)
+
+        today = date.today()
+        assert request.start == "2002-01"
+        assert request.end == f"{today.year:04d}-{today.month:02d}"
+
+    @pytest.mark.parametrize(
+        "start, end",
+        [("2010-05", "2010-04"), ("2001-12", "2002-03"), ("2002-01", "2999-01")],
+    )
+    def test_invalid_spans(self, sample_commercial_input, start, end):
+        with pytest.raises(ValueError):
+            TimelineRequest(input_data=sample_commercial_input, start=start, end=end)
@@ -0,0 +1,152 @@
+import pytest
+from decimal import Decimal
+
+from back.app.schemas.valuation import CpiData, ValuationInput
+from back.app.services.valuation_cache import ValuationCache, valuation_key
+from back.app.services.valuation_service import ValuationService
+
+
+@pytest.fixture
+def cpi_data():
+    return CpiData(year=2024, month=1, index_value=Decimal("118.5"))
+
+
+@pytest.fixture
+def result(sample_residential_input, cpi_data):
+    return ValuationService().calculate_valuation(sample_residential_input, cpi_data)
+
+
+class TestValuationKey:
+    def test_equal_validated_inputs_share_a_key(
+        self, sample_residential_input, cpi_data
+    ):
+        payload = sample_residential_input.model_dump(mode="json")
+        same = ValuationInput.model_validate(payload | {"residential_units": 3})
+
+        assert valuation_key(same, cpi_data, Decimal("84.5")) == valuation_key(
+            sample_residential_input, cpi_data, Decimal("84.5")
+        )
+
+    def test_cpi_value_and_base_are_part_of_the_key(
+        self, sample_residential_input, cpi_data
+    ):
+        key = valuation_key(sample_residential_input, cpi_data, Decimal("84.5"))
+        revised = cpi_data.model_copy(update={"index_value": Decimal("118.6")})
+
+        assert key != valuation_key(sample_residential_input, revised, Decimal("84.5"))
+        assert key != valuation_key(sample_residential_input, cpi_data, Decimal("76.1"))
+
+    def test_inputs_are_part_of_the_key(self, sample_residential_input, cpi_data):
+        other = sample_residential_input.model_copy(
+            update={"property_yield": Decimal("5.5")}
+        )
+
+        assert valuation_key(other, cpi_data, Decimal("84.5")) != valuation_key(
+            sample_residential_input, cpi_data, Decimal("84.5")
+        )
+
+
+class TestValuationCache:
+    def test_hit_and_miss_counters(self, result):
+        cache = ValuationCache()
+
+        assert cache.get("a") is None
+        cache.put("a", result)
+
+        assert cache.get("a") is result
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.size == 1
+
+    def test_evicts_least_recently_used(self, result):
+        cache = ValuationCache(maxsize=2)
+        cache.put("a", result)
+        cache.put("b", result)
+        cache.get("a")
+
+        cache.put("c", result)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is result
+        assert cache.stats.evictions == 1
+        assert len(cache) == 2
+
+    def test_entries_expire(self, result, clock):
+        cache = ValuationCache(ttl=60, clock=clock)
+        cache.put("a", result)
+
+        clock.now += 59
+        assert cache.get("a") is result
+        clock.now += 1
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+    def test_disk_tier_survives_restarts(self, result, tmp_path, clock):
+        path = tmp_path / "cache" / "valuations.sqlite3"
+        cache = ValuationCache(path=path, clock=clock)
+        cache.put("a", result)
+        cache.close()
+
+        restarted = ValuationCache(path=path, clock=clock)
+
+        assert restarted.get("a") == result
+        assert restarted.stats.disk_hits == 1
+        assert len(restarted) == 1
+
+    def test_expired_disk_entries_are_not_served(self, result, tmp_path, clock):
+        path = tmp_path / "valuations.sqlite3"
+        ValuationCache(path=path, ttl=60, clock=clock).put("a", result)
+        clock.now += 60
+
+        assert ValuationCache(path=path, clock=clock).get("a") is None
+
+    def test_disk_tier_is_trimmed(self, result, tmp_path, clock):
+        path = tmp_path / "valuations.sqlite3"
+        cache = ValuationCache(maxsize=1, path=path, disk_maxsize=2, clock=clock)
+        cache.DISK_PRUNE_INTERVAL = 1
+
+        for key in "abc":
+            clock.now += 1
+            cache.put(key, result)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == result
+
+    def test_unavailable_disk_tier_only_costs_hits(self, result, tmp_path):
+        # A directory where the database file should be.
+        cache = ValuationCache(path=tmp_path)
+
+        cache.put("a", result)
+
+        assert cache.get("a") is result
+        assert cache.get("b") is None
+
+
+class TestCachedValuationService:
+    def test_repeated_valuations_are_served_from_cache(
+        self, sample_residential_input, cpi_data, result
+    ):
+        cache = ValuationCache()
+        service = ValuationService(cache=cache)
+
+        first = service.calculate_valuation(sample_residential_input, cpi_data)
+        second = service.calculate_valuation(sample_residential_input, cpi_data)
+
+        assert first == result
+        assert second is first
+        assert cache.stats.hits == 1
+
+    def test_changed_cpi_value_is_never_served_stale(
+        self, sample_residential_input, cpi_data
+    ):
+        service = ValuationService(cache=ValuationCache())
+        service.calculate_valuation(sample_residential_input, cpi_data)
+        revised = cpi_data.model_copy(update={"index_value": Decimal("119.0")})
+
+        result = service.calculate_valuation(sample_residential_input, revised)
+
+        assert result == ValuationService().calculate_valuation(
+            sample_residential_input, revised
+        )
+        assert result.cpi_used.index_value == Decimal("119.0")
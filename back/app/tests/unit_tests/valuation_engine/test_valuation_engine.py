@@ -0,0 +1,176 @@
+import math
+import random
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+from back.app.schemas.valuation import CpiData, PropertyType, ValuationInput
+from back.app.services.valuation_engine import (
+    ValuationColumns,
+    ValuationEngine,
+    _round_half_up,
+)
+from back.app.services.valuation_service import ValuationService
+
+ROUNDED_FIELDS = {
+    "land_value": lambda r: r.land_value,
+    "administration": lambda r: r.management_costs.administration,
+    "maintenance": lambda r: r.management_costs.maintenance,
+    "risk_of_rent_loss": lambda r: r.management_costs.risk_of_rent_loss,
+    "management_total": lambda r: r.management_costs.total,
+    "risk_percentage": lambda r: r.management_costs.risk_percentage,
+    "annual_net_income": lambda r: r.annual_net_income,
+    "land_interest": lambda r: r.land_interest,
+    "building_net_income": lambda r: r.building_net_income,
+    "theoretical_building_value": lambda r: r.theoretical_building_value,
+    "theoretical_total_value": lambda r: r.theoretical_total_value,
+    "building_share_percent": lambda r: r.building_share_percent,
+    "land_share_percent": lambda r: r.land_share_percent,
+    "actual_building_value": lambda r: r.actual_building_value,
+    "actual_land_value": lambda r: r.actual_land_value,
+}
+
+UNROUNDED_FIELDS = ["index_factor", "annual_gross_income", "multiplier"]
+
+
+def _decimal(rng, low, high, places):
+    scale = 10**places
+    return Decimal(rng.randint(int(low * scale), int(high * scale))) / scale
+
+
+def _random_input(rng) -> ValuationInput:
+    residential = rng.random() < 0.6
+    return ValuationInput(
+        property_type=(
+            PropertyType.RESIDENTIAL if residential else PropertyType.COMMERCIAL
+        ),
+        purchase_date=date(2024, 1, 1),
+        monthly_net_rent=_decimal(rng, 100, 50_000, 2),
+        living_area=_decimal(rng, 20, 5_000, 1),
+        residential_units=(
+            Decimal(rng.randint(0, 40)) if residential and rng.random() < 0.9 else None
+        ),
+        land_value_per_sqm=_decimal(rng, 10, 3_000, 2),
+        plot_area=_decimal(rng, 50, 10_000, 1),
+        remaining_useful_life=Decimal(rng.randint(1, 80)),
+        property_yield=_decimal(rng, 0.5, 12, 2),
+        actual_purchase_price=(
+            _decimal(rng, 50_000, 5_000_000, 2) if rng.random() < 0.7 else None
+        ),
+    )
+
+
+def _assert_parity(inputs, cpi_values, cpi_bases=None):
+    columns = ValuationColumns.from_inputs(inputs, cpi_values, cpi_bases)
+    arrays = ValuationEngine().calculate(columns).to_dict()
+    service = ValuationService()
+
+    for i, input_data in enumerate(inputs):
+        cpi_data = CpiData(year=2024, month=1, index_value=Decimal(str(cpi_values[i])))
+        cpi_base = None if cpi_bases is None else Decimal(str(cpi_bases[i]))
+        expected = service.calculate_valuation(input_data, cpi_data, cpi_base=cpi_base)
+
+        for name, field in ROUNDED_FIELDS.items():
+            value = field(expected)
+            if value is None:
+                assert math.isnan(arrays[name][i]), (i, name)
+            else:
+                assert Decimal(str(arrays[name][i])) == value, (i, name)
+
+        for name in UNROUNDED_FIELDS:
+            assert math.isclose(
+                arrays[name][i], float(getattr(expected, name)), rel_tol=1e-12
+            ), (i, name)
+
+
+class TestValuationEngineParity:
+    def test_random_inputs_match_decimal_path(self):
+        rng = random.Random(2024)
+        inputs = [_random_input(rng) for _ in range(2_000)]
+        cpi_values = [float(_decimal(rng, 80, 130, 1)) for _ in inputs]
+
+        _assert_parity(inputs, cpi_values)
+
+    def test_country_cpi_base(self):
+        rng = random.Random(33)
+        inputs = [_random_input(rng) for _ in range(200)]
+        cpi_values = [float(_decimal(rng, 80, 130, 1)) for _ in inputs]
+        cpi_bases = [76.1] * len(inputs)
+
+        _assert_parity(inputs, cpi_values, cpi_bases)
+
+    def test_fixture_inputs(self, sample_residential_input, sample_commercial_input):
+        _assert_parity([sample_residential_input, sample_commercial_input], [118.5] * 2)
+
+    def test_exact_halves_round_half_up(self, sample_commercial_input):
+        # 10.01 * 50.0 = 500.5 and, at an index factor of 1, 9.0 * 100.5 =
+        # 904.5 and 12.50 * 12 * 0.03 = 4.5: halves that float64 rounding
+        # would send to even.
+        input_data = sample_commercial_input.model_copy(
+            update={
+                "land_value_per_sqm": Decimal("10.01"),
+                "plot_area": Decimal("50.0"),
+                "living_area": Decimal("100.5"),
+                "monthly_net_rent": Decimal("12.50"),
+            }
+        )
+        columns = ValuationColumns.from_inputs([input_data], [84.5])
+        arrays = ValuationEngine().calculate(columns)
+
+        assert arrays.land_value[0] == 501
+        assert arrays.maintenance[0] == 905
+        assert arrays.administration[0] == 5
+
+        _assert_parity([input_data], [84.5])
+
+
+class TestValuationEngine:
+    def test_missing_purchase_price_is_nan(self, sample_residential_input):
+        input_data = sample_residential_input.model_copy(
+            update={"actual_purchase_price": None}
+        )
+        columns = ValuationColumns.from_inputs([input_data], [118.5])
+
+        arrays = ValuationEngine().calculate(columns)
+
+        assert np.isnan(arrays.actual_building_value[0])
+        assert np.isnan(arrays.actual_land_value[0])
+        assert not np.isnan(arrays.theoretical_total_value[0])
+
+    def test_empty_columns(self):
+        columns = ValuationColumns.from_inputs([], [])
+
+        arrays = ValuationEngine().calculate(columns)
+
+        assert len(columns) == 0
+        assert len(arrays) == 0
+
+    def test_result_columns_have_input_length(self, sample_residential_input):
+        columns = ValuationColumns.from_inputs(
+            [sample_residential_input] * 5, [118.5] * 5
+        )
+
+        arrays = ValuationEngine().calculate(columns)
+
+        assert len(arrays) == 5
+        assert all(len(column) == 5 for column in arrays.to_dict().values())
+
+    @pytest.mark.parametrize("value", [0.5, 1.5, 2.5, -0.5, 1234.5])
+    def test_rounds_halves_away_from_zero(self, value):
+        expected = Decimal(str(value)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        assert _round_half_up(np.array([value]), 0)[0] == float(expected)
+
+    def test_blocks_match_single_pass(self):
+        rng = random.Random(5)
+        inputs = [_random_input(rng) for _ in range(1_000)]
+        columns = ValuationColumns.from_inputs(inputs, [118.5] * len(inputs))
+        blocked = ValuationEngine()
+        blocked.BLOCK_ROWS = 64
+
+        expected = ValuationEngine().calculate(columns).to_dict()
+        actual = blocked.calculate(columns).to_dict()
+
+        for name, values in expected.items():
+            np.testing.assert_array_equal(actual[name], values)
@@ -65,13 +65,11 @@ class TestResidentialManagementCosts:
     def test_residential_costs_with_units(
         self, valuation_service, sample_residential_input, sample_cpi_data
     ):
-        index_factor = valuation_service._calculate_index_factor(
-            sample_cpi_data.index_value
-        )
+        constants = valuation_service.index_constants(sample_cpi_data.index_value)
         annual_gross_income = Decimal("24000.00")
 
         result = valuation_service._calculate_residential_costs(
-            sample_residential_input, index_factor, annual_gross_income
+            sample_residential_input, constants, annual_gross_income
         )
 
         assert isinstance(result, ManagementCosts)
@@ -96,13 +94,11 @@ class TestResidentialManagementCosts:
             remaining_useful_life=Decimal("50.0"),
             property_yield=Decimal("5.0"),
         )
-        index_factor = valuation_service._calculate_index_factor(
-            sample_cpi_data.index_value
-        )
+        constants = valuation_service.index_constants(sample_cpi_data.index_value)
         annual_gross_income = Decimal("24000.00")
 
         result = valuation_service._calculate_residential_costs(
-            input_data, index_factor, annual_gross_income
+            input_data, constants, annual_gross_income
         )
 
         assert result.administration == Decimal("0")
@@ -137,15 +133,13 @@ class TestResidentialManagementCosts:
             property_yield=Decimal("5.0"),
         )
 
-        index_factor = valuation_service._calculate_index_factor(
-            sample_cpi_data.index_value
-        )
+        constants = valuation_service.index_constants(sample_cpi_data.index_value)
 
         costs_small = valuation_service._calculate_residential_costs(
-            input_data_small, index_factor, Decimal("12000.00")
+            input_data_small, constants, Decimal("12000.00")
         )
         costs_large = valuation_service._calculate_residential_costs(
-            input_data_large, index_factor, Decimal("24000.00")
+            input_data_large, constants, Decimal("24000.00")
         )
 
         assert costs_large.maintenance > costs_small.maintenance
@@ -155,13 +149,11 @@ class TestCommercialManagementCosts:
     def test_commercial_costs_calculation(
         self, valuation_service, sample_commercial_input, sample_cpi_data
     ):
-        index_factor = valuation_service._calculate_index_factor(
-            sample_cpi_data.index_value
-        )
+        constants = valuation_service.index_constants(sample_cpi_data.index_value)
         annual_gross_income = Decimal("60000.00")
 
         result = valuation_service._calculate_commercial_costs(
-            sample_commercial_input, index_factor, annual_gross_income
+            sample_commercial_input, constants, annual_gross_income
         )
 
         assert isinstance(result, ManagementCosts)
@@ -178,13 +170,11 @@ class TestCommercialManagementCosts:
     def test_commercial_admin_percentage_based(
         self, valuation_service, sample_commercial_input, sample_cpi_data
     ):
-        index_factor = valuation_service._calculate_index_factor(
-            sample_cpi_data.index_value
-        )
+        constants = valuation_service.index_constants(sample_cpi_data.index_value)
         annual_gross_income = Decimal("100000.00")
 
         result = valuation_service._calculate_commercial_costs(
-            sample_commercial_input, index_factor, annual_gross_income
+            sample_commercial_input, constants, annual_gross_income
         )
 
         expected_admin = annual_gross_income * Decimal("0.03")
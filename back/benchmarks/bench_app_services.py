@@ -0,0 +1,132 @@
+"""
+Per-request cost of the API's services: building them for every request,
+as the dependencies did, against taking them from the AppServices created
+once at startup. Also counts the connections a run of analyses opens to a
+local stand-in for the model provider; with TLS each one is a handshake.
+
+Run from the repository root:
+
+    python -m back.benchmarks.bench_app_services
+"""
+
+import asyncio
+import time
+import timeit
+import tracemalloc
+
+from back.app.core.config import settings
+from back.app.schemas.valuation import AIPromptSchema
+from back.app.services.app_services import AppServices, llm_http_client
+from back.app.services.cpi_service import CpiService
+from back.app.services.implied_yield_service import ImpliedYieldService
+from back.app.services.llm_service import LLMService
+from back.app.services.sensitivity_service import SensitivityService
+from back.app.services.timeline_service import TimelineService
+from back.app.services.valuation_engine import ValuationEngine
+from back.app.services.valuation_service import ValuationService
+from back.app.tests.model_server import FakeModelServer
+
+REQUESTS = 200
+ANALYSES = 50
+
+PROMPT = AIPromptSchema(
+    property_type="residential",
+    purchase_date="2024-01-15",
+    actual_purchase_price=500000,
+    theoretical_total_value=412499,
+    building_share_percent=51.52,
+    land_share_percent=48.48,
+    admin_costs=1500,
+    maintenance_costs=1800,
+    risk_amount=360,
+    risk_percentage=1.5,
+    index_factor=1.4,
+    cpi_value=118.5,
+    cpi_base_2001=84.5,
+)
+
+
+def _per_request_services(parser) -> tuple:
+    # What the dependencies built for every request before AppServices.
+    return (
+        CpiService(cpi_parser_service=parser),
+        ValuationService(),
+        SensitivityService(engine=ValuationEngine()),
+        ImpliedYieldService(engine=ValuationEngine()),
+        TimelineService(engine=ValuationEngine()),
+        LLMService(api_key=settings.OPENAI_API_KEY, model=settings.LLM),
+    )
+
+
+def _app_services(services: AppServices, parser) -> tuple:
+    return (
+        services.cpi_service(parser),
+        services.valuation_service,
+        services.sensitivity_service,
+        services.implied_yield_service,
+        services.timeline_service,
+        services.llm_service,
+    )
+
+
+def _measure(build) -> tuple[float, int]:
+    """Seconds per request and the memory peak of one."""
+
+    seconds = min(timeit.repeat(build, number=REQUESTS, repeat=3)) / REQUESTS
+    build()
+    tracemalloc.start()
+    build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+async def _analyses(server: FakeModelServer, shared: bool) -> float:
+    server.connections = 0
+    http_client = llm_http_client() if shared else None
+    shared_service = server.llm_service(http_client=http_client) if shared else None
+    started = time.perf_counter()
+    for _ in range(ANALYSES):
+        llm = shared_service or server.llm_service()
+        await llm.get_llm_analysis(PROMPT)
+        if not shared:
+            await llm.aclose()
+    elapsed = (time.perf_counter() - started) / ANALYSES
+    if shared:
+        await shared_service.aclose()
+    return elapsed
+
+
+async def _connections() -> None:
+    server = FakeModelServer()
+    await server.start()
+    try:
+        for label, shared in (("client per request", False), ("shared pool", True)):
+            elapsed = await _analyses(server, shared)
+            print(
+                f"{label:<20} {elapsed * 1e3:6.2f} ms/analysis, "
+                f"{server.connections} connections for {ANALYSES} analyses"
+            )
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    services = AppServices.create(caches=False)
+    parser = services.cpi_registry.get()
+
+    print(f"Services for one request ({REQUESTS} requests):")
+    for label, build in (
+        ("built per request", lambda: _per_request_services(parser)),
+        ("from AppServices", lambda: _app_services(services, parser)),
+    ):
+        seconds, peak = _measure(build)
+        print(f"{label:<20} {seconds * 1e6:8.1f} us, {peak / 1024:8.1f} KiB peak")
+
+    print(f"\nAnalyses against a local provider ({ANALYSES} sequential):")
+    asyncio.run(_connections())
+    asyncio.run(services.aclose())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Event-loop blocking time of the CPI page parse, before and after moving it
+off the loop.
+
+Run from the repository root:
+
+    python -m back.benchmarks.bench_cpi_parse
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+from back.app.services.cpi_table_parser import parse_cpi_table
+
+PAGE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "app"
+    / "tests"
+    / "fixtures"
+    / "germany_historical_cpi.html"
+)
+BACKENDS = ["bs4", "lxml", "stream"]
+ROUNDS = 20
+TICK = 0.001
+
+
+async def _max_loop_lag(work) -> float:
+    """Run `work` while a 1 ms heartbeat measures the longest loop stall."""
+
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            max_lag = max(max_lag, time.perf_counter() - started - TICK)
+
+    task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(TICK * 5)
+    await work()
+    stop.set()
+    await task
+    return max_lag
+
+
+def _parse_time(html: bytes, backend: str) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        parse_cpi_table(html, backend)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main() -> None:
+    html = PAGE_PATH.read_bytes()
+    print(f"page: {PAGE_PATH.name}, {len(html) / 1024:.0f} KiB\n")
+    print(
+        f"{'backend':<8} {'parse ms':>10} {'inline stall ms':>16} {'thread stall ms':>16}"
+    )
+
+    for backend in BACKENDS:
+
+        async def inline():
+            parse_cpi_table(html, backend)
+
+        async def threaded():
+            await asyncio.to_thread(parse_cpi_table, html, backend)
+
+        inline_lag = max([await _max_loop_lag(inline) for _ in range(5)])
+        thread_lag = max([await _max_loop_lag(threaded) for _ in range(5)])
+        print(
+            f"{backend:<8} {_parse_time(html, backend) * 1000:>10.2f} "
+            f"{inline_lag * 1000:>16.2f} {thread_lag * 1000:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Memory and per-lookup cost of the CPI store: the previous
+dict[CpiPeriod, float] against the array-backed CpiSeries.
+
+Run from the repository root:
+
+    python -m back.benchmarks.bench_cpi_store
+"""
+
+import timeit
+import tracemalloc
+
+from back.app.schemas.cpi import CpiPeriod
+from back.app.services.cpi_series import CpiSeries
+
+FIRST_YEAR = 2002
+LAST_YEAR = 2026
+LOOKUPS = 200_000
+
+
+def _periods():
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        for month in range(1, 13):
+            yield year, month, 80.0 + (year - FIRST_YEAR) + month / 12
+
+
+def _build_dict() -> dict[CpiPeriod, float]:
+    return {
+        CpiPeriod(year=year, month=month): value for year, month, value in _periods()
+    }
+
+
+def _build_series() -> CpiSeries:
+    series = CpiSeries()
+    for year, month, value in _periods():
+        series.set(year, month, value)
+    return series
+
+
+def _traced_size(build) -> tuple[object, int]:
+    tracemalloc.start()
+    store = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size
+
+
+def main() -> None:
+    cpi_dict, dict_bytes = _traced_size(_build_dict)
+    series, series_bytes = _traced_size(_build_series)
+    print(f"months stored: {len(series)}")
+    print(f"dict[CpiPeriod, float]: {dict_bytes / 1024:8.1f} KiB")
+    print(f"CpiSeries:              {series_bytes / 1024:8.1f} KiB")
+
+    dict_lookup = min(
+        timeit.repeat(
+            "get(CpiPeriod(year=2023, month=10))",
+            globals={"get": cpi_dict.get, "CpiPeriod": CpiPeriod},
+            number=LOOKUPS,
+            repeat=5,
+        )
+    )
+    series_lookup = min(
+        timeit.repeat(
+            "get(2023, 10)", globals={"get": series.get}, number=LOOKUPS, repeat=5
+        )
+    )
+    print(f"\ndict lookup:      {dict_lookup / LOOKUPS * 1e9:8.0f} ns")
+    print(f"CpiSeries lookup: {series_lookup / LOOKUPS * 1e9:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
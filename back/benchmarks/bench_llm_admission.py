@@ -0,0 +1,127 @@
+"""
+Latency of a burst of distinct analyses against a simulated model provider
+that slows down with the calls it serves at once and rate limits past a
+cap, with and without LLMAdmission in front of it.
+
+Run from the repository root:
+
+    python -m back.benchmarks.bench_llm_admission
+"""
+
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from back.app.schemas.valuation import AIPromptSchema
+from back.app.services.llm_admission import AdmissionRejected, LLMAdmission
+from back.app.services.llm_service import LLMService
+
+BURST = 300
+# The provider serves CAPACITY calls in SERVICE_SECONDS each; more share it
+# and take proportionally longer, and past RATE_LIMIT calls it refuses.
+CAPACITY = 8
+SERVICE_SECONDS = 0.05
+RATE_LIMIT = 32
+
+
+class ProviderRateLimited(Exception):
+    pass
+
+
+class _Provider:
+    def __init__(self):
+        self.in_flight = 0
+
+    async def create(self, **_kwargs):
+        if self.in_flight >= RATE_LIMIT:
+            await asyncio.sleep(0.005)
+            raise ProviderRateLimited()
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(SERVICE_SECONDS * max(1, self.in_flight / CAPACITY))
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content="Fair value.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _prompt(i: int) -> AIPromptSchema:
+    # Distinct prompts, so single-flight does not merge them.
+    return AIPromptSchema(
+        property_type="residential",
+        purchase_date="2024-01-15",
+        actual_purchase_price=Decimal(500_000 + i),
+        theoretical_total_value=Decimal(412_499),
+        building_share_percent=Decimal("51.52"),
+        land_share_percent=Decimal("48.48"),
+        admin_costs=Decimal(1500),
+        maintenance_costs=Decimal(1800),
+        risk_amount=Decimal(360),
+        risk_percentage=Decimal("1.50"),
+        index_factor=Decimal("1.4"),
+        cpi_value=Decimal("118.5"),
+        cpi_base_2001=Decimal("84.5"),
+    )
+
+
+async def _burst(admission: LLMAdmission | None) -> dict[str, list[float]]:
+    service = LLMService(api_key="bench", model="bench", admission=admission)
+    service._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=_Provider()),
+        close=service._client.close,
+    )
+    outcomes: dict[str, list[float]] = {"ok": [], "provider": [], "rejected": []}
+
+    async def call(i: int) -> None:
+        started = time.perf_counter()
+        try:
+            await service.get_llm_analysis(_prompt(i))
+            outcome = "ok"
+        except ProviderRateLimited:
+            outcome = "provider"
+        except AdmissionRejected:
+            outcome = "rejected"
+        outcomes[outcome].append(time.perf_counter() - started)
+
+    await asyncio.gather(*(call(i) for i in range(BURST)))
+    return outcomes
+
+
+def _quantiles(seconds: list[float]) -> str:
+    if len(seconds) < 2:
+        return "-"
+    q = statistics.quantiles(seconds, n=20)
+    return f"p50 {q[9] * 1e3:6.0f} ms, p95 {q[18] * 1e3:6.0f} ms"
+
+
+def main() -> None:
+    print(f"Burst of {BURST} distinct analyses:")
+    for label, admission in (
+        ("unbounded", None),
+        (
+            "LLMAdmission",
+            LLMAdmission(max_concurrency=CAPACITY, max_queue=64, queue_timeout=2.0),
+        ),
+    ):
+        outcomes = asyncio.run(_burst(admission))
+        print(f"\n{label}")
+        print(
+            f"  answered            {len(outcomes['ok']):4d}  {_quantiles(outcomes['ok'])}"
+        )
+        print(f"  provider rate limit {len(outcomes['provider']):4d}")
+        print(
+            f"  rejected fast       {len(outcomes['rejected']):4d}  "
+            f"{_quantiles(outcomes['rejected'])}"
+        )
+        if admission is not None:
+            stats = admission.stats
+            print(
+                f"  mean wait {stats.mean_wait_seconds * 1e3:.0f} ms, "
+                f"max wait {stats.max_wait_seconds * 1e3:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
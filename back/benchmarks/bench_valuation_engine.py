@@ -0,0 +1,75 @@
+"""
+Valuations per second on one core: ValuationService's Decimal path, one
+input at a time, against the vectorized ValuationEngine.
+
+Run from the repository root:
+
+    python -m back.benchmarks.bench_valuation_engine
+"""
+
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from back.app.schemas.valuation import CpiData, PropertyType, ValuationInput
+from back.app.services.valuation_engine import ValuationColumns, ValuationEngine
+from back.app.services.valuation_service import ValuationService
+
+DECIMAL_ROWS = 5_000
+ENGINE_ROWS = 1_000_000
+ROUNDS = 3
+
+
+def _inputs(count: int) -> list[ValuationInput]:
+    rng = random.Random(0)
+    return [
+        ValuationInput(
+            property_type=rng.choice(list(PropertyType)),
+            purchase_date=date(2024, 1, 1),
+            monthly_net_rent=Decimal(rng.randint(10_000, 5_000_000)) / 100,
+            living_area=Decimal(rng.randint(200, 50_000)) / 10,
+            residential_units=Decimal(rng.randint(1, 40)),
+            land_value_per_sqm=Decimal(rng.randint(1_000, 300_000)) / 100,
+            plot_area=Decimal(rng.randint(500, 100_000)) / 10,
+            remaining_useful_life=Decimal(rng.randint(1, 80)),
+            property_yield=Decimal(rng.randint(50, 1_200)) / 100,
+            actual_purchase_price=Decimal(rng.randint(5_000_000, 500_000_000)) / 100,
+        )
+        for _ in range(count)
+    ]
+
+
+def _best(work) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    inputs = _inputs(DECIMAL_ROWS)
+    service = ValuationService()
+    cpi_data = CpiData(year=2024, month=1, index_value=Decimal("118.5"))
+
+    def decimal_path():
+        for input_data in inputs:
+            service.calculate_valuation(input_data, cpi_data)
+
+    decimal_rate = DECIMAL_ROWS / _best(decimal_path)
+
+    columns = ValuationColumns.from_inputs(
+        inputs * (ENGINE_ROWS // DECIMAL_ROWS), [118.5] * ENGINE_ROWS
+    )
+    engine = ValuationEngine()
+    engine_rate = ENGINE_ROWS / _best(lambda: engine.calculate(columns))
+
+    print(f"Decimal path:     {decimal_rate:14,.0f} valuations/s")
+    print(f"ValuationEngine:  {engine_rate:14,.0f} valuations/s")
+    print(f"speed-up:         {engine_rate / decimal_rate:14,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
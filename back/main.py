@@ -14,20 +14,48 @@ from starlette.responses import JSONResponse
 
 from back.app.api.routers import main_router
 from back.app.core.config import settings
-from back.app.core.exceptions import BadRequestException, InternalServerException
-from back.app.services.cpi_parser_service import germany_historical_cpi_parser
+from back.app.core.exceptions import (
+    BadRequestException,
+    InternalServerException,
+    ServiceUnavailableException,
+    TooManyRequestsException,
+)
+from back.app.core.leader import LeaderLease
+from back.app.services.app_services import AppServices
 
 
 scheduler = AsyncIOScheduler()
 
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Starting app...")
-    asyncio.create_task(germany_historical_cpi_parser.parse_into_mapper())
+    services = app.state.services = AppServices.create()
+    cpi_registry = services.cpi_registry
+    # Only the default country is loaded eagerly, the others on first use.
+    cpi_registry.get()
+
+    # One worker per host refreshes, the others read what it publishes.
+    leader_lease = LeaderLease(
+        settings.LEADER_LEASE_PATH, ttl=settings.LEADER_LEASE_TTL
+    )
+    # Without the shared segment the leader's refreshes only reach the other
+    # workers through the snapshot files it writes, checked at every lease
+    # check.
+    on_follow = None if settings.CPI_SHARED_SEGMENT else cpi_registry.reload_snapshots
+    lease_task = asyncio.create_task(
+        leader_lease.run(on_elected=cpi_registry.refresh_all, on_follow=on_follow)
+    )
+
+    async def refresh_cpi_data() -> None:
+        if leader_lease.is_leader:
+            await cpi_registry.refresh_all()
+
     scheduler.add_job(
-        germany_historical_cpi_parser.parse_into_mapper,
-        trigger=CronTrigger(hour="*/6", minute=0, timezone="UTC"),
+        refresh_cpi_data,
+        trigger=CronTrigger(
+            hour="*/6", minute=0, timezone="UTC", jitter=settings.CPI_REFRESH_JITTER
+        ),
         id="refresh_cpi_data",
         replace_existing=True,
     )
@@ -35,6 +63,9 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     logger.info("Scheduler started.")
     yield
     scheduler.shutdown()
+    lease_task.cancel()
+    await asyncio.gather(lease_task, return_exceptions=True)
+    await services.aclose()
     logger.info("Application stopped.")
 
 
@@ -86,6 +117,18 @@ def _register_exception_handlers(app: FastAPI) -> None:
             content={"detail": exc.detail},
         )
 
+    @app.exception_handler(TooManyRequestsException)
+    @app.exception_handler(ServiceUnavailableException)
+    async def retry_later_exception_handler(
+        _: Request,
+        exc: TooManyRequestsException | ServiceUnavailableException,
+    ):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
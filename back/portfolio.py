@@ -0,0 +1,82 @@
+"""
+Value a portfolio file offline, the way POST /api/valuation/portfolio does.
+
+Run from the repository root:
+
+    python -m back.portfolio portfolio.csv valued.parquet --column "Rent=monthly_net_rent"
+
+The formats follow the file extensions, .csv or .parquet.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from back.app.services.app_services import AppServices
+from back.app.services.batch_valuation_service import BatchValuationService
+from back.app.services.portfolio_service import (
+    PORTFOLIO_CHUNK_ROWS,
+    PortfolioProgress,
+    PortfolioValuationService,
+)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="portfolio file to value")
+    parser.add_argument("target", help="file to write the valued portfolio to")
+    parser.add_argument(
+        "--column",
+        action="append",
+        default=[],
+        metavar="SOURCE=FIELD",
+        help="map a column onto a valuation input field, repeatable",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=PORTFOLIO_CHUNK_ROWS)
+    return parser.parse_args(argv)
+
+
+def _report(progress: PortfolioProgress) -> None:
+    print(
+        f"\r{progress.rows:,} rows valued, {progress.errors:,} failed "
+        f"({progress.rows_per_second:,.0f} rows/s)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    overrides = dict(value.rsplit("=", 1) for value in args.column)
+
+    services = AppServices.create(caches=False)
+    try:
+        service = PortfolioValuationService(
+            BatchValuationService(
+                valuation_service=services.uncached_valuation_service,
+                cpi_service=await services.country_cpi_service(),
+                country_cpi_service=services.country_cpi_service,
+            ),
+            chunk_rows=args.chunk_rows,
+        )
+        await service.value_to_file(
+            args.source, args.target, column_overrides=overrides, on_progress=_report
+        )
+    finally:
+        print(file=sys.stderr)
+        await services.aclose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    if any("=" not in value for value in args.column):
+        sys.exit("--column takes SOURCE=FIELD")
+
+    try:
+        asyncio.run(_run(args))
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()